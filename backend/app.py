@@ -1,8 +1,9 @@
 """HisabKitab Flask Application – entry point."""
 
 import os
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import Config
 from src.db.connection import init_db
@@ -11,15 +12,24 @@ from src.imports.routes import imports_bp
 from src.imports.worker import start_worker
 from src.transactions.routes import transactions_bp
 from src.analytics.routes import analytics_bp
+from src.budgets.routes import budgets_bp
+from src.recurring.routes import recurring_bp
+from src.frontend.routes import frontend_bp
+from src.metrics.routes import metrics_bp
 
-# Resolve the frontend directory (sibling of backend/)
-FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
 
-
-def create_app() -> Flask:
+def create_app(with_worker: bool | None = None) -> Flask:
+    """
+    Build the app.  The import worker starts in-process when *with_worker*
+    (default ``START_WORKER``); production runs it as its own process.
+    """
     app = Flask(__name__, static_folder=None)   # we serve static files ourselves
     app.config.from_object(Config)
 
+    # Client address from X-Forwarded-* when behind our own reverse proxies
+    if Config.TRUSTED_PROXIES > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXIES, x_proto=Config.TRUSTED_PROXIES)
+
     # CORS – allow the frontend to call the API
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
@@ -35,32 +45,27 @@ def create_app() -> Flask:
     app.register_blueprint(imports_bp)
     app.register_blueprint(transactions_bp)
     app.register_blueprint(analytics_bp)
+    app.register_blueprint(budgets_bp)
+    app.register_blueprint(recurring_bp)
+    app.register_blueprint(metrics_bp)
 
     # Health-check
     @app.route("/api/health")
     def health():
         return {"status": "ok"}
 
-    # ── Serve frontend files ────────────────────────
-    @app.route("/")
-    def serve_index():
-        return send_from_directory(FRONTEND_DIR, "index.html")
-
-    @app.route("/<path:filename>")
-    def serve_frontend(filename):
-        """Serve any file from the frontend/ folder (html, css, js, etc.)."""
-        filepath = os.path.join(FRONTEND_DIR, filename)
-        if os.path.isfile(filepath):
-            return send_from_directory(FRONTEND_DIR, filename)
-        # Fall back to index.html for SPA-like behavior
-        return send_from_directory(FRONTEND_DIR, "index.html")
+    # Frontend files, fingerprinted and precompressed in memory
+    app.register_blueprint(frontend_bp)
 
     # Start background import worker
-    start_worker()
+    if Config.START_WORKER if with_worker is None else with_worker:
+        start_worker()
 
     return app
 
 
 if __name__ == "__main__":
-    app = create_app()
+    # Development server.  The reloader runs this file twice – a watcher and
+    # the serving child (WERKZEUG_RUN_MAIN) – and only the child may run the worker.
+    app = create_app(with_worker=Config.START_WORKER and os.environ.get("WERKZEUG_RUN_MAIN") == "true")
     app.run(debug=True, port=5000)
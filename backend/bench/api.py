@@ -0,0 +1,202 @@
+"""API benchmark suite – latency and throughput per endpoint and filter combination.
+
+Runs the app in-process against a dataset from ``bench.generate`` (one is
+generated first if ``--db`` does not exist).  For each case it times
+``--requests`` sequential requests (after a warm-up) and then the same
+number from ``--threads`` concurrent clients, for the heaviest user and a
+median one.  The analytics response cache is disabled unless ``--cache``,
+so every request runs its queries.
+
+Results are written as JSON with the commit, SQLite version and dataset
+they were measured on; ``--compare`` diffs two such files.
+
+    cd backend
+    python -m bench.generate --db bench-data/bench.db --transactions 1000000
+    python -m bench.api --db bench-data/bench.db --json results/$(git rev-parse --short HEAD).json
+    python -m bench.api --compare results/old.json results/new.json --fail-over 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from bench.mixed_rw import _summary
+
+# name → path; the filter combinations mirror what the frontend sends
+CASES = {
+    "transactions.page1":           "/api/transactions?per_page=50",
+    "transactions.deep_page":       "/api/transactions?per_page=50&page=200",
+    "transactions.sort_amount":     "/api/transactions?per_page=50&sort_by=amount&sort_dir=desc",
+    "transactions.merchant":        "/api/transactions?per_page=50&merchant=amazon",
+    "transactions.category":        "/api/transactions?per_page=50&category_id=2",
+    "transactions.date_range":      "/api/transactions?per_page=50&date_from=2025-03-01&date_to=2025-05-31",
+    "transactions.amount_range":    "/api/transactions?per_page=50&amount_min=100&amount_max=500",
+    "transactions.search":          "/api/transactions?per_page=50&search=local",
+    "transactions.combined":        "/api/transactions?per_page=50&category_id=1&txn_type=debit"
+                                    "&date_from=2025-01-01&date_to=2025-12-31&sort_by=amount",
+    "transactions.categories":      "/api/transactions/categories",
+    "analytics.monthly":            "/api/analytics/monthly?months=24",
+    "analytics.categories":         "/api/analytics/categories",
+    "analytics.categories_range":   "/api/analytics/categories?date_from=2025-01-01&date_to=2025-06-30",
+    "analytics.categories_filtered": "/api/analytics/categories?merchant=local",
+    "analytics.merchants":          "/api/analytics/merchants",
+    "analytics.merchants_range":    "/api/analytics/merchants?date_from=2025-01-01&date_to=2025-06-30",
+    "analytics.cashflow":           "/api/analytics/cashflow",
+    "analytics.cashflow_range":     "/api/analytics/cashflow?date_from=2025-04-01&date_to=2025-04-30",
+    "analytics.balance":            "/api/analytics/balance?date_from=2025-01-01&date_to=2025-12-31",
+    "analytics.timeseries":         "/api/analytics/timeseries?bucket=week&group_by=category",
+    "analytics.summary":            "/api/analytics/summary",
+    "analytics.stats_percentiles":  "/api/analytics/stats/percentiles",
+    "analytics.stats_outliers":     "/api/analytics/stats/outliers",
+    "budgets.list":                 "/api/budgets?month=2025-06",
+    "recurring.list":               "/api/recurring",
+}
+
+
+def _git_commit() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def _compare(old_path: str, new_path: str, fail_over: float | None) -> int:
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    if old["meta"]["dataset"] != new["meta"]["dataset"]:
+        print("Warning: the two runs used different datasets\n")
+    print(f"{'case':<48} {'p50 old':>9} {'p50 new':>9} {'Δ p50':>8} {'rps old':>9} {'rps new':>9}")
+    regressions = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if not before or "latency" not in before or "latency" not in result:
+            continue
+        p50_old, p50_new = before["latency"]["p50_ms"], result["latency"]["p50_ms"]
+        delta = (p50_new / p50_old - 1) * 100 if p50_old else 0.0
+        print(f"{name:<48} {p50_old:>9.2f} {p50_new:>9.2f} {delta:>+7.1f}% "
+              f"{before['throughput']['per_sec']:>9.1f} {result['throughput']['per_sec']:>9.1f}")
+        if fail_over is not None and delta > fail_over:
+            regressions.append(name)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower by more than {fail_over}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bench-data/bench.db", help="dataset from bench.generate")
+    parser.add_argument("--requests", type=int, default=30, help="requests per case, phase and user")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent clients in the throughput phase")
+    parser.add_argument("--only", help="comma-separated case name prefixes")
+    parser.add_argument("--cache", action="store_true", help="keep the analytics response cache on")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    parser.add_argument("--fail-over", type=float, help="with --compare: exit 1 if a p50 grew by more than this %%")
+    args = parser.parse_args()
+
+    if args.compare:
+        return _compare(*args.compare, args.fail_over)
+
+    db_path = os.path.abspath(args.db)
+    if not os.path.exists(db_path):
+        subprocess.run([sys.executable, "-m", "bench.generate", "--db", db_path], check=True)
+    with open(db_path + ".meta.json", encoding="utf-8") as f:
+        dataset = json.load(f)
+    os.environ["DATABASE_PATH"] = db_path
+    os.environ["USER_DB_DIR"] = dataset["user_db_dir"]
+    os.environ["STORAGE_MODE"] = dataset["storage_mode"]
+    os.environ["START_WORKER"] = "0"
+    if not args.cache:
+        os.environ["ANALYTICS_CACHE_MAX_BYTES"] = "0"
+
+    from app import create_app
+    from src.auth.throttle import account_failures, ip_attempts
+
+    account_failures.limit = ip_attempts.limit = sys.maxsize
+    app = create_app()
+    by_size = sorted(dataset["users"], key=lambda u: u["transactions"], reverse=True)
+    profiles = {"heavy": by_size[0], "median": by_size[len(by_size) // 2]}
+    tokens = {}
+    for label, user in profiles.items():
+        resp = app.test_client().post("/api/auth/login", json={"email": user["email"], "password": dataset["password"]})
+        tokens[label] = resp.get_json()["token"]
+
+    prefixes = tuple(args.only.split(",")) if args.only else ("",)
+    results = {}
+    for label, token in tokens.items():
+        headers = {"Authorization": f"Bearer {token}"}
+        for case, path in CASES.items():
+            if not case.startswith(prefixes):
+                continue
+            name = f"{label}:{case}"
+            client = app.test_client()
+            status = client.get(path, headers=headers).status_code          # warm-up
+            if status != 200:
+                results[name] = {"path": path, "status": status}
+                print(f"[Bench] {name}: skipped (HTTP {status})")
+                continue
+
+            samples = []
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                t0 = time.perf_counter()
+                client.get(path, headers=headers)
+                samples.append(time.perf_counter() - t0)
+            latency = _summary(samples, time.perf_counter() - started)
+
+            concurrent: list[float] = []
+            lock = threading.Lock()
+
+            def worker():
+                c = app.test_client()
+                for _ in range(max(1, args.requests // args.threads)):
+                    t0 = time.perf_counter()
+                    c.get(path, headers=headers)
+                    with lock:
+                        concurrent.append(time.perf_counter() - t0)
+
+            threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            throughput = _summary(concurrent, time.perf_counter() - started)
+
+            results[name] = {"path": path, "latency": latency, "throughput": throughput}
+            print(f"[Bench] {name}: p50 {latency['p50_ms']} ms, p99 {latency['p99_ms']} ms, "
+                  f"{throughput['per_sec']} req/s with {args.threads} clients")
+
+    result = {
+        "meta": {
+            **_git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "requests": args.requests,
+            "threads": args.threads,
+            "cache": args.cache,
+            "dataset": {**dataset["args"], "transactions": dataset["transactions"],
+                        "profiles": {label: u["transactions"] for label, u in profiles.items()}},
+        },
+        "results": results,
+    }
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"[Bench] wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Per-request authentication overhead, with and without the auth caches.
+
+Times token verification on its own (signature check vs cache hit) and a
+full ``GET /api/auth/me`` round trip through the test client with warm
+caches and with both caches cleared before every request.
+
+    cd backend
+    python -m bench.auth --requests 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _per_call_us(fn, n: int, before=None) -> dict:
+    samples = []
+    for _ in range(n):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    ordered = sorted(samples)
+    return {
+        "p50_us": round(statistics.median(ordered) * 1e6, 1),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from app import create_app
+    from src.auth.service import decode_token, profile_cache, token_cache
+
+    client = create_app().test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    token = reg.get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def cold():
+        token_cache.clear()
+        profile_cache.clear()
+
+    def me():
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    result = {
+        "requests": args.requests,
+        "decode_token": {
+            "verify": _per_call_us(lambda: decode_token(token), args.requests, before=token_cache.clear),
+            "cached": _per_call_us(lambda: decode_token(token), args.requests),
+        },
+        "me_request": {
+            "uncached": _per_call_us(me, args.requests, before=cold),
+            "cached": _per_call_us(me, args.requests),
+        },
+        "token_cache": token_cache.stats(),
+        "profile_cache": profile_cache.stats(),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Columnar (NumPy) statistics vs the equivalent SQL.
+
+Seeds a throw-away database with one user's transactions, then times each
+statistic behind ``/api/analytics/stats/*`` computed over the cached
+columnar frame against a SQL query producing the same numbers.  Frame load
+time (the cost after every write) is reported separately.
+
+    cd backend
+    python -m bench.columnar --rows 200000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.mixed_rw import _fake_txns
+
+SQL = {
+    "weekday": """
+        SELECT (day + 3) % 7 AS weekday, SUM(amount_minor), COUNT(*), AVG(amount_minor)
+        FROM transactions WHERE user_id = ? AND type_code = 0
+        GROUP BY weekday""",
+    "rolling": """
+        SELECT day, total,
+               SUM(total) OVER (ORDER BY day RANGE BETWEEN 29 PRECEDING AND CURRENT ROW) / 30.0
+        FROM (SELECT day, SUM(amount_minor) AS total
+              FROM transactions WHERE user_id = ? AND type_code = 0
+              GROUP BY day)""",
+    "percentiles": """
+        SELECT cat, n, amount_minor FROM (
+            SELECT COALESCE(category_id, 0) AS cat, amount_minor,
+                   ROW_NUMBER() OVER (PARTITION BY COALESCE(category_id, 0) ORDER BY amount_minor) AS rn,
+                   COUNT(*) OVER (PARTITION BY COALESCE(category_id, 0)) AS n
+            FROM transactions WHERE user_id = ? AND type_code = 0)
+        WHERE rn IN (n * 25 / 100 + 1, n * 50 / 100 + 1, n * 75 / 100 + 1,
+                     n * 90 / 100 + 1, n * 99 / 100 + 1)""",
+    "outliers": """
+        WITH base AS (
+            SELECT id, COALESCE(category_id, 0) AS cat, amount_minor AS amt
+            FROM transactions WHERE user_id = ? AND type_code = 0),
+        ranked AS (
+            SELECT cat, amt, ROW_NUMBER() OVER (PARTITION BY cat ORDER BY amt) AS rn,
+                   COUNT(*) OVER (PARTITION BY cat) AS n FROM base),
+        med AS (SELECT cat, AVG(amt) AS m FROM ranked WHERE rn IN ((n + 1) / 2, (n + 2) / 2) GROUP BY cat),
+        dev AS (SELECT b.id, b.cat, ABS(b.amt - med.m) AS d FROM base b JOIN med USING (cat)),
+        dranked AS (
+            SELECT cat, d, ROW_NUMBER() OVER (PARTITION BY cat ORDER BY d) AS rn,
+                   COUNT(*) OVER (PARTITION BY cat) AS n FROM dev),
+        mad AS (SELECT cat, AVG(d) AS mad FROM dranked WHERE rn IN ((n + 1) / 2, (n + 2) / 2) GROUP BY cat)
+        SELECT dev.id, 0.6745 * dev.d / mad.mad AS score
+        FROM dev JOIN mad USING (cat)
+        WHERE mad.mad > 0 AND 0.6745 * dev.d / mad.mad > 3.5
+        ORDER BY score DESC LIMIT 20""",
+}
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from app import create_app
+    from src.analytics import columnar
+    from src.db.connection import get_read_db
+    from src.imports.persist import save_transactions
+
+    if not columnar.available():
+        print("NumPy is not installed – nothing to compare", file=sys.stderr)
+        return 1
+
+    client = create_app().test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id = reg.get_json()["user_id"]
+    for start in range(0, args.rows, 5000):
+        save_transactions(user_id, None, 1, _fake_txns(min(5000, args.rows - start)))
+
+    columnar_ops = {
+        "weekday": lambda f, m: columnar.weekday_totals(f, m),
+        "rolling": lambda f, m: columnar.rolling_daily(f, m, 30),
+        "percentiles": lambda f, m: columnar.percentiles(f, m, [25, 50, 75, 90, 99]),
+        "outliers": lambda f, m: columnar.outliers(f, m, 3.5, 20),
+    }
+
+    def load():
+        columnar.clear_frames()
+        return columnar.load_frame(user_id)
+
+    load_ms = _median_ms(load, args.repeat)
+    frame = columnar.load_frame(user_id)
+
+    db = get_read_db(user_id)
+    results = {}
+    try:
+        for name, sql in SQL.items():
+            sql_ms = _median_ms(lambda: db.execute(sql, (user_id,)).fetchall(), args.repeat)
+            col_ms = _median_ms(
+                lambda: columnar_ops[name](frame, frame.select({"txn_type": "debit"})), args.repeat
+            )
+            results[name] = {
+                "sql_ms": sql_ms,
+                "columnar_ms": col_ms,
+                "speedup": round(sql_ms / col_ms, 1) if col_ms else None,
+            }
+    finally:
+        db.close()
+
+    result = {"rows": args.rows, "frame_load_ms": load_ms, "frame_bytes": frame.nbytes, "stats": results}
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Fake vision LLM server – a local stand-in for Ollama and LM Studio.
+
+Implements ``POST /api/generate`` (Ollama) and ``POST /v1/chat/completions``
+(OpenAI-compatible, as LM Studio) well enough for the import adapters, so
+the pipeline can be load-tested without a GPU box.  Each request sleeps
+for a log-normal latency, then answers with either:
+
+* a recorded response – ``--replay`` one or more databases and their
+  ``import_pages.raw_json`` rows are served round-robin; or
+* a synthetic page of ``--rows`` transactions in the prompt's JSON shape.
+
+``--error-rate`` answers that share with HTTP 500 and ``--truncate-rate``
+cuts that share of responses mid-array (``finish_reason: length``), which
+exercises the parser's recovery steps.
+
+    cd backend
+    python -m bench.fake_llm --port 11500 --latency-ms 1500 --truncate-rate 0.1
+    OLLAMA_BASE_URL=http://127.0.0.1:11500 python app.py
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.generate import CATALOGUE
+
+
+@dataclass
+class FakeLLMSettings:
+    latency_ms: float = 800.0
+    jitter: float = 0.3                     # sigma of the log-normal latency
+    error_rate: float = 0.0
+    truncate_rate: float = 0.0
+    rows: int = 25
+    replay: list[str] = field(default_factory=list)
+    seed: int = 1
+
+
+class FakeLLM:
+    """Response source and counters shared by the handler threads."""
+
+    def __init__(self, settings: FakeLLMSettings):
+        self.settings = settings
+        self._rng = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._recorded = itertools.cycle(_load_recorded(settings.replay)) if settings.replay else None
+        self.stats = {"requests": 0, "errors": 0, "truncated": 0}
+
+    def respond(self) -> tuple[int, str | None, bool]:
+        """``(status, text, truncated)`` for one request, after the simulated latency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.settings.latency_ms / 1000 * self._rng.lognormvariate(0, self.settings.jitter)
+            fail = self._rng.random() < self.settings.error_rate
+            truncate = not fail and self._rng.random() < self.settings.truncate_rate
+            text = None if fail else (next(self._recorded) if self._recorded else self._synthetic())
+            if fail:
+                self.stats["errors"] += 1
+            elif truncate:
+                self.stats["truncated"] += 1
+                text = text[: int(len(text) * self._rng.uniform(0.5, 0.95))]
+        time.sleep(delay)
+        return (500, None, False) if fail else (200, text, truncate)
+
+    def _synthetic(self) -> str:
+        rng = self._rng
+        rows = []
+        for _ in range(self.settings.rows):
+            category = rng.choice(sorted(CATALOGUE))
+            typical, merchants = CATALOGUE[category]
+            merchant = rng.choice(merchants)
+            rows.append({
+                "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "description": f"POS {merchant.upper()} #{rng.randint(1000, 9999)}",
+                "merchant": merchant,
+                "amount": round(rng.lognormvariate(math.log(typical), 0.6), 2),
+                "txn_type": "debit",
+                "balance": None,
+                "currency": "USD",
+                "category": category,
+            })
+        body = json.dumps(rows, indent=2)
+        return f"```json\n{body}\n```" if rng.random() < 0.3 else body
+
+
+def _load_recorded(paths: list[str]) -> list[str]:
+    responses = []
+    for path in paths:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            responses += [r[0] for r in conn.execute(
+                "SELECT raw_json FROM import_pages WHERE raw_json IS NOT NULL ORDER BY id")]
+        finally:
+            conn.close()
+    if not responses:
+        raise ValueError(f"no recorded import_pages.raw_json in {', '.join(paths)}")
+    return responses
+
+
+def _handler(llm: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path in ("/api/tags", "/v1/models"):
+                self._send(200, {"models": [{"name": "fake-vision"}], "data": [{"id": "fake-vision"}]})
+            elif self.path == "/stats":
+                self._send(200, llm.stats)
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))    # image payload, unused
+            if self.path not in ("/api/generate", "/v1/chat/completions"):
+                self._send(404, {"error": "not found"})
+                return
+            status, text, truncated = llm.respond()
+            if status != 200:
+                self._send(status, {"error": "simulated backend failure"})
+            elif self.path == "/api/generate":
+                self._send(200, {"model": "fake-vision", "response": text, "done": True,
+                                 "done_reason": "length" if truncated else "stop"})
+            else:
+                self._send(200, {"model": "fake-vision", "object": "chat.completion", "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "length" if truncated else "stop",
+                }]})
+
+    return Handler
+
+
+def serve(settings: FakeLLMSettings, host: str = "127.0.0.1", port: int = 0) -> tuple[ThreadingHTTPServer, FakeLLM]:
+    """Start the server on a daemon thread; returns it (``server_address`` has the port) and its state."""
+    llm = FakeLLM(settings)
+    server = ThreadingHTTPServer((host, port), _handler(llm))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake-llm").start()
+    return server, llm
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="median response time")
+    parser.add_argument("--jitter", type=float, default=0.3, help="log-normal sigma of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="share of responses cut mid-array")
+    parser.add_argument("--rows", type=int, default=25, help="transactions per synthetic page")
+    parser.add_argument("--replay", nargs="+", default=[], metavar="DB",
+                        help="serve import_pages.raw_json recorded in these databases")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def settings_from(args) -> FakeLLMSettings:
+    return FakeLLMSettings(latency_ms=args.latency_ms, jitter=args.jitter, error_rate=args.error_rate,
+                           truncate_rate=args.truncate_rate, rows=args.rows, replay=args.replay, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server, llm = serve(settings_from(args), args.host, args.port)
+    print(f"[FakeLLM] listening on http://{args.host}:{server.server_address[1]} "
+          f"({'replaying recorded pages' if args.replay else 'synthetic pages'})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"[FakeLLM] {llm.stats}")
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Synthetic dataset generator – realistic users, imports and transactions at scale.
+
+Fills a database through the same paths as real imports (``register_user``,
+``statement_imports`` / ``import_jobs`` rows and ``save_transactions``), so
+merchants, rollups, the daily ledger and base-currency amounts are all
+maintained as they would be in production.  The output depends only on
+the arguments: the same ``--seed`` gives the same dataset.
+
+Shape of the data:
+
+* user sizes are skewed – the first user holds the most rows, the tail
+  only a few hundred;
+* merchants follow a Zipf distribution; each belongs to a category with a
+  typical amount, drawn log-normally around it;
+* activity grows over ``--months`` ending at ``--end``, with more spend
+  at weekends; each user gets a monthly salary and fixed-day bills;
+* a small share (``--foreign-share``) is in EUR / GBP, with daily rates
+  loaded so base amounts are filled in;
+* one completed import per user and statement month, ~40 rows a page.
+
+A ``<db>.meta.json`` next to the database records the arguments, storage
+settings and user logins; ``bench.api`` reads it.
+
+    cd backend
+    python -m bench.generate --db bench-data/bench.db --users 20 --transactions 1000000 --seed 7
+"""
+
+import argparse
+import calendar
+import csv
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+PASSWORD = "benchpass"
+ROWS_PER_PAGE = 40
+
+# category → (typical debit amount, merchants from most to least common)
+CATALOGUE = {
+    "Groceries":         (45,  ["BigBasket", "Whole Foods", "Trader Joe's", "Costco", "Aldi", "Kroger"]),
+    "Dining":            (22,  ["Swiggy", "Zomato", "Starbucks", "McDonald's", "Chipotle", "Domino's"]),
+    "Transport":         (15,  ["Uber", "Lyft", "Shell", "Chevron", "Metro Transit", "BP"]),
+    "Shopping":          (60,  ["Amazon", "Target", "Walmart", "IKEA", "Best Buy", "Etsy"]),
+    "Bills & Utilities": (80,  ["Comcast", "PG&E", "Verizon", "AT&T", "Water Dept"]),
+    "Entertainment":     (14,  ["Netflix", "Spotify", "Steam", "AMC Theatres", "Disney+"]),
+    "Health":            (35,  ["Apollo Pharmacy", "CVS", "Walgreens", "City Dental"]),
+    "Travel":            (240, ["Airbnb", "Delta", "Marriott", "Expedia", "United"]),
+    "Education":         (50,  ["Coursera", "Udemy", "Kindle Store"]),
+    "Other":             (30,  ["PayPal", "Venmo", "Square"]),
+}
+# Long tail of small local merchants, spread over the everyday categories
+LOCAL_MERCHANTS = 150
+LOCAL_CATEGORIES = ["Groceries", "Dining", "Shopping", "Transport", "Health", "Other"]
+
+BILLS = [("Netflix", "Entertainment", 15.49, 3), ("Spotify", "Entertainment", 10.99, 9),
+         ("Comcast", "Bills & Utilities", 79.99, 14), ("Verizon", "Bills & Utilities", 65.0, 21)]
+FOREIGN = {"EUR": 1.08, "GBP": 1.27}         # rough USD value, drifted daily
+
+
+def _merchant_table(rng: random.Random) -> list[tuple[str, str, float]]:
+    """(merchant, category, typical amount) ordered by popularity."""
+    table = []
+    for category, (typical, names) in CATALOGUE.items():
+        table += [(name, category, typical) for name in names]
+    rng.shuffle(table)
+    for i in range(LOCAL_MERCHANTS):
+        category = LOCAL_CATEGORIES[i % len(LOCAL_CATEGORIES)]
+        table.append((f"Local Merchant {i + 1:03d}", category, CATALOGUE[category][0]))
+    return table
+
+
+def _month_starts(end: date, months: int) -> list[date]:
+    starts, year, month = [], end.year, end.month
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def _user_sizes(total: int, users: int) -> list[int]:
+    """Zipf-like split of *total* rows over *users* (at least 100 each)."""
+    weights = [1 / (i + 1) ** 1.1 for i in range(users)]
+    scale = total / sum(weights)
+    sizes = [max(100, int(w * scale)) for w in weights]
+    sizes[0] += total - sum(sizes)
+    return sizes
+
+
+def _month_rows(rng: random.Random, merchants, cum_weights, start: date,
+                count: int, foreign_share: float) -> list[dict]:
+    days_in_month = calendar.monthrange(start.year, start.month)[1]
+    days = [start + timedelta(days=d) for d in range(days_in_month)]
+    day_weights = [1.6 if d.weekday() >= 5 else 1.0 for d in days]
+    rows = []
+    for merchant, category, typical in rng.choices(merchants, cum_weights=cum_weights, k=count):
+        currency = "USD"
+        if rng.random() < foreign_share:
+            currency = rng.choice(sorted(FOREIGN))
+        rows.append({
+            "date": rng.choices(days, weights=day_weights)[0].isoformat(),
+            "description": f"POS {merchant.upper()} #{rng.randint(1000, 9999)}",
+            "merchant": merchant,
+            "amount": round(rng.lognormvariate(math.log(typical), 0.6), 2),
+            "txn_type": "debit",
+            "currency": currency,
+            "category": category,
+        })
+    for merchant, category, amount, day in BILLS:
+        rows.append({"date": start.replace(day=day).isoformat(), "description": f"{merchant} monthly",
+                     "merchant": merchant, "amount": amount, "txn_type": "debit",
+                     "currency": "USD", "category": category})
+    rows.append({"date": start.replace(day=min(28, days_in_month)).isoformat(), "description": "Salary",
+                 "merchant": "Employer Payroll", "amount": round(rng.uniform(3000, 9000), 2),
+                 "txn_type": "credit", "currency": "USD", "category": "Income"})
+    rows.sort(key=lambda r: r["date"])
+    return rows
+
+
+def _rates_csv(rng: random.Random, first: date, last: date) -> str:
+    fd, path = tempfile.mkstemp(prefix="hk-rates-", suffix=".csv")
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "currency", "rate"])
+        for currency, rate in FOREIGN.items():
+            day = first
+            while day <= last:
+                rate *= math.exp(rng.gauss(0, 0.004))
+                writer.writerow([day.isoformat(), currency, round(rate, 6)])
+                day += timedelta(days=1)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bench-data/bench.db", help="database to create (must not exist)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=200000, help="approximate total rows")
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--end", default="2025-12-31", help="last statement month (YYYY-MM-DD)")
+    parser.add_argument("--foreign-share", type=float, default=0.03)
+    parser.add_argument("--storage-mode", choices=("shared", "per_user"), default="shared")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db)
+    if os.path.exists(db_path):
+        parser.error(f"{args.db} already exists")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    user_db_dir = os.path.splitext(db_path)[0] + "_users"
+    os.environ["DATABASE_PATH"] = db_path
+    os.environ["USER_DB_DIR"] = user_db_dir
+    os.environ["STORAGE_MODE"] = args.storage_mode
+
+    from src.auth.service import register_user
+    from src.db.connection import init_db
+    from src.db.writer import run_write
+    from src.fx.rates import load_rates_file
+    from src.imports.persist import save_transactions
+
+    init_db()
+    rng = random.Random(args.seed)
+    merchants = _merchant_table(rng)
+    cum_weights, acc = [], 0.0
+    for rank in range(len(merchants)):
+        acc += 1 / (rank + 1) ** 1.2
+        cum_weights.append(acc)
+
+    months = _month_starts(date.fromisoformat(args.end), args.months)
+    rates_path = _rates_csv(rng, months[0], date.fromisoformat(args.end))
+    try:
+        load_rates_file(rates_path)
+    finally:
+        os.remove(rates_path)
+
+    month_weights = [0.5 + (i + 1) / len(months) for i in range(len(months))]
+    fixed_per_month = len(BILLS) + 1
+    users, total, started = [], 0, time.perf_counter()
+    for n, size in enumerate(_user_sizes(args.transactions, args.users), start=1):
+        email = f"bench{n}@example.com"
+        user_id = register_user(email, PASSWORD, f"Bench User {n}")["user_id"]
+        variable = max(0, size - fixed_per_month * len(months))
+        per_month = [int(variable * w / sum(month_weights)) for w in month_weights]
+        rows_for_user = 0
+        for start, count in zip(months, per_month):
+            rows = _month_rows(rng, merchants, cum_weights, start, count, args.foreign_share)
+
+            def _create_import(db, start=start) -> int:
+                import_id = db.execute(
+                    """INSERT INTO statement_imports (user_id, original_filename, stored_path, page_count)
+                       VALUES (?, ?, ?, ?)""",
+                    (user_id, f"statement-{start:%Y-%m}.pdf", f"synthetic/{user_id}/{start:%Y-%m}.pdf",
+                     math.ceil(len(rows) / ROWS_PER_PAGE)),
+                ).lastrowid
+                db.execute(
+                    """INSERT INTO import_jobs (import_id, status, started_at, completed_at)
+                       VALUES (?, 'completed', datetime('now'), datetime('now'))""",
+                    (import_id,),
+                )
+                return import_id
+
+            import_id = run_write(_create_import, user_id)
+            for page, offset in enumerate(range(0, len(rows), ROWS_PER_PAGE), start=1):
+                rows_for_user += save_transactions(user_id, import_id, page, rows[offset:offset + ROWS_PER_PAGE])
+        total += rows_for_user
+        users.append({"user_id": user_id, "email": email, "transactions": rows_for_user})
+        print(f"[Generate] user {n}/{args.users}: {rows_for_user} transactions "
+              f"({total / (time.perf_counter() - started):.0f} rows/s overall)")
+
+    meta = {
+        "args": vars(args),
+        "database_path": db_path,
+        "user_db_dir": user_db_dir,
+        "storage_mode": args.storage_mode,
+        "password": PASSWORD,
+        "transactions": total,
+        "users": users,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    with open(db_path + ".meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"[Generate] {total} transactions for {len(users)} users in {meta['seconds']} s → {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""End-to-end import load test – upload → worker → LLM → persist.
+
+Runs the app and its import worker in-process against a throw-away
+database, with the vision backend pointed at ``bench.fake_llm`` (started
+on a local port unless ``--llm-url`` names one already running).  Uploads
+``--pdfs`` generated statements of ``--pages`` pages, spread over
+``--users`` users, then waits for every job to finish.  Reports pages/s,
+the end-to-end job latency distribution (queue wait + processing, from
+the recorded stage timings), the mean time per stage, the fake
+backend's error / truncation counts and the disk used by uploads and page
+images – as stored (the PDFs repeat, so uploads dedupe) and after a
+garbage collection pass with the configured retention.
+
+    cd backend
+    python -m bench.imports --pdfs 200 --pages 3 --concurrency 8 --latency-ms 1000 --truncate-rate 0.1
+    python -m bench.imports --pdfs 100 --replay hisabkitab.db      # replay recorded LLM responses
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from bench.fake_llm import add_arguments, serve, settings_from
+from bench.mixed_rw import _summary
+
+
+def _statement_pdf(pages: int, n: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Synthetic statement {n} – page {p + 1}", fontsize=14)
+        for line in range(40):
+            page.insert_text((72, 110 + line * 16), f"2025-01-{line % 28 + 1:02d}  POS MERCHANT {line:03d}   {line * 3.17:9.2f}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _disk(folder: str) -> dict:
+    files = [os.path.join(d, name) for d, _, names in os.walk(folder) for name in names]
+    return {"files": len(files), "mb": round(sum(map(os.path.getsize, files)) / 1e6, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=3, help="pages per PDF")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="worker threads")
+    parser.add_argument("--backend", choices=("ollama", "lmstudio"), default="ollama")
+    parser.add_argument("--llm-url", help="use this running fake (or real) backend instead of starting one")
+    parser.add_argument("--timeout", type=float, default=1800, help="give up after this many seconds")
+    parser.add_argument("--json", help="write results to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+    os.environ["UPLOAD_FOLDER"] = os.path.join(tmp, "uploads")
+    os.environ["CONVERTED_IMAGES_FOLDER"] = os.path.join(tmp, "converted_images")
+    os.environ["START_WORKER"] = "0"
+    os.environ["WORKER_POLL_INTERVAL"] = "1"
+
+    llm = None
+    llm_url = args.llm_url
+    if llm_url is None:
+        server, llm = serve(settings_from(args))
+        llm_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ["OLLAMA_BASE_URL" if args.backend == "ollama" else "LMSTUDIO_BASE_URL"] = llm_url
+
+    from app import create_app
+    from src.auth.throttle import account_failures, ip_attempts
+    from src.db.connection import get_catalog_db
+    from config import Config
+    from src.imports.artifacts import collect_garbage
+    from src.imports.worker import start_worker, stop_worker
+
+    account_failures.limit = ip_attempts.limit = sys.maxsize
+    app = create_app(with_worker=False)
+    client = app.test_client()
+    headers = []
+    for n in range(args.users):
+        reg = client.post("/api/auth/register", json={"email": f"load{n}@example.com", "password": "benchpass"})
+        headers.append({"Authorization": f"Bearer {reg.get_json()['token']}"})
+    pdfs = [_statement_pdf(args.pages, n) for n in range(min(args.pdfs, 20))]
+
+    started = time.perf_counter()
+    start_worker(args.concurrency)
+    for n in range(args.pdfs):
+        resp = client.post(
+            "/api/imports/upload",
+            headers=headers[n % args.users],
+            data={"file": (io.BytesIO(pdfs[n % len(pdfs)]), f"statement-{n}.pdf")},
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 201, resp.get_data(as_text=True)
+    upload_seconds = time.perf_counter() - started
+
+    def finished() -> int:
+        db = get_catalog_db()
+        try:
+            return db.execute("SELECT COUNT(*) FROM import_timings WHERE stage = 'job'").fetchone()[0]
+        finally:
+            db.close()
+
+    while finished() < args.pdfs and time.perf_counter() - started < args.timeout:
+        time.sleep(0.25)
+    wall = time.perf_counter() - started
+    stop_worker()
+
+    disk = {"uploaded_mb": round(sum(len(pdfs[n % len(pdfs)]) for n in range(args.pdfs)) / 1e6, 2),
+            "uploads": _disk(Config.UPLOAD_FOLDER), "images": _disk(Config.CONVERTED_IMAGES_FOLDER)}
+    Config.ARTIFACT_GC_GRACE = 0
+    collect_garbage()
+    disk["after_gc"] = {"uploads": _disk(Config.UPLOAD_FOLDER), "images": _disk(Config.CONVERTED_IMAGES_FOLDER),
+                        "page_image_retention": Config.PAGE_IMAGE_RETENTION}
+
+    db = get_catalog_db()
+    try:
+        jobs = db.execute(
+            """SELECT j.outcome, j.seconds + COALESCE(q.seconds, 0) AS latency
+               FROM import_timings j
+               LEFT JOIN import_timings q
+                      ON q.user_id = j.user_id AND q.job_id = j.job_id AND q.stage = 'queue_wait'
+               WHERE j.stage = 'job'"""
+        ).fetchall()
+        stages = {r["stage"]: round(r["mean"] * 1000, 2) for r in db.execute(
+            "SELECT stage, AVG(seconds) AS mean FROM import_timings GROUP BY stage")}
+        pages = db.execute("SELECT COUNT(*) FROM import_timings WHERE stage = 'llm'").fetchone()[0]
+        steps = dict(db.execute(
+            "SELECT outcome, COUNT(*) FROM import_timings WHERE stage = 'parse' GROUP BY outcome").fetchall())
+    finally:
+        db.close()
+
+    result = {
+        "pdfs": args.pdfs,
+        "pages_per_pdf": args.pages,
+        "worker_threads": args.concurrency,
+        "backend": args.backend,
+        "completed": sum(1 for j in jobs if j["outcome"] == "completed"),
+        "failed": sum(1 for j in jobs if j["outcome"] == "failed"),
+        "unfinished": args.pdfs - len(jobs),
+        "pages": pages,
+        "wall_seconds": round(wall, 1),
+        "upload_seconds": round(upload_seconds, 1),
+        "pages_per_sec": round(pages / wall, 2),
+        "job_latency": _summary([j["latency"] for j in jobs], wall),
+        "stage_mean_ms": stages,
+        "parse_steps": steps,
+        "fake_llm": llm.stats if llm else None,
+        "disk": disk,
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
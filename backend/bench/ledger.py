@@ -0,0 +1,118 @@
+"""Date-range totals from the daily ledger vs scanning transactions.
+
+Seeds a throw-away database with one user's transactions (reporting the
+insert rate, which includes rollup and ledger maintenance), then times
+cashflow and category totals over random date ranges answered from
+``monthly_rollup`` + ``daily_ledger`` against the equivalent aggregate over
+the transactions in the range.  Finally times the writes that maintenance
+makes expensive when it is not per day: a bulk category change over every
+row of one category and a bulk delete of another through the API.
+
+    cd backend
+    python -m bench.ledger --rows 200000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench.columnar import _median_ms
+from bench.mixed_rw import _fake_txns
+
+SCAN_SQL = {
+    "cashflow": """
+        SELECT SUM(IIF(type_code = 1, base_amount_minor, 0)), SUM(IIF(type_code = 0, base_amount_minor, 0))
+        FROM transactions WHERE user_id = :user AND day BETWEEN :first AND :last""",
+    "categories": """
+        SELECT COALESCE(category_id, 0), SUM(base_amount_minor), COUNT(*)
+        FROM transactions WHERE user_id = :user AND day BETWEEN :first AND :last AND type_code = 0
+        GROUP BY COALESCE(category_id, 0)""",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from app import create_app
+    from src.analytics.ledger import check_ledger
+    from src.analytics.ledger import range_params, range_sql
+    from src.db.connection import get_read_db
+    from src.imports.persist import save_transactions
+    from src.transactions.codec import to_day
+
+    client = create_app().test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id = reg.get_json()["user_id"]
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+    t0 = time.perf_counter()
+    for start in range(0, args.rows, 5000):
+        save_transactions(user_id, None, 1, _fake_txns(min(5000, args.rows - start)))
+    insert_per_sec = round(args.rows / (time.perf_counter() - t0))
+
+    ledger_sql = {
+        "cashflow": f"{range_sql(per_category=False)} SELECT credit_minor, debit_minor FROM ledger",
+        "categories": f"""{range_sql(per_category=True)}
+            SELECT category_id, debit_minor, debit_count FROM ledger WHERE debit_count > 0""",
+    }
+    year_start = to_day("2025-01-01")
+
+    def random_range() -> dict:
+        first = year_start + random.randint(0, 300)
+        return range_params(user_id, (first, first + random.randint(7, 60)))
+
+    db = get_read_db(user_id)
+    results = {}
+    try:
+        for name in SCAN_SQL:
+            ranges = [random_range() for _ in range(args.repeat)]
+            it = iter(ranges * 2)
+            scan_ms = _median_ms(lambda: db.execute(SCAN_SQL[name], next(it)).fetchall(), args.repeat)
+            ledger_ms = _median_ms(lambda: db.execute(ledger_sql[name], next(it)).fetchall(), args.repeat)
+            results[name] = {
+                "scan_ms": scan_ms,
+                "ledger_ms": ledger_ms,
+                "speedup": round(scan_ms / ledger_ms, 1) if ledger_ms else None,
+            }
+        ledger_rows = db.execute("SELECT COUNT(*) FROM daily_ledger").fetchone()[0]
+        by_size = [r[0] for r in db.execute(
+            "SELECT category_id FROM transactions GROUP BY category_id ORDER BY COUNT(*) DESC LIMIT 2"
+        ).fetchall()]
+    finally:
+        db.close()
+
+    writes = {}
+    for name, path, body in (
+        ("bulk_update_category", "/api/transactions/bulk-update",
+         {"all": True, "category_id": by_size[0], "set": {"category_id": by_size[1]}}),
+        ("bulk_delete", "/api/transactions/bulk-delete", {"all": True, "category_id": by_size[1]}),
+    ):
+        t0 = time.perf_counter()
+        resp = client.post(path, json=body, headers=headers)
+        writes[name] = {"rows": next(iter(resp.get_json().values())),
+                        "seconds": round(time.perf_counter() - t0, 3)}
+    if check_ledger(user_id):
+        raise SystemExit("[Bench] daily_ledger does not match the transactions")
+
+    result = {"rows": args.rows, "ledger_rows": ledger_rows, "insert_per_sec": insert_per_sec,
+              "ranges": results, "writes": writes}
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
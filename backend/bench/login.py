@@ -0,0 +1,112 @@
+"""Login burst – login latency and its impact on other endpoints.
+
+Runs the app in-process against a throw-away database: login threads
+post valid credentials in a loop while reader threads hit cheap
+authenticated endpoints.  Each run is repeated with password hashing
+inline on the request thread and on the bounded KDF pool, reporting
+login and read latency percentiles plus how many logins were shed with
+503 (the throttles are disabled for the run).
+
+    cd backend
+    python -m bench.login --logins 16 --readers 4 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from bench.mixed_rw import _summary
+
+READ_PATHS = ["/api/auth/me", "/api/transactions/categories"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login threads")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from app import create_app
+    from config import Config
+    from src.auth.throttle import account_failures, ip_attempts
+
+    account_failures.limit = ip_attempts.limit = sys.maxsize
+    pool_workers = Config.KDF_WORKERS or 2
+
+    app = create_app()
+    reg = app.test_client().post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+
+    def run(kdf_workers: int) -> dict:
+        Config.KDF_WORKERS = kdf_workers
+        stop = threading.Event()
+        logins: list[float] = []
+        reads: list[float] = []
+        statuses: Counter = Counter()
+        lock = threading.Lock()
+
+        def login():
+            client = app.test_client()
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                resp = client.post("/api/auth/login", json={"email": "bench@example.com", "password": "benchpass"})
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    statuses[resp.status_code] += 1
+                    if resp.status_code == 200:
+                        logins.append(elapsed)
+
+        def reader():
+            client = app.test_client()
+            i = 0
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                client.get(READ_PATHS[i % len(READ_PATHS)], headers=headers)
+                i += 1
+                with lock:
+                    reads.append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=login) for _ in range(args.logins)]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        duration = time.perf_counter() - started
+        return {
+            "kdf_workers": kdf_workers,
+            "logins": _summary(logins, duration),
+            "reads": _summary(reads, duration),
+            "login_status": dict(statuses),
+        }
+
+    result = {
+        "login_threads": args.logins,
+        "readers": args.readers,
+        "kdf_queue_max": Config.KDF_QUEUE_MAX,
+        "inline": run(0),
+        "pooled": run(pool_workers),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
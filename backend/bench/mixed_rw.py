@@ -0,0 +1,148 @@
+"""Mixed read/write load test – read latency while imports are writing.
+
+Runs the app in-process against a throw-away database: reader threads hit
+the list and analytics endpoints while writer threads persist transaction
+batches the way the import worker does.  Reports latency percentiles,
+throughput and errors (e.g. ``database is locked``) for both sides.
+
+    cd backend
+    python -m bench.mixed_rw --readers 8 --writers 4 --seconds 15
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+READ_PATHS = [
+    "/api/transactions?per_page=50",
+    "/api/transactions?txn_type=debit&sort_by=amount",
+    "/api/analytics/monthly",
+    "/api/analytics/categories",
+    "/api/analytics/merchants",
+    "/api/analytics/cashflow",
+]
+MERCHANTS = ["Amazon", "Swiggy", "Uber", "Netflix", "BigBasket", "Zomato", "Shell", "Apollo"]
+CATEGORIES = ["Shopping", "Dining", "Transport", "Entertainment", "Groceries", "Health"]
+
+
+def _fake_txns(n: int) -> list[dict]:
+    rows = []
+    for _ in range(n):
+        rows.append({
+            "date": f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "description": "bench",
+            "merchant": random.choice(MERCHANTS),
+            "amount": round(random.uniform(1, 500), 2),
+            "txn_type": "credit" if random.random() < 0.1 else "debit",
+            "currency": "USD",
+            "category": random.choice(CATEGORIES),
+        })
+    return rows
+
+
+def _summary(samples: list[float], seconds: float) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "per_sec": round(len(ordered) / seconds, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(pick(0.95) * 1000, 2),
+        "p99_ms": round(pick(0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=25, help="transactions per write")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from app import create_app
+    from src.imports.persist import save_transactions
+
+    app = create_app()
+    client = app.test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id, token = reg.get_json()["user_id"], reg.get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for _ in range(args.seed_rows // 1000):
+        save_transactions(user_id, None, 1, _fake_txns(1000))
+
+    stop = threading.Event()
+    reads: list[float] = []
+    writes: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            path = random.choice(READ_PATHS)
+            t0 = time.perf_counter()
+            resp = client.get(path, headers=headers)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                reads.append(elapsed)
+                if resp.status_code != 200:
+                    errors.append(f"GET {path} → {resp.status_code}")
+
+    def writer():
+        while not stop.is_set():
+            batch = _fake_txns(args.batch)
+            t0 = time.perf_counter()
+            try:
+                save_transactions(user_id, None, 1, batch)
+            except Exception as e:      # noqa: BLE001 – counted, not fatal
+                with lock:
+                    errors.append(f"write: {e}")
+                continue
+            with lock:
+                writes.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - started
+
+    result = {
+        "readers": args.readers,
+        "writers": args.writers,
+        "seconds": round(duration, 2),
+        "reads": _summary(reads, duration),
+        "writes": _summary(writes, duration),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Row serialization – buffered ``jsonify`` vs streamed tuple rows.
+
+Seeds a throw-away database with one user's transactions, then serializes
+the transaction list query (``--rows`` rows) three ways:
+
+* buffered – ``sqlite3.Row`` → ``fetchall`` → ``[dict(r) …]`` → ``jsonify``,
+  as every endpoint did before ``src.api.streaming``;
+* stream/json – ``encode_rows`` over a tuple cursor with the stdlib encoder;
+* stream/orjson – the same with orjson (skipped when it is not installed).
+
+Reports median time and the tracemalloc peak for each (the streamed body is
+consumed chunk by chunk, as a WSGI server would send it), plus the time to
+receive ``/api/transactions/export`` end to end through the test client.
+
+    cd backend
+    python -m bench.serialize --rows 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.mixed_rw import _fake_txns
+
+
+def _measure(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = fn()
+        samples.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"median_ms": round(statistics.median(samples) * 1000, 1),
+            "peak_mb": round(peak / 1e6, 1), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+
+    from flask import jsonify
+
+    from app import create_app
+    from src.api import streaming
+    from src.db.connection import get_read_db
+    from src.imports.persist import save_transactions
+    from src.transactions.filters import compile_filters
+    from src.transactions.routes import _LIST_SELECT
+
+    app = create_app(with_worker=False)
+    client = app.test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id = reg.get_json()["user_id"]
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+    for start in range(0, args.rows, 5000):
+        save_transactions(user_id, None, 1, _fake_txns(min(5000, args.rows - start)))
+
+    where, params = compile_filters({}, user_id)
+    sql = f"{_LIST_SELECT} WHERE {where} ORDER BY t.day DESC"
+    db = get_read_db(user_id)
+
+    def buffered() -> int:
+        with app.app_context():
+            rows = db.execute(sql, params).fetchall()
+            return len(jsonify([dict(r) for r in rows]).get_data())
+
+    def streamed() -> int:
+        cursor = db.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        return sum(len(chunk) for chunk in streaming.encode_rows(cursor))
+
+    results = {}
+    try:
+        results["buffered"] = _measure(buffered, args.repeat)
+        orjson = streaming.orjson
+        streaming.orjson = None
+        results["stream_json"] = _measure(streamed, args.repeat)
+        streaming.orjson = orjson
+        if orjson is not None:
+            results["stream_orjson"] = _measure(streamed, args.repeat)
+    finally:
+        db.close()
+
+    def export() -> int:
+        resp = client.get("/api/transactions/export", headers=headers, buffered=False)
+        size = sum(len(chunk) for chunk in resp.response)
+        resp.close()
+        return size
+
+    samples = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        export()
+        samples.append(time.perf_counter() - t0)
+    results["export_endpoint_ms"] = round(statistics.median(samples) * 1000, 1)
+
+    result = {"rows": args.rows, "orjson": streaming.orjson is not None, "results": results}
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
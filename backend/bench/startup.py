@@ -0,0 +1,136 @@
+"""Cold start – how long web and worker processes take to become ready.
+
+Starts fresh interpreters against a throw-away database (optionally in
+per-user mode with ``--shards`` seeded user shards) and times, for each:
+
+* web – ``from app import create_app`` and ``create_app()``, as a gunicorn
+  worker or ``wsgi.py`` does;
+* worker – importing ``src.imports.worker``, ``init_db()`` and starting
+  the polling threads, as ``python -m src.imports.worker`` does.
+
+``wall`` is spawn-to-ready as seen from outside, interpreter start included.
+With ``--importtime`` it also runs ``python -X importtime`` on each and
+lists the top-level packages that account for most of the import time.
+
+    cd backend
+    python -m bench.startup --runs 10 --importtime
+    python -m bench.startup --storage-mode per_user --shards 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_TARGETS = {
+    "web": (
+        "import time; t0 = time.perf_counter()\n"
+        "from app import create_app\n"
+        "t1 = time.perf_counter(); create_app(with_worker=False); t2 = time.perf_counter()\n"
+    ),
+    "worker": (
+        "import time; t0 = time.perf_counter()\n"
+        "from src.db.connection import init_db\n"
+        "from src.imports.worker import start_worker\n"
+        "t1 = time.perf_counter(); init_db(); start_worker(1); t2 = time.perf_counter()\n"
+    ),
+}
+_REPORT = (
+    "import json, sys\n"
+    "print(json.dumps({'import_ms': (t1 - t0) * 1000, 'init_ms': (t2 - t1) * 1000,\n"
+    "                  'modules': len(sys.modules)}), flush=True)\n"
+)
+
+
+def _seed_shards(count: int):
+    """Register *count* users with one transaction each, so each has a shard."""
+    from app import create_app
+    from src.auth.throttle import account_failures, ip_attempts
+    from src.imports.persist import save_transactions
+
+    account_failures.limit = ip_attempts.limit = sys.maxsize
+    client = create_app(with_worker=False).test_client()
+    for n in range(count):
+        user_id = client.post("/api/auth/register", json={
+            "email": f"start{n}@example.com", "password": "benchpass"}).get_json()["user_id"]
+        save_transactions(user_id, None, 1, [{"date": "2025-01-01", "description": "seed",
+                                              "amount": 1.0, "txn_type": "debit"}])
+
+
+def _run(target: str, env: dict) -> dict:
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _TARGETS[target] + _REPORT],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def _import_profile(target: str, env: dict, top: int) -> list[tuple[str, float]]:
+    """Self import time per top-level package (ms), largest first."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", _TARGETS[target]],
+                         env=env, capture_output=True, text=True, check=True).stderr
+    by_package: dict[str, float] = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue                        # the header line
+        package = name.split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0.0) + int(self_us) / 1000
+    return sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per target")
+    parser.add_argument("--storage-mode", choices=("shared", "per_user"), default="shared")
+    parser.add_argument("--shards", type=int, default=0, help="users with data to seed first")
+    parser.add_argument("--importtime", action="store_true", help="also profile imports per package")
+    parser.add_argument("--top", type=int, default=12, help="packages to list with --importtime")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ["DATABASE_PATH"] = os.path.join(tmp, "bench.db")
+    os.environ["USER_DB_DIR"] = os.path.join(tmp, "user_dbs")
+    os.environ["UPLOAD_FOLDER"] = os.path.join(tmp, "uploads")
+    os.environ["CONVERTED_IMAGES_FOLDER"] = os.path.join(tmp, "converted_images")
+    os.environ["STORAGE_MODE"] = args.storage_mode
+    os.environ["START_WORKER"] = "0"
+    env = dict(os.environ)
+
+    if args.shards:
+        # Seeded in a child so this process stays free of app imports
+        subprocess.run([sys.executable, "-c", f"from bench.startup import _seed_shards; _seed_shards({args.shards})"],
+                       env=env, check=True, capture_output=True)
+    else:
+        _run("web", env)                    # first start creates the database
+
+    result = {"storage_mode": args.storage_mode, "shards": args.shards, "runs": args.runs, "targets": {}}
+    for target in _TARGETS:
+        runs = [_run(target, env) for _ in range(args.runs)]
+        summary = {key: round(statistics.median(r[key] for r in runs), 1)
+                   for key in ("import_ms", "init_ms", "wall_ms")}
+        summary["modules"] = runs[-1]["modules"]
+        if args.importtime:
+            summary["import_profile_ms"] = {name: round(ms, 1) for name, ms in _import_profile(target, env, args.top)}
+        result["targets"][target] = summary
+        print(f"[Bench] {target}: import {summary['import_ms']} ms, init {summary['init_ms']} ms, "
+              f"ready after {summary['wall_ms']} ms ({summary['modules']} modules)")
+        for name, ms in summary.get("import_profile_ms", {}).items():
+            print(f"          {name:<24} {ms:>7.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""API throughput – Flask development server vs the production gunicorn setup.
+
+Seeds a throw-away database, then serves it first with the single-process
+development server and then with ``gunicorn -c gunicorn.conf.py wsgi:app``
+(each as a subprocess on a local port, import worker off).  Client threads
+hit the read endpoints over HTTP for a fixed time; reports requests/s,
+latency percentiles and errors for both servers.
+
+    cd backend
+    python -m bench.throughput --clients 32 --seconds 15 --processes 4 --threads 4
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from bench.mixed_rw import READ_PATHS, _fake_txns, _summary
+
+_DEV_SERVER = (
+    "import sys; from app import create_app; "
+    "create_app(with_worker=False).run(host='127.0.0.1', port=int(sys.argv[1].rsplit(':', 1)[1]), threaded=True)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32, help="concurrent client threads")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=4, help="gunicorn processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per process")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+    os.environ["START_WORKER"] = "0"
+
+    from app import create_app
+    from src.imports.persist import save_transactions
+
+    client = create_app().test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id = reg.get_json()["user_id"]
+    for start in range(0, args.seed_rows, 5000):
+        save_transactions(user_id, None, 1, _fake_txns(min(5000, args.seed_rows - start)))
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+
+    def run(cmd: list[str], env: dict) -> dict:
+        """Serve with *cmd* (``{bind}`` is replaced by host:port) and load it."""
+        bind = f"127.0.0.1:{_free_port()}"
+        base = f"http://{bind}"
+        proc = subprocess.Popen([arg.replace("{bind}", bind) for arg in cmd],
+                                env={**os.environ, **env},
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_ready(f"{base}/api/health", proc)
+            stop = threading.Event()
+            samples: list[float] = []
+            errors = [0]
+            lock = threading.Lock()
+
+            def worker(offset: int):
+                session = requests.Session()
+                i = offset
+                while not stop.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        ok = session.get(base + READ_PATHS[i % len(READ_PATHS)], headers=headers).ok
+                    except requests.RequestException:
+                        ok = False
+                    elapsed = time.perf_counter() - t0
+                    i += 1
+                    with lock:
+                        if ok:
+                            samples.append(elapsed)
+                        else:
+                            errors[0] += 1
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.clients)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for t in threads:
+                t.join()
+            return {**_summary(samples, time.perf_counter() - started), "errors": errors[0]}
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    result = {
+        "clients": args.clients,
+        "seed_rows": args.seed_rows,
+        "dev": run([sys.executable, "-c", _DEV_SERVER, "{bind}"], {}),
+        "gunicorn": {
+            "processes": args.processes,
+            "threads": args.threads,
+            **run([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", "{bind}", "wsgi:app"],
+                  {"WEB_PROCESSES": str(args.processes), "WEB_THREADS": str(args.threads)}),
+        },
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Instrumentation overhead – request latency with SQL tracing and route metrics off vs on.
+
+Seeds a throw-away database, then times the list and analytics endpoints
+through the test client with ``SQL_TRACE`` / ``ROUTE_METRICS`` off and on
+(the analytics response cache is disabled so every request runs its SQL).
+The slow-query threshold is raised so logging does not skew the result.
+
+    cd backend
+    python -m bench.tracing --seed-rows 20000 --requests 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from bench.mixed_rw import READ_PATHS, _fake_txns, _summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint and mode")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="hk-bench-")
+    os.environ.setdefault("DATABASE_PATH", os.path.join(tmp, "bench.db"))
+    os.environ.setdefault("USER_DB_DIR", os.path.join(tmp, "user_dbs"))
+    os.environ["ANALYTICS_CACHE_MAX_BYTES"] = "0"
+
+    from app import create_app
+    from config import Config
+    from src.imports.persist import save_transactions
+
+    Config.SLOW_QUERY_MS = float("inf")
+    client = create_app(with_worker=False).test_client()
+    reg = client.post("/api/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+    user_id = reg.get_json()["user_id"]
+    for start in range(0, args.seed_rows, 5000):
+        save_transactions(user_id, None, 1, _fake_txns(min(5000, args.seed_rows - start)))
+    headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+
+    def run(enabled: bool) -> dict:
+        Config.SQL_TRACE = Config.ROUTE_METRICS = enabled
+        samples = []
+        started = time.perf_counter()
+        for i in range(args.requests * len(READ_PATHS)):
+            t0 = time.perf_counter()
+            client.get(READ_PATHS[i % len(READ_PATHS)], headers=headers)
+            samples.append(time.perf_counter() - t0)
+        return _summary(samples, time.perf_counter() - started)
+
+    run(False)                                          # warm-up
+    off, on = run(False), run(True)
+    result = {
+        "seed_rows": args.seed_rows,
+        "off": off,
+        "on": on,
+        "p50_overhead_pct": round((on["p50_ms"] / off["p50_ms"] - 1) * 100, 1),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,23 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-me")
     DATABASE_PATH = os.getenv("DATABASE_PATH", "hisabkitab.db")
+
+    # Storage: "shared" (one database) or "per_user" (catalog + one file per user)
+    STORAGE_MODE = os.getenv("STORAGE_MODE", "shared")
+    USER_DB_DIR = os.getenv("USER_DB_DIR", "user_dbs")
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
     CONVERTED_IMAGES_FOLDER = os.getenv("CONVERTED_IMAGES_FOLDER", "converted_images")
 
+    # Stored uploads and page images (src/imports/artifacts.py): page images
+    # are dropped once their job completed ("failed"), finished ("none") or
+    # never ("all"); PDFs UPLOAD_RETENTION_DAYS after completion (0 = keep).
+    # The worker's garbage collector runs every ARTIFACT_GC_INTERVAL seconds
+    # (0 = off) and spares files younger than ARTIFACT_GC_GRACE seconds
+    PAGE_IMAGE_RETENTION = os.getenv("PAGE_IMAGE_RETENTION", "failed")
+    UPLOAD_RETENTION_DAYS = int(os.getenv("UPLOAD_RETENTION_DAYS", "0"))
+    ARTIFACT_GC_INTERVAL = int(os.getenv("ARTIFACT_GC_INTERVAL", "600"))
+    ARTIFACT_GC_GRACE = int(os.getenv("ARTIFACT_GC_GRACE", "900"))
+
     # LLM backend
     LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")  # "ollama" or "lmstudio"
 
@@ -21,8 +35,73 @@ class Config:
     LMSTUDIO_BASE_URL = os.getenv("LMSTUDIO_BASE_URL", "http://localhost:1234")
     LMSTUDIO_MODEL = os.getenv("LMSTUDIO_MODEL", "local-model")
 
-    # Worker
+    # Worker: START_WORKER runs it inside the web process (development);
+    # production sets it to 0 and runs `python -m src.imports.worker`
     WORKER_POLL_INTERVAL = int(os.getenv("WORKER_POLL_INTERVAL", "2"))
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+    START_WORKER = os.getenv("START_WORKER", "1").lower() not in ("0", "false", "no")
+
+    # Production web server (gunicorn.conf.py): processes (0 = 2 × CPUs + 1)
+    # and threads per process
+    WEB_PROCESSES = int(os.getenv("WEB_PROCESSES", "0"))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "4"))
+    WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:5000")
+
+    # /api/metrics (Prometheus): if set, scrapers must send "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # Opt-in instrumentation: SQL_TRACE times every statement (slow ones are
+    # logged with their query plan), ROUTE_METRICS adds per-route latency
+    # histograms to /api/metrics
+    SQL_TRACE = os.getenv("SQL_TRACE", "0").lower() in ("1", "true", "yes")
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    ROUTE_METRICS = os.getenv("ROUTE_METRICS", "0").lower() in ("1", "true", "yes")
+
+    # Serialised DB writer: max writes per group commit, and how long (ms)
+    # the writer waits for more writes before committing a batch
+    WRITER_BATCH_MAX = int(os.getenv("WRITER_BATCH_MAX", "64"))
+    WRITER_GROUP_COMMIT_MS = float(os.getenv("WRITER_GROUP_COMMIT_MS", "2"))
+    # The writer is per process: how long (ms) one waits for another
+    # process's write lock, and how many more times it tries before failing
+    WRITER_BUSY_TIMEOUT_MS = int(os.getenv("WRITER_BUSY_TIMEOUT_MS", "5000"))
+    WRITER_LOCK_RETRIES = int(os.getenv("WRITER_LOCK_RETRIES", "3"))
+
+    # Analytics response cache size in bytes (0 disables caching; ETags still apply)
+    ANALYTICS_CACHE_MAX_BYTES = int(os.getenv("ANALYTICS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # Users whose transactions stay loaded as NumPy arrays for /api/analytics/stats/*
+    COLUMNAR_CACHE_USERS = int(os.getenv("COLUMNAR_CACHE_USERS", "32"))
+
+    # Budget alerts: percentages of a budget that raise an event when crossed
+    BUDGET_ALERT_THRESHOLDS = os.getenv("BUDGET_ALERT_THRESHOLDS", "80,100")
+
+    # Analytics totals are reported in this currency (see src/fx/rates.py)
+    BASE_CURRENCY = os.getenv("BASE_CURRENCY", "USD").upper()
 
     # JWT
     JWT_EXPIRY_HOURS = 24
+
+    # Auth caches, one per process: verified tokens (kept until exp, at most
+    # TTL seconds) and user profiles (TTL also bounds how long another
+    # process honours a revoked token; 0 = no profile cache, so revocation
+    # is immediate everywhere)
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+    AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+    AUTH_PROFILE_CACHE_SIZE = int(os.getenv("AUTH_PROFILE_CACHE_SIZE", "1024"))
+    AUTH_PROFILE_CACHE_TTL = int(os.getenv("AUTH_PROFILE_CACHE_TTL", "30"))
+
+    # Password hashing pool: concurrent hashes, and how many more may wait
+    # before login / register answer 503 (KDF_WORKERS=0 hashes inline)
+    KDF_WORKERS = int(os.getenv("KDF_WORKERS", "2"))
+    KDF_QUEUE_MAX = int(os.getenv("KDF_QUEUE_MAX", "16"))
+
+    # Login throttling within a sliding window (seconds): failed logins per
+    # account, password attempts (login + register) per client IP.  Counted
+    # per process, so the effective limits are multiplied by WEB_PROCESSES
+    LOGIN_THROTTLE_WINDOW = int(os.getenv("LOGIN_THROTTLE_WINDOW", "300"))
+    LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+    LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "30"))
+    # Reverse proxies in front of the app that append X-Forwarded-For /
+    # X-Forwarded-Proto (0 = none: the client IP is the socket peer).  Only
+    # count proxies you run, or clients can pick their own IP for the throttle
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", "0"))
@@ -0,0 +1,35 @@
+"""Gunicorn settings – several processes, each with a pool of threads.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Processes share only the database.  Everything else is per process:
+
+* the writer thread – writes are serialised within a process; across
+  processes they wait on SQLite's lock (``WRITER_BUSY_TIMEOUT_MS``,
+  ``WRITER_LOCK_RETRIES``);
+* the token and profile caches – another process honours a revoked token
+  for up to ``AUTH_PROFILE_CACHE_TTL`` seconds;
+* the login throttles – effective limits are ``workers`` times the
+  configured ones;
+* the analytics response and columnar caches – keyed on the data
+  version, so never stale, but memory is paid once per process;
+* in-flight gauges and route histograms in ``/api/metrics``.
+
+``WEB_PROCESSES=1`` with more ``WEB_THREADS`` keeps all of it in one place.
+"""
+
+import multiprocessing
+
+from config import Config
+
+bind = Config.WEB_BIND
+workers = Config.WEB_PROCESSES or multiprocessing.cpu_count() * 2 + 1
+worker_class = "gthread"
+threads = Config.WEB_THREADS
+timeout = 120               # PDF uploads on slow links
+
+
+def on_starting(server):
+    """Migrate once in the master, before forking, so workers never race on it."""
+    from src.db.connection import init_db
+    init_db()
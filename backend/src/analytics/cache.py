@@ -0,0 +1,172 @@
+"""Versioned response cache for analytics endpoints.
+
+Responses are cached per (user, data version, path + query) in an LRU
+bounded by ``Config.ANALYTICS_CACHE_MAX_BYTES``.  The key includes the
+user's data version (``src.db.versions``), so writes never invalidate
+anything explicitly – the next request simply misses.  The same key is
+hashed into the ETag, letting browsers revalidate with If-None-Match and
+get a 304 without the body being rebuilt or resent.
+
+Streamed responses (``src.api.streaming``) are passed through chunk by
+chunk on a miss; the chunks are kept as they go out and stored once the
+body is complete, unless it outgrows the cache or the client goes away.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, g, make_response, request
+
+from config import Config
+from src.db.versions import data_version
+
+_ENTRY_OVERHEAD = 200       # rough bytes per entry for key, headers and bookkeeping
+
+
+class ResponseCache:
+    """Thread-safe LRU of response bodies, bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self._by_user: dict[int, set[tuple]] = {}
+        self._latest: dict[int, int] = {}      # user → newest version stored
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = 0
+
+    def get(self, key: tuple) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def put(self, key: tuple, body: bytes, mimetype: str):
+        size = len(body) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        user_id, version = key[0], key[1]
+        with self._lock:
+            if version > self._latest.get(user_id, -1):
+                # Entries for older versions can never be hit again
+                self._latest[user_id] = version
+                for old in [k for k in self._by_user.get(user_id, ()) if k[1] < version]:
+                    self._drop(old)
+            elif version < self._latest[user_id]:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (body, mimetype)
+            self._by_user.setdefault(user_id, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple):
+        body, _ = self._entries.pop(key)
+        self._bytes -= len(body) + _ENTRY_OVERHEAD
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+                self._latest.pop(key[0], None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._latest.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+response_cache = ResponseCache(Config.ANALYTICS_CACHE_MAX_BYTES)
+
+
+def _cache_key(user_id: int) -> tuple:
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return (user_id, data_version(user_id), f"{request.path}?{query}")
+
+
+class _StoreWhenSent:
+    """Response body passing *chunks* through and caching them once all were sent."""
+
+    def __init__(self, key: tuple, chunks, mimetype: str):
+        self.key, self.chunks, self.mimetype = key, chunks, mimetype
+
+    def __iter__(self):
+        kept, size = [], 0
+        for chunk in self.chunks:
+            yield chunk
+            if kept is not None:
+                size += len(chunk)
+                if size + _ENTRY_OVERHEAD > response_cache.max_bytes:
+                    kept = None                 # too big to cache; stop holding on to it
+                else:
+                    kept.append(chunk)
+        if kept is not None:
+            response_cache.put(self.key, b"".join(kept), self.mimetype)
+
+    def close(self):
+        """Called by the server when the response ends, also if the client went away."""
+        close = getattr(self.chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def cached_response(view):
+    """
+    Serve a GET view from ``response_cache`` with ETag / 304 support.
+    Use below ``login_required`` – the key needs ``g.user_id``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = _cache_key(g.user_id)
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()[:32]
+
+        if request.if_none_match.contains(etag):
+            response_cache.record_not_modified()
+            resp = Response(status=304)
+        else:
+            entry = response_cache.get(key)
+            if entry is not None:
+                resp = Response(entry[0], mimetype=entry[1])
+                resp.headers["X-Cache"] = "HIT"
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                if resp.is_streamed:
+                    resp.response = _StoreWhenSent(key, resp.response, resp.mimetype)
+                else:
+                    response_cache.put(key, resp.get_data(), resp.mimetype)
+                resp.headers["X-Cache"] = "MISS"
+
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+    return wrapper
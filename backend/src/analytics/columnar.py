@@ -0,0 +1,225 @@
+"""In-memory columnar view of a user's transactions (optional – needs NumPy).
+
+``load_frame`` reads a user's transactions once into NumPy arrays and keeps
+them in a small LRU keyed on the user's data version (``src.db.versions``),
+so any write makes the next call reload.  The statistics below run
+vectorised over those arrays instead of issuing another SQL scan each.
+
+NumPy is imported by the first ``available()`` call rather than with the
+module, so processes that never serve these endpoints skip loading it.
+Without NumPy installed ``available()`` is False and the stats endpoints
+answer 501; nothing else depends on this module.
+"""
+
+import operator
+import threading
+from collections import OrderedDict
+
+from config import Config
+from src.db.connection import get_read_db
+from src.db.versions import data_version
+from src.transactions.codec import MINOR_UNITS, type_code
+from src.transactions.filters import coerce_filter
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_EPOCH_WEEKDAY = 3              # 1970-01-01 was a Thursday
+
+# List filters a frame cannot apply – text matching needs SQL
+_TEXT_FILTERS = ("merchant", "search")
+
+# The others: (filter key, frame column, comparison)
+_NUMERIC_FILTERS = (
+    ("category_id", "category_id", operator.eq),
+    ("merchant_id", "merchant_id", operator.eq),
+    ("date_from", "day", operator.ge),
+    ("date_to", "day", operator.le),
+    ("amount_min", "amount", operator.ge),
+    ("amount_max", "amount", operator.le),
+)
+
+np = None                       # set by available()
+_numpy_checked = False
+
+_frames: "OrderedDict[tuple[str, int], tuple[int, Frame]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def available() -> bool:
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy as np
+        except ImportError:     # optional dependency
+            np = None
+        _numpy_checked = True
+    return np is not None
+
+
+class Frame:
+    """One user's transactions as parallel arrays, ordered by day."""
+
+    __slots__ = ("id", "day", "amount", "type_code", "category_id", "merchant_id")
+
+    def __init__(self, rows: list[tuple]):
+        cols = np.array(rows, dtype=np.int64).reshape(-1, 6).T
+        self.id = cols[0]
+        self.day = cols[1].astype(np.int32)
+        self.amount = cols[2]                           # minor units, base currency
+        self.type_code = cols[3].astype(np.int8)
+        self.category_id = cols[4].astype(np.int32)     # 0 = uncategorised
+        self.merchant_id = cols[5].astype(np.int32)     # 0 = no merchant
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def select(self, args) -> "np.ndarray":
+        """
+        Boolean mask for the transaction list filters in *args*.
+        Raises ValueError for text filters, which only SQL can answer, and
+        ``FilterError`` (a ValueError) for malformed values.
+        """
+        for key in _TEXT_FILTERS:
+            if args.get(key):
+                raise ValueError(f"Filter '{key}' is not supported here")
+        mask = np.ones(len(self), dtype=bool)
+        if args.get("txn_type") and type_code(args["txn_type"]) is not None:
+            mask &= self.type_code == type_code(args["txn_type"])
+        for key, column, keep in _NUMERIC_FILTERS:
+            if args.get(key):
+                mask &= keep(getattr(self, column), coerce_filter(key, args[key]))
+        return mask
+
+
+def load_frame(user_id: int) -> Frame:
+    """Return the cached frame for *user_id*, reloading it if their data changed."""
+    db = get_read_db(user_id)
+    try:
+        # Version first: a write landing in between only costs a reload later
+        version = data_version(user_id, db)
+        key = (db.path, user_id)
+        with _lock:
+            hit = _frames.get(key)
+            if hit is not None and hit[0] == version:
+                _frames.move_to_end(key)
+                return hit[1]
+        frame = Frame(db.execute(
+            """SELECT id, day, base_amount_minor, type_code,
+                      COALESCE(category_id, 0), COALESCE(merchant_id, 0)
+               FROM transactions
+               WHERE user_id = ? AND base_amount_minor IS NOT NULL
+               ORDER BY day, id""",
+            (user_id,),
+        ).fetchall())
+    finally:
+        db.close()
+
+    with _lock:
+        _frames[key] = (version, frame)
+        _frames.move_to_end(key)
+        while len(_frames) > Config.COLUMNAR_CACHE_USERS:
+            _frames.popitem(last=False)
+    return frame
+
+
+def clear_frames():
+    with _lock:
+        _frames.clear()
+
+
+def frame_stats() -> dict:
+    with _lock:
+        return {
+            "users": len(_frames),
+            "rows": sum(len(f) for _, f in _frames.values()),
+            "bytes": sum(f.nbytes for _, f in _frames.values()),
+        }
+
+
+# ── Statistics ──────────────────────────────────────
+
+def rolling_daily(frame: Frame, mask, window: int) -> dict:
+    """
+    Daily totals over the selected rows (days without transactions count
+    as 0) and their trailing *window*-day average.
+    """
+    day, amount = frame.day[mask], frame.amount[mask]
+    if not len(day):
+        return {"start_day": None, "totals": [], "rolling": []}
+    start = int(day.min())
+    totals = np.bincount(day - start, weights=amount)
+    csum = np.concatenate(([0.0], np.cumsum(totals)))
+    idx = np.arange(len(totals))
+    lo = np.maximum(idx + 1 - window, 0)
+    rolling = (csum[idx + 1] - csum[lo]) / (idx + 1 - lo)
+    return {
+        "start_day": start,
+        "totals": (totals / MINOR_UNITS).round(2).tolist(),
+        "rolling": (rolling / MINOR_UNITS).round(2).tolist(),
+    }
+
+
+def percentiles(frame: Frame, mask, qs: list[float]) -> dict:
+    """Amount percentiles overall and per category."""
+    amount, category = frame.amount[mask], frame.category_id[mask]
+    if not len(amount):
+        return {"overall": None, "by_category": []}
+
+    def _pcts(values):
+        return dict(zip((f"p{q:g}" for q in qs),
+                        (np.percentile(values, qs) / MINOR_UNITS).round(2).tolist()))
+
+    order = np.argsort(category, kind="stable")
+    amount, category = amount[order], category[order]
+    cats, starts, counts = np.unique(category, return_index=True, return_counts=True)
+    by_category = [
+        {"category_id": int(c), "count": int(n), **_pcts(amount[s:s + n])}
+        for c, s, n in zip(cats, starts, counts)
+    ]
+    return {"overall": {"count": int(len(amount)), **_pcts(amount)}, "by_category": by_category}
+
+
+def weekday_totals(frame: Frame, mask) -> list[dict]:
+    """Total, count and average amount per weekday (Mon first)."""
+    weekday = (frame.day[mask] + _EPOCH_WEEKDAY) % 7
+    totals = np.bincount(weekday, weights=frame.amount[mask], minlength=7)
+    counts = np.bincount(weekday, minlength=7)
+    averages = np.divide(totals, counts, out=np.zeros(7), where=counts > 0)
+    return [
+        {"weekday": WEEKDAYS[i], "total": round(totals[i] / MINOR_UNITS, 2),
+         "count": int(counts[i]), "average": round(averages[i] / MINOR_UNITS, 2)}
+        for i in range(7)
+    ]
+
+
+def outliers(frame: Frame, mask, threshold: float, limit: int) -> list[dict]:
+    """
+    Transactions far from their category's usual amount, by robust z-score
+    (distance from the category median in units of its scaled MAD).
+    Returns ``{id, category_id, score, median}`` sorted by score, highest first.
+    """
+    ids, amount, category = frame.id[mask], frame.amount[mask], frame.category_id[mask]
+    if not len(ids):
+        return []
+    cats, inverse = np.unique(category, return_inverse=True)
+    medians = np.empty(len(cats))
+    mads = np.empty(len(cats))
+    for i in range(len(cats)):
+        values = amount[inverse == i]
+        medians[i] = np.median(values)
+        mads[i] = np.median(np.abs(values - medians[i]))
+
+    mad = mads[inverse]
+    score = np.divide(0.6745 * np.abs(amount - medians[inverse]), mad,
+                      out=np.zeros(len(amount)), where=mad > 0)
+    hits = np.flatnonzero(score > threshold)
+    hits = hits[np.argsort(-score[hits], kind="stable")][:limit]
+    return [
+        {"id": int(ids[i]), "category_id": int(category[i]),
+         "score": round(float(score[i]), 2),
+         "median": round(medians[inverse[i]] / MINOR_UNITS, 2)}
+        for i in hits
+    ]
@@ -0,0 +1,87 @@
+"""Trigger-maintained tables derived from ``transactions`` – rebuild,
+consistency check and command line, shared by the monthly rollup and the
+daily ledger.
+
+A ``DerivedTable`` names the table, its columns and the raw recompute: a
+SELECT over ``transactions`` producing the same columns, with a
+``{where}`` placeholder (possibly repeated) for the user scope.
+"""
+
+import argparse
+
+from src.db.connection import get_read_db, init_db, user_ids_with_data
+from src.db.writer import run_write
+
+
+class DerivedTable:
+    def __init__(self, table: str, label: str, columns: str, raw_sql: str):
+        self.table = table
+        self.label = label              # log prefix, and ``source`` tag in check results
+        self.columns = columns
+        self.raw_sql = raw_sql
+
+    @staticmethod
+    def _scope(user_id: int | None) -> tuple[str, list]:
+        return ("user_id = ?", [user_id]) if user_id is not None else ("1 = 1", [])
+
+    def _raw(self, user_id: int | None) -> tuple[str, list]:
+        where, params = self._scope(user_id)
+        return self.raw_sql.format(where=where), params * self.raw_sql.count("{where}")
+
+    def rebuild(self, user_id: int | None = None, shard: int | None = None) -> int:
+        """
+        Recompute the table for *user_id* (or everyone).  Returns rows written.
+        *shard* picks the database in per-user mode (defaults to *user_id*).
+        """
+        where, params = self._scope(user_id)
+        raw, raw_params = self._raw(user_id)
+
+        def _write(db) -> int:
+            db.execute(f"DELETE FROM {self.table} WHERE {where}", params)
+            return db.execute(f"INSERT INTO {self.table} ({self.columns}) {raw}", raw_params).rowcount
+
+        return run_write(_write, shard if shard is not None else user_id)
+
+    def check(self, user_id: int | None = None, shard: int | None = None) -> list[dict]:
+        """
+        Compare the stored table with a raw recompute.  Returns the differing
+        rows, tagged ``source`` = the table's label (lower case) or 'raw'.
+        *shard* picks the database in per-user mode (defaults to *user_id*).
+        """
+        where, params = self._scope(user_id)
+        raw, raw_params = self._raw(user_id)
+        stored = f"SELECT {self.columns} FROM {self.table} WHERE {where}"
+        db = get_read_db(shard if shard is not None else user_id)
+        try:
+            rows = db.execute(
+                f"""SELECT '{self.label.lower()}' AS source, * FROM ({stored} EXCEPT SELECT * FROM ({raw}))
+                    UNION ALL
+                    SELECT 'raw' AS source, * FROM (SELECT * FROM ({raw}) EXCEPT {stored})""",
+                params + raw_params + raw_params + params,
+            ).fetchall()
+            return [dict(r) for r in rows]
+        finally:
+            db.close()
+
+    def main(self, description: str) -> int:
+        """``check`` / ``rebuild [--user ID]`` over every database; exit status 1 on mismatches."""
+        parser = argparse.ArgumentParser(description=description)
+        parser.add_argument("command", choices=("check", "rebuild"))
+        parser.add_argument("--user", type=int, help="only this user (default: everyone)")
+        args = parser.parse_args()
+
+        init_db()
+        status = 0
+        for shard in user_ids_with_data():
+            if args.user is not None and shard is not None and shard != args.user:
+                continue
+            label = "shared database" if shard is None else f"user {shard}"
+            if args.command == "rebuild":
+                print(f"[{self.label}] {label}: rebuilt {self.rebuild(args.user, shard)} rows")
+            else:
+                diffs = self.check(args.user, shard)
+                for d in diffs:
+                    print(f"[{self.label}] {label}: mismatch {d}")
+                print(f"[{self.label}] {label}: {'OK' if not diffs else f'{len(diffs)} mismatched rows'}")
+                status = status or (1 if diffs else 0)
+        return status
@@ -0,0 +1,182 @@
+"""Daily ledger – range totals, running balance, rebuild and consistency check.
+
+``daily_ledger`` (migration 017, trigger-maintained) holds each day's
+base-currency credits and debits per (user, day, category), so a write
+only adjusts the row of its own day.  A date range's totals are the whole
+months inside it, read from ``monthly_rollup``, plus the days at either
+end read from the ledger: at most a month's rows on each side, however
+long the range or the history.
+
+    python -m src.analytics.ledger check   [--user ID]
+    python -m src.analytics.ledger rebuild [--user ID]
+"""
+
+import datetime
+
+from src.analytics.derived import DerivedTable
+from src.transactions.codec import from_day, to_day
+from src.transactions.filters import FILTER_KEYS
+
+ALL_CATEGORIES = -1
+_END_OF_TIME = 2 ** 31
+_NO_DAYS = (1, 0)               # BETWEEN bounds that match nothing
+_NO_MONTHS = (1, 0)
+
+# Raw recompute of the ledger rows (optionally for one user)
+_RAW_LEDGER_SQL = """
+    SELECT user_id, day, COALESCE(category_id, 0) AS category_id, COUNT(*) AS day_count,
+           SUM(IIF(type_code = 1, COALESCE(base_amount_minor, 0), 0)) AS credit_minor,
+           SUM(IIF(type_code = 0, COALESCE(base_amount_minor, 0), 0)) AS debit_minor,
+           SUM(type_code = 1 AND base_amount_minor IS NOT NULL) AS credit_count,
+           SUM(type_code = 0 AND base_amount_minor IS NOT NULL) AS debit_count
+    FROM transactions
+    WHERE {where}
+    GROUP BY user_id, day, COALESCE(category_id, 0)
+"""
+
+# Totals per category between :first and :last (inclusive): whole months
+# from the rollup, the partial months at either end from the ledger
+_RANGE_ROWS_SQL = """
+    SELECT category_id,
+           IIF(type_code = 1, base_total_minor, 0) AS credit_minor,
+           IIF(type_code = 0, base_total_minor, 0) AS debit_minor,
+           IIF(type_code = 1, base_count, 0) AS credit_count,
+           IIF(type_code = 0, base_count, 0) AS debit_count
+    FROM monthly_rollup
+    WHERE user_id = :user AND month BETWEEN :month_first AND :month_last
+    UNION ALL
+    SELECT category_id, credit_minor, debit_minor, credit_count, debit_count
+    FROM daily_ledger
+    WHERE user_id = :user AND day BETWEEN :head_first AND :head_last
+    UNION ALL
+    SELECT category_id, credit_minor, debit_minor, credit_count, debit_count
+    FROM daily_ledger
+    WHERE user_id = :user AND day BETWEEN :tail_first AND :tail_last
+"""
+
+LEDGER = DerivedTable(
+    "daily_ledger", "Ledger",
+    "user_id, day, category_id, day_count, credit_minor, debit_minor, credit_count, debit_count",
+    _RAW_LEDGER_SQL,
+)
+rebuild_ledger = LEDGER.rebuild
+check_ledger = LEDGER.check
+
+
+def range_sql(per_category: bool) -> str:
+    """
+    A ``WITH`` clause defining ``ledger(category_id, credit_minor,
+    debit_minor, credit_count, debit_count)`` for the named params of
+    ``range_params``.  Without *per_category* it is one row for all
+    categories (``category_id`` = ``ALL_CATEGORIES``).
+    """
+    key, group = ("category_id", " GROUP BY category_id") if per_category else (str(ALL_CATEGORIES), "")
+    return f"""WITH ledger AS (
+        SELECT {key} AS category_id,
+               COALESCE(SUM(credit_minor), 0) AS credit_minor, COALESCE(SUM(debit_minor), 0) AS debit_minor,
+               COALESCE(SUM(credit_count), 0) AS credit_count, COALESCE(SUM(debit_count), 0) AS debit_count
+        FROM ({_RANGE_ROWS_SQL}){group})"""
+
+
+def _month_key(d: datetime.date) -> int:
+    return d.year * 100 + d.month
+
+
+def _month_start(d: datetime.date) -> datetime.date:
+    return d.replace(day=1)
+
+
+def _next_month(d: datetime.date) -> datetime.date:
+    return (d.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def range_params(user_id: int, days: tuple[int | None, int | None]) -> dict:
+    """
+    Named params for ``range_sql``: ``:user``, the inclusive day bounds
+    ``:first`` / ``:last`` (None = open), and their split into the whole
+    months inside the range plus head and tail day ranges around them.
+    """
+    first, last = days
+    month_first, month_last = 0, 999999
+    head, tail = _NO_DAYS, _NO_DAYS
+    if first is not None:
+        d = datetime.date.fromisoformat(from_day(first))
+        if d.day == 1:
+            month_first = _month_key(d)
+        else:
+            start = _next_month(d)
+            month_first = _month_key(start)
+            head = (first, to_day(start.isoformat()) - 1)
+    if last is not None:
+        d = datetime.date.fromisoformat(from_day(last))
+        end = _next_month(d)
+        if (end - d).days == 1:
+            month_last = _month_key(d)
+        else:
+            month_last = _month_key(_month_start(d) - datetime.timedelta(days=1))
+            tail = (to_day(_month_start(d).isoformat()), last)
+    if month_first > month_last:
+        # No whole month inside: the whole range is read day by day
+        (month_first, month_last), head, tail = _NO_MONTHS, (first, last), _NO_DAYS
+    return {
+        "user": user_id,
+        "first": first if first is not None else -_END_OF_TIME,
+        "last": last if last is not None else _END_OF_TIME,
+        "month_first": month_first, "month_last": month_last,
+        "head_first": head[0], "head_last": head[1],
+        "tail_first": tail[0], "tail_last": tail[1],
+    }
+
+
+def ledger_days(args, allowed: tuple[str, ...] = ()) -> tuple[int | None, int | None] | None:
+    """
+    If a request's filters can be answered from the ledger, return the
+    ``(day_from, day_to)`` bounds (None = open); otherwise None.
+
+    That is the case when the only filters are *allowed* keys plus
+    ``date_from`` / ``date_to``.
+    """
+    for key in FILTER_KEYS:
+        if args.get(key) and key not in allowed + ("date_from", "date_to"):
+            return None
+    try:
+        return (
+            to_day(args["date_from"]) if args.get("date_from") else None,
+            to_day(args["date_to"]) if args.get("date_to") else None,
+        )
+    except ValueError:
+        return None
+
+
+def balance_series(db, user_id: int, days: tuple[int | None, int | None],
+                   category_id: int = ALL_CATEGORIES) -> tuple[int, list[dict]]:
+    """
+    ``(opening, points)``: the net (credits − debits) before the range, and
+    one ``{day, credit, debit, balance}`` point per active day in it, oldest
+    first, in minor units.
+    """
+    first = days[0]
+    category, category_params = ("", {}) if category_id == ALL_CATEGORIES else (
+        " AND category_id = :category", {"category": category_id})
+    opening = 0
+    if first is not None:
+        opening = db.execute(
+            f"{range_sql(per_category=True)} SELECT SUM(credit_minor - debit_minor) FROM ledger WHERE true{category}",
+            {**range_params(user_id, (None, first - 1)), **category_params},
+        ).fetchone()[0] or 0
+    rows = db.execute(
+        f"""SELECT day, SUM(credit_minor), SUM(debit_minor) FROM daily_ledger
+            WHERE user_id = :user AND day BETWEEN :first AND :last{category}
+            GROUP BY day
+            ORDER BY day""",
+        {**range_params(user_id, days), **category_params},
+    ).fetchall()
+    balance, points = opening, []
+    for day, credit, debit in rows:
+        balance += credit - debit
+        points.append({"day": day, "credit": credit, "debit": debit, "balance": balance})
+    return opening, points
+
+
+if __name__ == "__main__":
+    raise SystemExit(LEDGER.main("Rebuild or verify the daily ledger."))
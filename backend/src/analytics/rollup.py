@@ -0,0 +1,35 @@
+"""Monthly rollup – rebuild and consistency check.
+
+``monthly_rollup`` is maintained by triggers (migrations 005, 009 and 016);
+this module rebuilds it from scratch and compares it against a raw
+recompute (see ``src.analytics.derived``).
+
+    python -m src.analytics.rollup check   [--user ID]
+    python -m src.analytics.rollup rebuild [--user ID]
+"""
+
+from src.analytics.derived import DerivedTable
+
+# Raw recompute of the rollup rows (optionally for one user)
+_RAW_ROLLUP_SQL = """
+    SELECT user_id, month, COALESCE(category_id, 0) AS category_id, type_code,
+           COALESCE(currency, '') AS currency,
+           SUM(amount_minor) AS total_minor,
+           COALESCE(SUM(base_amount_minor), 0) AS base_total_minor, COUNT(*) AS txn_count,
+           COUNT(base_amount_minor) AS base_count
+    FROM transactions
+    WHERE {where}
+    GROUP BY user_id, month, COALESCE(category_id, 0), type_code, COALESCE(currency, '')
+"""
+
+ROLLUP = DerivedTable(
+    "monthly_rollup", "Rollup",
+    "user_id, month, category_id, type_code, currency, total_minor, base_total_minor, txn_count, base_count",
+    _RAW_ROLLUP_SQL,
+)
+rebuild_rollup = ROLLUP.rebuild
+check_rollup = ROLLUP.check
+
+
+if __name__ == "__main__":
+    raise SystemExit(ROLLUP.main("Rebuild or verify the monthly rollup."))
@@ -1,160 +1,500 @@
-"""Analytics blueprint – monthly trends, category split, merchant ranking, cashflow."""
+"""Analytics blueprint – monthly trends, category split, merchant ranking, cashflow.
 
-from flask import Blueprint, request, jsonify, g
+Totals are in ``BASE_CURRENCY``: queries sum the converted amount stored on
+each transaction (``base_amount_minor``) or its rollup (``base_total_minor``).
+Rows not yet converted (no FX rate) are left out of counts as well as
+totals, so a count always matches the total beside it.
+Row results are streamed with ``stream_query``; everything built in
+Python, errors included, goes out through ``json_response`` (both in
+``src.api.streaming``, with the same encoder).
+"""
 
+import json
+from functools import wraps
+
+from flask import Blueprint, request, g
+
+from config import Config
+from src.api.streaming import json_response, stream_query
 from src.auth.routes import login_required
-from src.db.connection import get_db
+from src.analytics import columnar
+from src.analytics.cache import cached_response
+from src.analytics.ledger import ALL_CATEGORIES, balance_series, ledger_days, range_params, range_sql
+from src.analytics.timeseries import BUCKETS, GROUPS, bucket_of, timeseries_query
+from src.db.connection import get_read_db
+from src.transactions.codec import (
+    CREDIT, DEBIT, api_columns, from_day, from_minor, from_month, sql_date, sql_money, sql_month, type_code,
+)
+from src.transactions.filters import FILTER_KEYS, FilterError, coerce_filter, compile_filters
 
 analytics_bp = Blueprint("analytics", __name__, url_prefix="/api/analytics")
 
 
+@analytics_bp.errorhandler(FilterError)
+def _bad_filter(e: FilterError):
+    return json_response({"error": str(e)}, 400)
+
+
 @analytics_bp.route("/monthly", methods=["GET"])
 @login_required
+@cached_response
 def monthly_totals():
     """
-    Monthly spending totals and trend.
+    Monthly spending totals and trend (served from the monthly rollup).
     Query params: months (int, default 12)
     Returns [{month, total_debit, total_credit, net}]
     """
-    months = min(int(request.args.get("months", 12)), 60)
-    db = get_db()
-    try:
-        rows = db.execute(
-            """SELECT strftime('%%Y-%%m', date) AS month,
-                      SUM(CASE WHEN txn_type='debit'  THEN amount ELSE 0 END) AS total_debit,
-                      SUM(CASE WHEN txn_type='credit'  THEN amount ELSE 0 END) AS total_credit,
-                      SUM(CASE WHEN txn_type='credit' THEN amount ELSE -amount END) AS net
-               FROM transactions
-               WHERE user_id = ?
-               GROUP BY month
-               ORDER BY month DESC
-               LIMIT ?""",
-            (g.user_id, months),
-        ).fetchall()
-        return jsonify([dict(r) for r in rows]), 200
-    finally:
-        db.close()
+    months = max(1, min(request.args.get("months", 12, type=int), 60))
+    return stream_query(
+        get_read_db(),
+        f"""SELECT {sql_month('r.month')} AS month,
+                   {sql_money(f"SUM(CASE WHEN r.type_code={DEBIT}  THEN r.base_total_minor ELSE 0 END)")} AS total_debit,
+                   {sql_money(f"SUM(CASE WHEN r.type_code={CREDIT} THEN r.base_total_minor ELSE 0 END)")} AS total_credit,
+                   {sql_money(f"SUM(CASE WHEN r.type_code={CREDIT} THEN r.base_total_minor ELSE -r.base_total_minor END)")} AS net
+            FROM monthly_rollup r
+            WHERE r.user_id = ?
+            GROUP BY r.month
+            ORDER BY r.month DESC
+            LIMIT ?""",
+        (g.user_id, months),
+    )
 
 
 @analytics_bp.route("/categories", methods=["GET"])
 @login_required
+@cached_response
 def category_breakdown():
     """
     Spending by category.
-    Query params: date_from, date_to, txn_type (debit|credit, default debit)
+    Query params: txn_type (debit|credit, default debit) plus the
+                  transaction list filters (date_from, date_to, merchant, …)
     Returns [{category_id, category_name, icon, color, total, count}]
     """
-    txn_type = request.args.get("txn_type", "debit")
-    clauses = ["t.user_id = ?", "t.txn_type = ?"]
-    params: list = [g.user_id, txn_type]
+    filters = request.args.to_dict()
+    filters.setdefault("txn_type", "debit")
+    code = type_code(filters["txn_type"])
+    if code is None:
+        return json_response({"error": "txn_type must be debit or credit"}, 400)
+
+    # Date ranges with no other filters: whole months from the rollup, the
+    # days either side from the daily ledger
+    days = ledger_days(filters, allowed=("txn_type",))
+    if days is not None:
+        total, count = {
+            DEBIT: ("l.debit_minor", "l.debit_count"),
+            CREDIT: ("l.credit_minor", "l.credit_count"),
+        }[code]
+        sql = f"""{range_sql(per_category=True)}
+                  SELECT COALESCE(c.id, 0) AS category_id,
+                         COALESCE(c.name, 'Uncategorised') AS category_name,
+                         c.icon, c.color,
+                         {sql_money(total)} AS total,
+                         {count} AS count
+                  FROM ledger l
+                  LEFT JOIN categories c ON c.id = l.category_id
+                  WHERE {count} > 0
+                  ORDER BY total DESC"""
+        params = range_params(g.user_id, days)
+    else:
+        where, params = compile_filters(filters, g.user_id)
+        sql = f"""SELECT COALESCE(c.id, 0) AS category_id,
+                         COALESCE(c.name, 'Uncategorised') AS category_name,
+                         c.icon, c.color,
+                         {sql_money("SUM(t.base_amount_minor)")} AS total,
+                         COUNT(t.base_amount_minor) AS count
+                  FROM transactions t
+                  LEFT JOIN categories c ON c.id = t.category_id
+                  WHERE {where}
+                  GROUP BY category_id
+                  HAVING count > 0
+                  ORDER BY total DESC"""
+
+    return stream_query(get_read_db(), sql, params)
+
+
+@analytics_bp.route("/merchants", methods=["GET"])
+@login_required
+@cached_response
+def merchant_ranking():
+    """
+    Top merchants by total spent.
+    Query params: limit (int, default 20) plus the transaction list
+                  filters except txn_type (date_from, date_to, …)
+    Returns [{merchant_id, merchant, total, count}] – grouped by canonical merchant
+    """
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    where, params = compile_filters(
+        request.args, g.user_id,
+        keys=tuple(k for k in FILTER_KEYS if k != "txn_type"),
+    )
+    where += f" AND t.type_code = {DEBIT} AND t.merchant_id IS NOT NULL"
 
-    date_from = request.args.get("date_from")
-    if date_from:
-        clauses.append("t.date >= ?")
-        params.append(date_from)
-    date_to = request.args.get("date_to")
-    if date_to:
-        clauses.append("t.date <= ?")
-        params.append(date_to)
+    return stream_query(
+        get_read_db(),
+        f"""SELECT r.merchant_id, m.name AS merchant,
+                   {sql_money("r.total")} AS total, r.count
+            FROM (SELECT t.merchant_id,
+                         SUM(t.base_amount_minor) AS total,
+                         COUNT(t.base_amount_minor) AS count
+                  FROM transactions t
+                  WHERE {where}
+                  GROUP BY t.merchant_id
+                  HAVING count > 0
+                  ORDER BY total DESC
+                  LIMIT ?) r
+            JOIN merchants m ON m.id = r.merchant_id
+            ORDER BY r.total DESC""",
+        params + [limit],
+    )
 
-    where = " AND ".join(clauses)
 
-    db = get_db()
+@analytics_bp.route("/cashflow", methods=["GET"])
+@login_required
+@cached_response
+def cashflow():
+    """
+    Income vs expense summary.
+    Query params: the transaction list filters (date_from, date_to, …)
+    Returns {total_income, total_expense, net, currency, period_from, period_to}
+    """
+    # Date ranges with no other filters: totals from the rollup and ledger,
+    # period bounds from two index seeks
+    days = ledger_days(request.args)
+    if days is not None:
+        sql = f"""{range_sql(per_category=False)}
+                SELECT
+                    {sql_money("l.credit_minor")} AS total_income,
+                    {sql_money("l.debit_minor")} AS total_expense,
+                    {sql_money("l.credit_minor - l.debit_minor")} AS net,
+                    {sql_date("(SELECT MIN(day) FROM transactions WHERE user_id = :user AND day BETWEEN :first AND :last)")} AS period_from,
+                    {sql_date("(SELECT MAX(day) FROM transactions WHERE user_id = :user AND day BETWEEN :first AND :last)")} AS period_to
+                FROM ledger l"""
+        params = range_params(g.user_id, days)
+    else:
+        where, params = compile_filters(request.args, g.user_id)
+        sql = f"""SELECT
+                    {sql_money(f"SUM(CASE WHEN t.type_code={CREDIT} THEN t.base_amount_minor ELSE 0 END)")} AS total_income,
+                    {sql_money(f"SUM(CASE WHEN t.type_code={DEBIT}  THEN t.base_amount_minor ELSE 0 END)")} AS total_expense,
+                    {sql_money(f"SUM(CASE WHEN t.type_code={CREDIT} THEN t.base_amount_minor ELSE -t.base_amount_minor END)")} AS net,
+                    {sql_date("MIN(t.day)")} AS period_from,
+                    {sql_date("MAX(t.day)")} AS period_to
+                FROM transactions t
+                WHERE {where}"""
+
+    db = get_read_db()
     try:
-        rows = db.execute(
-            f"""SELECT COALESCE(c.id, 0) AS category_id,
-                       COALESCE(c.name, 'Uncategorised') AS category_name,
-                       c.icon, c.color,
-                       SUM(t.amount) AS total,
-                       COUNT(*)       AS count
+        row = db.execute(sql, params).fetchone()
+        return json_response({**dict(row), "currency": Config.BASE_CURRENCY})
+    finally:
+        db.close()
+
+
+@analytics_bp.route("/balance", methods=["GET"])
+@login_required
+@cached_response
+def running_balance():
+    """
+    Running balance (all income minus all expense to date) per active day,
+    read from the daily ledger.
+    Query params: date_from, date_to, category_id (optional)
+    Returns {currency, opening_balance, points: [{date, income, expense, balance}]}
+    """
+    days = ledger_days(request.args, allowed=("category_id",))
+    if days is None:
+        return json_response({"error": "Only date_from, date_to and category_id filters are supported"}, 400)
+    raw_category = request.args.get("category_id")
+    category_id = coerce_filter("category_id", raw_category) if raw_category else ALL_CATEGORIES
+
+    db = get_read_db()
+    try:
+        opening, points = balance_series(db, g.user_id, days, category_id)
+    finally:
+        db.close()
+    return json_response({
+        "currency": Config.BASE_CURRENCY,
+        "opening_balance": from_minor(opening),
+        "points": [
+            {
+                "date": from_day(p["day"]),
+                "income": from_minor(p["credit"]),
+                "expense": from_minor(p["debit"]),
+                "balance": from_minor(p["balance"]),
+            }
+            for p in points
+        ],
+    })
+
+
+@analytics_bp.route("/timeseries", methods=["GET"])
+@login_required
+@cached_response
+def timeseries():
+    """
+    Totals per period, gap filled, with period-over-period change.
+    Query params: bucket    – day | week | month | quarter | year (default month)
+                  group_by  – category | merchant (optional; one series each)
+                  series    – max series when grouped, largest first (default 10)
+                  plus the transaction list filters (txn_type defaults to debit)
+    Returns {bucket, group_by, series: [{key, name, points: [{period, total,
+             count, change, change_pct}]}]}
+    """
+    bucket = request.args.get("bucket", "month")
+    group_by = request.args.get("group_by") or None
+    if bucket not in BUCKETS:
+        return json_response({"error": f"bucket must be one of {', '.join(BUCKETS)}"}, 400)
+    if group_by not in GROUPS:
+        return json_response({"error": "group_by must be category or merchant"}, 400)
+    limit = max(1, min(request.args.get("series", 10, type=int), 50))
+
+    filters = request.args.to_dict()
+    filters.setdefault("txn_type", "debit")
+    if type_code(filters["txn_type"]) is None:
+        return json_response({"error": "txn_type must be debit or credit"}, 400)
+    where, params = compile_filters(filters, g.user_id)      # validates date_from / date_to for bucket_of
+    first = bucket_of(bucket, filters["date_from"]) if filters.get("date_from") else None
+    last = bucket_of(bucket, filters["date_to"]) if filters.get("date_to") else None
+    sql, params = timeseries_query(bucket, group_by, where, params, first, last, limit)
+
+    db = get_read_db()
+    try:
+        rows = db.execute(sql, params).fetchall()
+    finally:
+        db.close()
+
+    series: dict[int, dict] = {}
+    for r in rows:
+        s = series.setdefault(r["series"], {"key": r["series"], "name": r["name"], "points": []})
+        prev = r["previous"]
+        s["points"].append({
+            "period": r["period"],
+            "total": from_minor(r["total"]),
+            "count": r["count"],
+            "change": from_minor(r["total"] - prev) if prev is not None else None,
+            "change_pct": round((r["total"] - prev) * 100 / prev, 2) if prev else None,
+        })
+    if group_by is None:
+        for s in series.values():
+            del s["key"], s["name"]
+    return json_response({"bucket": bucket, "group_by": group_by, "series": list(series.values())})
+
+
+@analytics_bp.route("/summary", methods=["GET"])
+@login_required
+@cached_response
+def summary():
+    """
+    Everything the dashboard shows, from one connection.
+    Query params: recent (default 10), months (default 6), top (default 5)
+    Returns {cashflow, monthly, top_categories, recent_transactions} – each
+    shaped like the corresponding endpoint's response.
+
+    Cashflow, the monthly trend and top categories all come from a single
+    pass over the user's rollup rows; recent transactions and the period
+    bounds are index range scans on (user_id, day).
+    """
+    recent = max(1, min(request.args.get("recent", 10, type=int), 50))
+    months = max(1, min(request.args.get("months", 6, type=int), 60))
+    top = max(1, min(request.args.get("top", 5, type=int), 50))
+
+    db = get_read_db()
+    try:
+        rollup = db.execute(
+            """SELECT r.month, r.type_code, COALESCE(c.id, 0) AS category_id,
+                      COALESCE(c.name, 'Uncategorised') AS category_name, c.icon, c.color,
+                      SUM(r.base_total_minor) AS total_minor, SUM(r.base_count) AS base_count
+               FROM monthly_rollup r
+               LEFT JOIN categories c ON c.id = r.category_id
+               WHERE r.user_id = ?
+               GROUP BY r.month, r.type_code, r.category_id""",
+            (g.user_id,),
+        ).fetchall()
+        bounds = db.execute(
+            f"""SELECT {sql_date("(SELECT MIN(day) FROM transactions WHERE user_id = ?)")} AS period_from,
+                       {sql_date("(SELECT MAX(day) FROM transactions WHERE user_id = ?)")} AS period_to""",
+            (g.user_id, g.user_id),
+        ).fetchone()
+        recent_rows = db.execute(
+            f"""SELECT t.id, {api_columns()},
+                       t.description, t.merchant, t.merchant_id, t.currency,
+                       t.category_id, c.name AS category_name
                 FROM transactions t
                 LEFT JOIN categories c ON c.id = t.category_id
-                WHERE {where}
-                GROUP BY category_id
-                ORDER BY total DESC""",
-            params,
+                WHERE t.user_id = ?
+                ORDER BY t.day DESC
+                LIMIT ?""",
+            (g.user_id, recent),
         ).fetchall()
-        return jsonify([dict(r) for r in rows]), 200
     finally:
         db.close()
 
+    income = expense = 0
+    by_month: dict[int, list[int]] = {}          # month → [debit, credit]
+    by_category: dict[int, dict] = {}            # debit totals per category
+    for r in rollup:
+        sums = by_month.setdefault(r["month"], [0, 0])
+        sums[r["type_code"]] += r["total_minor"]
+        if r["type_code"] == CREDIT:
+            income += r["total_minor"]
+            continue
+        expense += r["total_minor"]
+        cat = by_category.setdefault(r["category_id"], {
+            "category_id": r["category_id"], "category_name": r["category_name"],
+            "icon": r["icon"], "color": r["color"], "total": 0, "count": 0,
+        })
+        cat["total"] += r["total_minor"]
+        cat["count"] += r["base_count"]
 
-@analytics_bp.route("/merchants", methods=["GET"])
-@login_required
-def merchant_ranking():
+    monthly = [
+        {
+            "month": from_month(m),
+            "total_debit": from_minor(by_month[m][DEBIT]),
+            "total_credit": from_minor(by_month[m][CREDIT]),
+            "net": from_minor(by_month[m][CREDIT] - by_month[m][DEBIT]),
+        }
+        for m in sorted(by_month, reverse=True)[:months]
+    ]
+    top_categories = sorted(by_category.values(), key=lambda c: c["total"], reverse=True)[:top]
+    for cat in top_categories:
+        cat["total"] = from_minor(cat["total"])
+
+    return json_response({
+        "cashflow": {
+            "total_income": from_minor(income),
+            "total_expense": from_minor(expense),
+            "net": from_minor(income - expense),
+            "currency": Config.BASE_CURRENCY,
+            **dict(bounds),
+        },
+        "monthly": monthly,
+        "top_categories": top_categories,
+        "recent_transactions": [dict(r) for r in recent_rows],
+    })
+
+
+# ── Columnar statistics (optional, NumPy) ──────────
+
+def _columnar_stats(view):
     """
-    Top merchants by total spent.
-    Query params: limit (int, default 20), date_from, date_to
-    Returns [{merchant, total, count}]
+    Load the user's cached columnar frame and pass ``(frame, mask)`` for the
+    request's filters (txn_type defaults to debit).  501 without NumPy.
     """
-    limit = min(int(request.args.get("limit", 20)), 100)
-    clauses = ["user_id = ?", "txn_type = 'debit'", "merchant IS NOT NULL"]
-    params: list = [g.user_id]
-
-    date_from = request.args.get("date_from")
-    if date_from:
-        clauses.append("date >= ?")
-        params.append(date_from)
-    date_to = request.args.get("date_to")
-    if date_to:
-        clauses.append("date <= ?")
-        params.append(date_to)
+    @wraps(view)
+    def wrapper():
+        if not columnar.available():
+            return json_response({"error": "Columnar statistics need NumPy (pip install numpy)"}, 501)
+        filters = request.args.to_dict()
+        filters.setdefault("txn_type", "debit")
+        frame = columnar.load_frame(g.user_id)
+        try:
+            mask = frame.select(filters)
+        except ValueError as e:
+            return json_response({"error": str(e)}, 400)
+        return view(frame, mask)
+    return wrapper
 
-    where = " AND ".join(clauses)
 
-    db = get_db()
+def _category_names(category_ids) -> dict[int, str]:
+    db = get_read_db()
     try:
         rows = db.execute(
-            f"""SELECT merchant,
-                       SUM(amount) AS total,
-                       COUNT(*)    AS count
-                FROM transactions
-                WHERE {where}
-                GROUP BY merchant
-                ORDER BY total DESC
-                LIMIT ?""",
-            params + [limit],
+            "SELECT id, name FROM categories WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(c) for c in category_ids]),),
         ).fetchall()
-        return jsonify([dict(r) for r in rows]), 200
     finally:
         db.close()
+    names = {r["id"]: r["name"] for r in rows}
+    names[0] = "Uncategorised"
+    return names
 
 
-@analytics_bp.route("/cashflow", methods=["GET"])
+@analytics_bp.route("/stats/rolling", methods=["GET"])
 @login_required
-def cashflow():
+@cached_response
+@_columnar_stats
+def rolling_average(frame, mask):
     """
-    Income vs expense summary.
-    Query params: date_from, date_to
-    Returns {total_income, total_expense, net, period_from, period_to}
+    Daily totals with a trailing moving average.
+    Query params: window (days, default 30) plus the numeric list filters
+    Returns [{date, total, rolling_avg}] – one row per calendar day
+    """
+    window = max(1, min(request.args.get("window", 30, type=int), 365))
+    result = columnar.rolling_daily(frame, mask, window)
+    start = result["start_day"]
+    return json_response([
+        {"date": from_day(start + i), "total": total, "rolling_avg": avg}
+        for i, (total, avg) in enumerate(zip(result["totals"], result["rolling"]))
+    ])
+
+
+@analytics_bp.route("/stats/percentiles", methods=["GET"])
+@login_required
+@cached_response
+@_columnar_stats
+def amount_percentiles(frame, mask):
+    """
+    Amount percentiles, overall and per category.
+    Query params: q (comma list, default 25,50,75,90,99) plus the numeric list filters
+    Returns {overall: {count, p25, …}, by_category: [{category_id, category_name, count, p25, …}]}
     """
-    clauses = ["user_id = ?"]
-    params: list = [g.user_id]
+    try:
+        qs = [float(q) for q in request.args.get("q", "25,50,75,90,99").split(",") if q.strip()]
+    except ValueError:
+        qs = []
+    if not qs or any(not 0 <= q <= 100 for q in qs):
+        return json_response({"error": "q must be percentiles between 0 and 100"}, 400)
+    result = columnar.percentiles(frame, mask, qs)
+    names = _category_names(r["category_id"] for r in result["by_category"])
+    for r in result["by_category"]:
+        r["category_name"] = names.get(r["category_id"])
+    return json_response(result)
 
-    date_from = request.args.get("date_from")
-    if date_from:
-        clauses.append("date >= ?")
-        params.append(date_from)
-    date_to = request.args.get("date_to")
-    if date_to:
-        clauses.append("date <= ?")
-        params.append(date_to)
 
-    where = " AND ".join(clauses)
+@analytics_bp.route("/stats/weekday", methods=["GET"])
+@login_required
+@cached_response
+@_columnar_stats
+def weekday_spend(frame, mask):
+    """
+    Spend per day of the week.
+    Query params: the numeric list filters
+    Returns [{weekday, total, count, average}] – Monday first
+    """
+    return json_response(columnar.weekday_totals(frame, mask))
 
-    db = get_db()
+
+@analytics_bp.route("/stats/outliers", methods=["GET"])
+@login_required
+@cached_response
+@_columnar_stats
+def amount_outliers(frame, mask):
+    """
+    Transactions unusually large or small for their category.
+    Query params: threshold (robust z-score, default 3.5), limit (default 20)
+                  plus the numeric list filters
+    Returns [{transaction fields…, score, category_median}] – highest score first
+    """
+    threshold = request.args.get("threshold", 3.5, type=float)
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    found = columnar.outliers(frame, mask, threshold, limit)
+    if not found:
+        return json_response([])
+
+    db = get_read_db()
     try:
-        row = db.execute(
-            f"""SELECT
-                    SUM(CASE WHEN txn_type='credit' THEN amount ELSE 0 END) AS total_income,
-                    SUM(CASE WHEN txn_type='debit'  THEN amount ELSE 0 END) AS total_expense,
-                    SUM(CASE WHEN txn_type='credit' THEN amount ELSE -amount END) AS net,
-                    MIN(date) AS period_from,
-                    MAX(date) AS period_to
-                FROM transactions
-                WHERE {where}""",
-            params,
-        ).fetchone()
-        return jsonify(dict(row)), 200
+        rows = db.execute(
+            f"""SELECT t.id, {api_columns()},
+                       t.description, t.merchant, t.merchant_id, t.currency,
+                       t.category_id, c.name AS category_name
+                FROM transactions t
+                LEFT JOIN categories c ON c.id = t.category_id
+                WHERE t.user_id = ? AND t.id IN (SELECT value FROM json_each(?))""",
+            (g.user_id, json.dumps([o["id"] for o in found])),
+        ).fetchall()
     finally:
         db.close()
+    by_id = {r["id"]: dict(r) for r in rows}
+    return json_response([
+        {**by_id[o["id"]], "score": o["score"], "category_median": o["median"]}
+        for o in found if o["id"] in by_id
+    ])
+
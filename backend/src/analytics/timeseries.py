@@ -0,0 +1,118 @@
+"""Time-series query builder – any bucket size, optional series, gap filled.
+
+Everything happens in one statement: transactions are aggregated per
+(bucket, series) over the (user_id, day) index, a recursive CTE generates
+every bucket in the range (so empty periods come back as zero rows),
+the top series are crossed with it, and a window function adds the
+period-over-period change.
+"""
+
+import datetime
+
+from src.transactions.codec import sql_date, sql_month, to_day
+
+MAX_BUCKETS = 1000          # most recent buckets kept when a range is longer
+
+
+def _bucket_sql(key: str, prev: str, label: str) -> dict:
+    return {"key": key, "prev": prev, "label": label}
+
+
+# Bucket key of a transaction (from t.day / t.month), the key one bucket
+# earlier, and the API label – all integer arithmetic on stored columns
+BUCKETS = {
+    "day": _bucket_sql("t.day", "{k} - 1", sql_date("{k}")),
+    "week": _bucket_sql("t.day - (t.day + 3) % 7", "{k} - 7", sql_date("{k}")),     # Monday
+    "month": _bucket_sql(
+        "t.month",
+        "CASE WHEN {k} % 100 = 1 THEN {k} - 89 ELSE {k} - 1 END",
+        sql_month("{k}"),
+    ),
+    "quarter": _bucket_sql(
+        "(t.month / 100) * 10 + ((t.month % 100) - 1) / 3 + 1",        # YYYYQ
+        "CASE WHEN {k} % 10 = 1 THEN {k} - 7 ELSE {k} - 1 END",
+        "printf('%04d-Q%d', {k} / 10, {k} % 10)",
+    ),
+    "year": _bucket_sql("t.month / 100", "{k} - 1", "CAST({k} AS TEXT)"),
+}
+
+# Series key and display name per group_by
+GROUPS = {
+    None: ("0", "NULL", ""),
+    "category": (
+        "COALESCE(t.category_id, 0)",
+        "COALESCE(c.name, 'Uncategorised')",
+        "LEFT JOIN categories c ON c.id = g.series",
+    ),
+    "merchant": (
+        "COALESCE(t.merchant_id, 0)",
+        "COALESCE(m.name, 'Unknown')",
+        "LEFT JOIN merchants m ON m.id = g.series",
+    ),
+}
+
+
+def bucket_of(bucket: str, iso_date: str) -> int:
+    """Bucket key for an ISO date, matching ``BUCKETS[bucket]['key']``."""
+    d = datetime.date.fromisoformat(iso_date)
+    day = to_day(iso_date)
+    return {
+        "day": day,
+        "week": day - d.weekday(),
+        "month": d.year * 100 + d.month,
+        "quarter": d.year * 10 + (d.month - 1) // 3 + 1,
+        "year": d.year,
+    }[bucket]
+
+
+def timeseries_query(bucket: str, group_by: str | None, where: str, params: list,
+                     first: int | None, last: int | None, limit: int) -> tuple[str, list]:
+    """
+    SQL + params for the series over the rows matching *where*, from bucket
+    key *first* to *last* (None = from the data), keeping the *limit*
+    largest series.  Rows come back ordered by series (largest total
+    first), then bucket.
+    """
+    b = BUCKETS[bucket]
+    series_key, series_name, series_join = GROUPS[group_by]
+    if group_by is None:
+        top_series, top_params = "SELECT 0 AS series, 0 AS grand", []
+    else:
+        top_series = "SELECT series, SUM(total) AS grand FROM agg GROUP BY series ORDER BY grand DESC LIMIT ?"
+        top_params = [limit]
+    sql = f"""
+        WITH RECURSIVE
+        agg AS (
+            SELECT {b['key']} AS bucket, {series_key} AS series,
+                   COALESCE(SUM(t.base_amount_minor), 0) AS total, COUNT(t.base_amount_minor) AS count
+            FROM transactions t
+            WHERE {where}
+            GROUP BY bucket, series
+        ),
+        bounds AS (
+            SELECT COALESCE(?, MIN(bucket)) AS lo, COALESCE(?, MAX(bucket)) AS hi FROM agg
+        ),
+        buckets (bucket, n) AS (
+            SELECT hi, 1 FROM bounds WHERE hi IS NOT NULL
+            UNION ALL
+            SELECT {b['prev'].format(k='bucket')}, n + 1
+            FROM buckets, bounds
+            WHERE bucket > bounds.lo AND n < ?
+        ),
+        top_series AS ({top_series}),
+        grid AS (
+            SELECT b.bucket, s.series, s.grand,
+                   COALESCE(a.total, 0) AS total, COALESCE(a.count, 0) AS count
+            FROM buckets b
+            CROSS JOIN top_series s
+            LEFT JOIN agg a ON a.bucket = b.bucket AND a.series = s.series
+        )
+        SELECT g.series, {series_name} AS name,
+               {b['label'].format(k='g.bucket')} AS period,
+               g.total, g.count,
+               LAG(g.total) OVER w AS previous
+        FROM grid g
+        {series_join}
+        WINDOW w AS (PARTITION BY g.series ORDER BY g.bucket)
+        ORDER BY g.grand DESC, g.series, g.bucket"""
+    return sql, params + [first, last, MAX_BUCKETS] + top_params
@@ -0,0 +1,48 @@
+"""Bounded executor for password hashing.
+
+werkzeug's password hashes use a deliberately slow KDF (scrypt).  Running
+it inline lets a burst of logins occupy every request thread and CPU
+core; here at most ``KDF_WORKERS`` hashes run at once, up to
+``KDF_QUEUE_MAX`` more wait, and anything beyond that is rejected at once
+with ``KDFBusy`` (the API answers 503) instead of queueing without bound.
+``KDF_WORKERS=0`` hashes inline on the request thread.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+
+class KDFBusy(RuntimeError):
+    """Too many password hashes already running or queued."""
+
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_pending = 0
+_rejected = 0
+
+
+def run_kdf(fn, *args):
+    """Run ``fn(*args)`` on the KDF pool and wait for it; raises KDFBusy when full."""
+    global _executor, _pending, _rejected
+    if Config.KDF_WORKERS <= 0:
+        return fn(*args)
+    with _lock:
+        if _pending >= Config.KDF_WORKERS + Config.KDF_QUEUE_MAX:
+            _rejected += 1
+            raise KDFBusy("Password hashing queue is full")
+        _pending += 1
+        if _executor is None:
+            _executor = ThreadPoolExecutor(Config.KDF_WORKERS, thread_name_prefix="kdf")
+    try:
+        return _executor.submit(fn, *args).result()
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+def kdf_stats() -> dict:
+    with _lock:
+        return {"workers": Config.KDF_WORKERS, "pending": _pending, "rejected": _rejected}
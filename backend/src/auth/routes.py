@@ -1,9 +1,13 @@
-"""Auth blueprint – register, login, me."""
+"""Auth blueprint – register, login, me, logout everywhere."""
 
 from functools import wraps
 from flask import Blueprint, request, jsonify, g
 
-from src.auth.service import register_user, login_user, decode_token, get_user_by_id
+from src.auth.kdf import KDFBusy
+from src.auth.throttle import account_failures, ip_attempts
+from src.auth.service import (
+    register_user, login_user, decode_token, get_user_by_id, revoke_tokens, token_is_current, update_user,
+)
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 
@@ -18,7 +22,7 @@ def login_required(f):
             return jsonify({"error": "Missing or invalid Authorization header"}), 401
         token = header.split(" ", 1)[1]
         payload = decode_token(token)
-        if payload is None:
+        if payload is None or not token_is_current(payload):
             return jsonify({"error": "Invalid or expired token"}), 401
         g.user_id = payload["user_id"]
         g.email = payload["email"]
@@ -26,6 +30,27 @@ def login_required(f):
     return decorated
 
 
+# ── Throttling ──────────────────────────────────────
+
+def _retry_later(status: int, error: str, seconds: int):
+    response = jsonify({"error": error})
+    response.status_code = status
+    response.headers["Retry-After"] = str(seconds)
+    return response
+
+
+def _throttled(*keys: tuple):
+    """429 if any ``(throttle, key)`` is over its limit, else None."""
+    wait = max(throttle.retry_after(key) for throttle, key in keys)
+    if wait:
+        return _retry_later(429, "Too many attempts – try again later", wait)
+    return None
+
+
+def _kdf_busy():
+    return _retry_later(503, "Server busy – try again shortly", 1)
+
+
 # ── Routes ──────────────────────────────────────────
 
 @auth_bp.route("/register", methods=["POST"])
@@ -40,9 +65,17 @@ def register():
     if len(password) < 6:
         return jsonify({"error": "Password must be at least 6 characters"}), 400
 
+    ip_key = f"ip:{request.remote_addr}"
+    refused = _throttled((ip_attempts, ip_key))
+    if refused:
+        return refused
+    ip_attempts.hit(ip_key)
+
     try:
         result = register_user(email, password, display_name)
         return jsonify(result), 201
+    except KDFBusy:
+        return _kdf_busy()
     except ValueError as e:
         return jsonify({"error": str(e)}), 409
 
@@ -56,11 +89,21 @@ def login():
     if not email or not password:
         return jsonify({"error": "Email and password are required"}), 400
 
+    ip_key, account_key = f"ip:{request.remote_addr}", f"email:{email.lower()}"
+    refused = _throttled((ip_attempts, ip_key), (account_failures, account_key))
+    if refused:
+        return refused
+    ip_attempts.hit(ip_key)
+
     try:
         result = login_user(email, password)
-        return jsonify(result), 200
+    except KDFBusy:
+        return _kdf_busy()
     except ValueError as e:
+        account_failures.hit(account_key)
         return jsonify({"error": str(e)}), 401
+    account_failures.reset(account_key)
+    return jsonify(result), 200
 
 
 @auth_bp.route("/me", methods=["GET"])
@@ -69,4 +112,25 @@ def me():
     user = get_user_by_id(g.user_id)
     if user is None:
         return jsonify({"error": "User not found"}), 404
-    return jsonify(user), 200
+    return jsonify({k: v for k, v in user.items() if k != "token_version"}), 200
+
+
+@auth_bp.route("/me", methods=["PATCH"])
+@login_required
+def update_me():
+    """Body: { "display_name": "Asha" }"""
+    data = request.get_json(silent=True) or {}
+    display_name = data.get("display_name")
+    if display_name is not None and not isinstance(display_name, str):
+        return jsonify({"error": "display_name must be a string"}), 400
+    if not update_user(g.user_id, display_name.strip() if display_name else None):
+        return jsonify({"error": "User not found"}), 404
+    return me()
+
+
+@auth_bp.route("/logout-all", methods=["POST"])
+@login_required
+def logout_all():
+    """Revoke every token issued to the current user, including this one."""
+    revoke_tokens(g.user_id)
+    return jsonify({"revoked": True}), 200
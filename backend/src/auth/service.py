@@ -1,29 +1,48 @@
-"""Authentication helpers – password hashing and JWT tokens."""
+"""Authentication helpers – password hashing and JWT tokens.
+
+Verified token payloads and user profiles are cached in memory, per
+process (``src.auth.cache``).  Tokens carry the user's ``token_version``;
+bumping it (logout everywhere) rejects every older token.  A revocation
+applies at once in this process and, in other processes, once their
+cached profile expires (``AUTH_PROFILE_CACHE_TTL``; 0 disables the
+profile cache, making revocation immediate everywhere).
+"""
 
 import datetime
+import time
+
 import jwt
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from config import Config
-from src.db.connection import get_db
+from src.auth.cache import TTLCache
+from src.auth.kdf import run_kdf
+from src.db.connection import get_catalog_db
+from src.db.writer import run_write
+
+token_cache = TTLCache(Config.AUTH_TOKEN_CACHE_SIZE)        # token → verified payload
+profile_cache = TTLCache(Config.AUTH_PROFILE_CACHE_SIZE)    # user id → users row
 
 
 # ── Password helpers ────────────────────────────────
 
+# Both run on the bounded KDF pool and raise KDFBusy when it is full
+
 def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+    return run_kdf(generate_password_hash, password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return check_password_hash(password_hash, password)
+    return run_kdf(check_password_hash, password_hash, password)
 
 
 # ── JWT helpers ─────────────────────────────────────
 
-def create_token(user_id: int, email: str) -> str:
+def create_token(user_id: int, email: str, version: int = 0) -> str:
     payload = {
         "user_id": user_id,
         "email": email,
+        "ver": version,
         "exp": datetime.datetime.utcnow()
               + datetime.timedelta(hours=Config.JWT_EXPIRY_HOURS),
     }
@@ -31,21 +50,34 @@ def create_token(user_id: int, email: str) -> str:
 
 
 def decode_token(token: str) -> dict | None:
+    """Verified payload of *token*, or None.  Valid tokens are cached until ``exp``."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
-        return jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
+    token_cache.put(token, payload, min(payload["exp"], time.time() + Config.AUTH_TOKEN_CACHE_TTL))
+    return payload
+
+
+def token_is_current(payload: dict) -> bool:
+    """False once the user is gone or their tokens were revoked after *payload* was issued."""
+    user = get_user_by_id(payload["user_id"])
+    return user is not None and payload.get("ver", 0) == user["token_version"]
 
 
 # ── User CRUD ───────────────────────────────────────
 
 def register_user(email: str, password: str, display_name: str | None = None):
     """Insert a new user and return (user_id, token) or raise ValueError."""
-    db = get_db()
+    password_hash = hash_password(password)
+    db = get_catalog_db()
     try:
         cur = db.execute(
             "INSERT INTO users (email, password_hash, display_name) VALUES (?, ?, ?)",
-            (email.lower().strip(), hash_password(password), display_name),
+            (email.lower().strip(), password_hash, display_name),
         )
         db.commit()
         user_id = cur.lastrowid
@@ -62,27 +94,58 @@ def register_user(email: str, password: str, display_name: str | None = None):
 
 def login_user(email: str, password: str):
     """Validate credentials and return token or raise ValueError."""
-    db = get_db()
+    db = get_catalog_db()
     try:
         row = db.execute(
-            "SELECT id, email, password_hash FROM users WHERE email = ?",
+            "SELECT id, email, password_hash, token_version FROM users WHERE email = ?",
             (email.lower().strip(),),
         ).fetchone()
         if row is None or not verify_password(password, row["password_hash"]):
             raise ValueError("Invalid email or password")
-        token = create_token(row["id"], row["email"])
+        token = create_token(row["id"], row["email"], row["token_version"])
         return {"user_id": row["id"], "token": token}
     finally:
         db.close()
 
 
 def get_user_by_id(user_id: int):
-    db = get_db()
+    """The user's profile (cached for ``AUTH_PROFILE_CACHE_TTL``); treat it as read-only."""
+    user = profile_cache.get(user_id)
+    if user is not None:
+        return user
+    db = get_catalog_db()
     try:
         row = db.execute(
-            "SELECT id, email, display_name, created_at FROM users WHERE id = ?",
+            "SELECT id, email, display_name, created_at, token_version FROM users WHERE id = ?",
             (user_id,),
         ).fetchone()
-        return dict(row) if row else None
     finally:
         db.close()
+    if row is None:
+        return None
+    user = dict(row)
+    profile_cache.put(user_id, user, time.time() + Config.AUTH_PROFILE_CACHE_TTL)
+    return user
+
+
+def update_user(user_id: int, display_name: str | None) -> bool:
+    """Change the display name; returns False if the user does not exist."""
+    affected = run_write(
+        lambda db: db.execute(
+            "UPDATE users SET display_name = ? WHERE id = ?", (display_name, user_id)
+        ).rowcount,
+        catalog=True,
+    )
+    profile_cache.pop(user_id)
+    return affected > 0
+
+
+def revoke_tokens(user_id: int):
+    """Invalidate every token issued to the user so far (logout everywhere)."""
+    run_write(
+        lambda db: db.execute(
+            "UPDATE users SET token_version = token_version + 1 WHERE id = ?", (user_id,)
+        ),
+        catalog=True,
+    )
+    profile_cache.pop(user_id)
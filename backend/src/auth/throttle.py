@@ -0,0 +1,70 @@
+"""Sliding-window attempt throttling for login and register.
+
+Failed logins are counted per account and every password attempt per
+client IP, each within ``LOGIN_THROTTLE_WINDOW`` seconds.  Once a key
+reaches its limit further attempts are refused (429 with Retry-After)
+before any password hashing is done.  The client IP is the socket peer,
+or the ``X-Forwarded-For`` address when ``TRUSTED_PROXIES`` is set.
+
+Counters live in each process.  Under gunicorn every process counts on
+its own, so a client whose requests land on all of them gets up to
+``WEB_PROCESSES`` times each limit; a hard cap belongs in the reverse
+proxy (or run a single process).
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config import Config
+
+_MAX_KEYS = 100_000         # keys tracked per throttle; the stalest are dropped first
+
+
+class AttemptThrottle:
+    """Thread-safe per-key counter of attempts within a sliding window."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._hits: OrderedDict[str, deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key: str, now: float) -> deque | None:
+        hits = self._hits.get(key)
+        if hits is None:
+            return None
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+            return None
+        return hits
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until *key* may try again (0 = allowed now)."""
+        now = time.time()
+        with self._lock:
+            hits = self._recent(key, now)
+            if hits is None or len(hits) < self.limit:
+                return 0
+            return max(1, int(hits[-self.limit] + self.window - now) + 1)
+
+    def hit(self, key: str):
+        now = time.time()
+        with self._lock:
+            hits = self._recent(key, now)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            hits.append(now)
+            self._hits.move_to_end(key)
+            while len(self._hits) > _MAX_KEYS:
+                self._hits.popitem(last=False)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+account_failures = AttemptThrottle(Config.LOGIN_MAX_FAILURES_PER_ACCOUNT, Config.LOGIN_THROTTLE_WINDOW)
+ip_attempts = AttemptThrottle(Config.LOGIN_MAX_ATTEMPTS_PER_IP, Config.LOGIN_THROTTLE_WINDOW)
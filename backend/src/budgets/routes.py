@@ -0,0 +1,184 @@
+"""Budgets blueprint – per-category monthly budgets, budget-vs-actual, alerts."""
+
+import datetime
+import re
+import sqlite3
+
+from flask import Blueprint, request, jsonify, g
+
+from src.auth.routes import login_required
+from src.budgets.service import budget_status, clear_uncrossed_events
+from src.db.connection import get_read_db
+from src.db.writer import run_write
+from src.transactions.codec import from_minor, from_month, to_minor, to_month
+
+budgets_bp = Blueprint("budgets", __name__, url_prefix="/api/budgets")
+
+_MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def _parse_month(value: str | None) -> int | None:
+    """'YYYY-MM' → YYYYMM (None if malformed); missing means the current month."""
+    if not value:
+        return to_month(datetime.date.today().isoformat())
+    return to_month(value) if _MONTH_RE.match(value) else None
+
+
+def _parse_amount(value) -> int | None:
+    try:
+        minor = to_minor(value)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+    return minor if minor is not None and minor > 0 else None
+
+
+@budgets_bp.route("", methods=["GET"])
+@login_required
+def list_budgets():
+    """
+    Budget vs actual for one month.
+    Query params: month (YYYY-MM, default current month)
+    Returns [{id, category_id, category_name, icon, color, month, amount,
+              spent, remaining, pct_used}]
+    """
+    month = _parse_month(request.args.get("month"))
+    if month is None:
+        return jsonify({"error": "month must be YYYY-MM"}), 400
+    db = get_read_db()
+    try:
+        return jsonify(budget_status(db, g.user_id, month)), 200
+    finally:
+        db.close()
+
+
+@budgets_bp.route("", methods=["POST"])
+@login_required
+def create_budget():
+    """Body: { "category_id": 2, "month": "2025-03", "amount": 400 }"""
+    data = request.get_json(silent=True) or {}
+    month = _parse_month(data.get("month"))
+    amount = _parse_amount(data.get("amount"))
+    category_id = data.get("category_id")
+    if month is None or amount is None or not isinstance(category_id, int):
+        return jsonify({"error": "category_id, month (YYYY-MM) and a positive amount are required"}), 400
+
+    user_id = g.user_id
+
+    def _create(db) -> int | None:
+        visible = db.execute(
+            "SELECT 1 FROM categories WHERE id = ? AND (user_id IS NULL OR user_id = ?)",
+            (category_id, user_id),
+        ).fetchone()
+        if visible is None:
+            return None
+        return db.execute(
+            "INSERT INTO budgets (user_id, category_id, month, amount_minor) VALUES (?, ?, ?, ?)",
+            (user_id, category_id, month, amount),
+        ).lastrowid
+
+    try:
+        budget_id = run_write(_create, user_id)
+    except sqlite3.IntegrityError:
+        return jsonify({"error": "A budget for this category and month already exists"}), 409
+    if budget_id is None:
+        return jsonify({"error": "Category not found"}), 404
+
+    db = get_read_db()
+    try:
+        return jsonify(budget_status(db, user_id, budget_id=budget_id)[0]), 201
+    finally:
+        db.close()
+
+
+@budgets_bp.route("/<int:budget_id>", methods=["PATCH"])
+@login_required
+def update_budget(budget_id: int):
+    """Body: { "amount": 450 }"""
+    data = request.get_json(silent=True) or {}
+    amount = _parse_amount(data.get("amount"))
+    if amount is None:
+        return jsonify({"error": "A positive amount is required"}), 400
+
+    user_id = g.user_id
+
+    def _update(db) -> int:
+        affected = db.execute(
+            "UPDATE budgets SET amount_minor = ? WHERE id = ? AND user_id = ?",
+            (amount, budget_id, user_id),
+        ).rowcount
+        if affected:
+            clear_uncrossed_events(db, budget_id)
+        return affected
+
+    if run_write(_update, user_id) == 0:
+        return jsonify({"error": "Budget not found"}), 404
+
+    db = get_read_db()
+    try:
+        return jsonify(budget_status(db, user_id, budget_id=budget_id)[0]), 200
+    finally:
+        db.close()
+
+
+@budgets_bp.route("/<int:budget_id>", methods=["DELETE"])
+@login_required
+def delete_budget(budget_id: int):
+    user_id = g.user_id
+    affected = run_write(
+        lambda db: db.execute(
+            "DELETE FROM budgets WHERE id = ? AND user_id = ?", (budget_id, user_id)
+        ).rowcount,
+        user_id,
+    )
+    if affected == 0:
+        return jsonify({"error": "Budget not found"}), 404
+    return jsonify({"deleted": True}), 200
+
+
+@budgets_bp.route("/events", methods=["GET"])
+@login_required
+def list_events():
+    """
+    Threshold alerts raised while importing, newest first.
+    Query params: month (YYYY-MM, optional), limit (default 50)
+    Returns [{id, budget_id, category_id, category_name, month, threshold,
+              spent, amount, created_at}]
+    """
+    where, params = "e.user_id = ?", [g.user_id]
+    if request.args.get("month"):
+        month = _parse_month(request.args["month"])
+        if month is None:
+            return jsonify({"error": "month must be YYYY-MM"}), 400
+        where += " AND e.month = ?"
+        params.append(month)
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+
+    db = get_read_db()
+    try:
+        rows = db.execute(
+            f"""SELECT e.id, e.budget_id, b.category_id, c.name AS category_name,
+                       e.month, e.threshold, e.spent_minor, e.amount_minor, e.created_at
+                FROM budget_events e
+                JOIN budgets b ON b.id = e.budget_id
+                LEFT JOIN categories c ON c.id = b.category_id
+                WHERE {where}
+                ORDER BY e.id DESC
+                LIMIT ?""",
+            params + [limit],
+        ).fetchall()
+    finally:
+        db.close()
+    return jsonify([
+        {
+            "id": r["id"],
+            "budget_id": r["budget_id"],
+            "category_id": r["category_id"],
+            "category_name": r["category_name"],
+            "month": from_month(r["month"]),
+            "threshold": r["threshold"],
+            "spent": from_minor(r["spent_minor"]),
+            "amount": from_minor(r["amount_minor"]),
+            "created_at": r["created_at"],
+        }
+        for r in rows
+    ]), 200
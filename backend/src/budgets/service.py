@@ -0,0 +1,114 @@
+"""Budget-vs-actual and threshold events.
+
+A budget's spend is read from ``monthly_rollup`` (kept current by triggers
+on every insert, edit and delete), so checking status is one key lookup
+per budget however many transactions the user has.  ``check_thresholds``
+runs inside the import write and records each alert threshold a budget
+crosses in ``budget_events`` (once per budget and threshold).
+"""
+
+import json
+from functools import lru_cache
+
+from config import Config
+from src.transactions.codec import DEBIT, from_minor, from_month
+
+# Spend per budget (base currency): its debit rollup rows for the budget's month and category
+_SPENT_SQL = f"""
+    COALESCE((SELECT SUM(r.base_total_minor) FROM monthly_rollup r
+              WHERE r.user_id = b.user_id AND r.month = b.month
+                AND r.category_id = b.category_id AND r.type_code = {DEBIT}), 0)
+"""
+
+
+@lru_cache(maxsize=4)
+def _parse_thresholds(raw: str) -> list[int]:
+    """Percentages in *raw*; entries that are not integers in 1..1000 are skipped (warned once)."""
+    thresholds = set()
+    for entry in filter(None, (t.strip() for t in raw.split(","))):
+        try:
+            pct = int(entry)
+        except ValueError:
+            pct = None
+        if pct is None or not 1 <= pct <= 1000:
+            print(f"[Budgets] Ignoring BUDGET_ALERT_THRESHOLDS entry {entry!r} (want a percentage 1-1000)")
+            continue
+        thresholds.add(pct)
+    return sorted(thresholds)
+
+
+def alert_thresholds() -> list[int]:
+    return list(_parse_thresholds(Config.BUDGET_ALERT_THRESHOLDS))
+
+
+def budget_row(r) -> dict:
+    """API shape for a budget row selected with ``amount_minor`` / ``spent_minor``."""
+    amount, spent = r["amount_minor"], r["spent_minor"]
+    return {
+        "id": r["id"],
+        "category_id": r["category_id"],
+        "category_name": r["category_name"],
+        "icon": r["icon"],
+        "color": r["color"],
+        "month": from_month(r["month"]),
+        "amount": from_minor(amount),
+        "spent": from_minor(spent),
+        "remaining": from_minor(amount - spent),
+        "pct_used": round(spent * 100 / amount, 1) if amount else None,
+    }
+
+
+def budget_status(db, user_id: int, month: int | None = None, budget_id: int | None = None) -> list[dict]:
+    """Budgets for *month* (or the one *budget_id*) with their spend so far."""
+    where, params = "b.user_id = ?", [user_id]
+    if month is not None:
+        where += " AND b.month = ?"
+        params.append(month)
+    if budget_id is not None:
+        where += " AND b.id = ?"
+        params.append(budget_id)
+    rows = db.execute(
+        f"""SELECT b.id, b.category_id, c.name AS category_name, c.icon, c.color,
+                   b.month, b.amount_minor, {_SPENT_SQL} AS spent_minor
+            FROM budgets b
+            LEFT JOIN categories c ON c.id = b.category_id
+            WHERE {where}
+            ORDER BY b.month DESC, category_name""",
+        params,
+    ).fetchall()
+    return [budget_row(r) for r in rows]
+
+
+def check_thresholds(db, user_id: int, touched: set[tuple[int, int]]) -> int:
+    """
+    Record threshold crossings for budgets on the (month, category_id)
+    pairs in *touched*.  Runs on the writer thread inside the write that
+    changed spend; does not commit.  Returns the number of new events.
+    """
+    thresholds = alert_thresholds()
+    if not touched or not thresholds:
+        return 0
+    return db.execute(
+        f"""INSERT OR IGNORE INTO budget_events
+                   (budget_id, user_id, month, threshold, spent_minor, amount_minor)
+            SELECT s.id, s.user_id, s.month, th.value, s.spent_minor, s.amount_minor
+            FROM (SELECT b.id, b.user_id, b.month, b.amount_minor, {_SPENT_SQL} AS spent_minor
+                  FROM json_each(?) k
+                  JOIN budgets b ON b.user_id = ?
+                                AND b.month = json_extract(k.value, '$[0]')
+                                AND b.category_id = json_extract(k.value, '$[1]')) s,
+                 json_each(?) th
+            WHERE s.amount_minor > 0 AND s.spent_minor * 100 >= s.amount_minor * th.value""",
+        (json.dumps(sorted(touched)), user_id, json.dumps(thresholds)),
+    ).rowcount
+
+
+def clear_uncrossed_events(db, budget_id: int):
+    """After a budget amount change, drop events whose threshold is no longer reached."""
+    db.execute(
+        f"""DELETE FROM budget_events
+            WHERE budget_id = ?
+              AND threshold * (SELECT amount_minor FROM budgets WHERE id = ?)
+                  > 100 * (SELECT {_SPENT_SQL} FROM budgets b WHERE b.id = ?)""",
+        (budget_id, budget_id, budget_id),
+    )
@@ -1,30 +1,245 @@
-"""Database connection helpers and schema bootstrap."""
+"""Database connection helpers and schema bootstrap.
 
+Two storage modes (``Config.STORAGE_MODE``):
+
+* ``shared``   – everything lives in one database at ``DATABASE_PATH``.
+* ``per_user`` – ``DATABASE_PATH`` is a small catalog (users + job queue)
+  and each user's imports, jobs and transactions live in their own file
+  under ``USER_DB_DIR``, so writers for different users never share a lock.
+
+``get_db()`` routes to the right file; shards share the same schema and
+are created and migrated on first use.
+"""
+
+import functools
+import importlib.util
 import os
 import sqlite3
+import sys
+import threading
+
 from config import Config
+from src.db.trace import TracedCursor
 
 _DB_PATH = Config.DATABASE_PATH
 _SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "schema.sql")
+_MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+# Shard files already created + migrated by this process
+_ready_shards: set[str] = set()
+_shard_lock = threading.Lock()
+
+
+class Connection(sqlite3.Connection):
+    """sqlite3 connection that remembers which database file it opened."""
+    path: str
+
+
+class TracedConnection(Connection):
+    """Connection whose statements are timed by ``src.db.trace`` (``SQL_TRACE``)."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
 
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
 
-def get_db() -> sqlite3.Connection:
-    """Return a new connection with row-factory enabled."""
-    conn = sqlite3.connect(_DB_PATH)
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(path: str, readonly: bool = False) -> Connection:
+    """Open *path* with the standard pragmas (``query_only`` when *readonly*)."""
+    conn = sqlite3.connect(path, factory=TracedConnection if Config.SQL_TRACE else Connection)
+    conn.path = path
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+def per_user_storage() -> bool:
+    return Config.STORAGE_MODE == "per_user"
+
+
+def user_db_path(user_id: int) -> str:
+    return os.path.join(Config.USER_DB_DIR, f"user_{int(user_id)}.db")
+
+
+def get_catalog_db() -> Connection:
+    """Connection to the catalog (users, job queue) – the only DB in shared mode."""
+    return connect(_DB_PATH)
+
+
+def db_path(user_id: int | None = None, catalog: bool = False) -> str:
+    """
+    Database file for *user_id*.  In per-user mode this is the user's shard,
+    defaulting to the authenticated ``g.user_id``; without a user (or with
+    *catalog*) it is the catalog.  In shared mode it is always ``DATABASE_PATH``.
+    """
+    if catalog or not per_user_storage():
+        return _DB_PATH
+    if user_id is None:
+        # Only the web app imports Flask; the standalone worker never pays for it
+        flask = sys.modules.get("flask")
+        if flask is not None and flask.has_app_context():
+            user_id = flask.g.get("user_id")
+    if user_id is None:
+        return _DB_PATH
+    path = user_db_path(user_id)
+    if path not in _ready_shards:
+        _init_shard(path, user_id)
+    return path
+
+
+def get_db(user_id: int | None = None) -> Connection:
+    """Return a new read-write connection with row-factory enabled (see ``db_path``)."""
+    return connect(db_path(user_id))
+
+
+def get_read_db(user_id: int | None = None) -> Connection:
+    """
+    Return a ``query_only`` connection for read paths.  Readers never take
+    the write lock, so under WAL they don't queue behind import writers.
+    """
+    return connect(db_path(user_id), readonly=True)
+
+
+def user_ids_with_data() -> list[int | None]:
+    """
+    Keys accepted by ``get_db`` that cover all transaction data:
+    ``[None]`` in shared mode, every shard's user id in per-user mode.
+    """
+    if not per_user_storage():
+        return [None]
+    if not os.path.isdir(Config.USER_DB_DIR):
+        return []
+    ids = []
+    for name in os.listdir(Config.USER_DB_DIR):
+        stem, ext = os.path.splitext(name)
+        if ext == ".db" and stem.startswith("user_") and stem[5:].isdigit():
+            ids.append(int(stem[5:]))
+    return sorted(ids)
+
+
+@functools.cache
+def _migrations() -> tuple[tuple[int, str], ...]:
+    """Numbered migration files (``NNN_name.sql`` / ``NNN_name.py``) in order."""
+    found = []
+    for name in os.listdir(_MIGRATIONS_DIR):
+        stem, ext = os.path.splitext(name)
+        if ext in (".sql", ".py") and stem.split("_", 1)[0].isdigit():
+            found.append((int(stem.split("_", 1)[0]), os.path.join(_MIGRATIONS_DIR, name)))
+    return tuple(sorted(found))
+
+
+def schema_version() -> int:
+    """``user_version`` of a fully migrated database."""
+    migrations = _migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def _apply_migrations(conn: sqlite3.Connection, current: int):
+    """
+    Bring the schema up from version *current*, tracking progress in
+    ``PRAGMA user_version``.  ``.sql`` migrations run as a script; ``.py``
+    migrations expose ``migrate(conn)``.  Each one commits together with
+    its version bump.  Numbers may have gaps (there is no 002); they are
+    never reused or shifted, since databases already past a number would
+    skip whatever moved onto it.
+    """
+    for version, path in _migrations():
+        if version <= current:
+            continue
+        # Table rebuilds need FK enforcement off; it cannot change inside a txn
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            if path.endswith(".sql"):
+                with open(path, "r", encoding="utf-8") as f:
+                    conn.executescript(f"BEGIN;\n{f.read()}\nPRAGMA user_version = {version};\nCOMMIT;")
+            else:
+                spec = importlib.util.spec_from_file_location(f"_migration_{version}", path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                conn.execute("BEGIN")
+                module.migrate(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
+        print(f"[DB] Applied migration {os.path.basename(path)} to {conn.path}")
+
+
+def _bootstrap(conn: Connection):
+    """
+    Create the baseline tables from schema.sql on a fresh database, then
+    apply pending migrations.  schema.sql describes the pre-migration
+    baseline, so it is only run while ``user_version`` is still 0.  An
+    up-to-date database costs one pragma read and nothing else.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current == schema_version():
+        return
+    if current == 0:
+        with open(_SCHEMA_FILE, "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    _apply_migrations(conn, current)
+
+
+def _init_shard(path: str, user_id: int):
+    """Create / migrate a user's shard and mirror their users row into it."""
+    with _shard_lock:
+        if path in _ready_shards:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = connect(path)
+        try:
+            # A migrated shard that already has its user stub needs no catalog read or write
+            if (conn.execute("PRAGMA user_version").fetchone()[0] == schema_version()
+                    and conn.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone()):
+                _ready_shards.add(path)
+                return
+            catalog = get_catalog_db()
+            try:
+                user = catalog.execute(
+                    "SELECT id, email, display_name, created_at FROM users WHERE id = ?",
+                    (user_id,),
+                ).fetchone()
+            finally:
+                catalog.close()
+
+            _bootstrap(conn)
+            if user is not None:
+                # Shard-local stub keeps foreign keys valid; credentials stay in the catalog
+                conn.execute(
+                    """INSERT OR IGNORE INTO users (id, email, password_hash, display_name, created_at)
+                       VALUES (?, ?, '', ?, ?)""",
+                    (user["id"], user["email"], user["display_name"], user["created_at"]),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+        _ready_shards.add(path)
+
+
 def init_db():
-    """Create tables from schema.sql if they don't exist yet."""
-    conn = get_db()
-    with open(_SCHEMA_FILE, "r", encoding="utf-8") as f:
-        conn.executescript(f.read())
+    """Create / migrate the main database and, in per-user mode, every shard."""
+    conn = get_catalog_db()
+    _bootstrap(conn)
     conn.close()
     print(f"[DB] Initialised database at {_DB_PATH}")
 
+    if per_user_storage():
+        for user_id in user_ids_with_data():
+            _init_shard(user_db_path(user_id), user_id)
+        print(f"[DB] Per-user storage in {Config.USER_DB_DIR}")
+
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,19 @@
+-- Canonical merchant dimension + integer merchant key on transactions
+
+CREATE TABLE IF NOT EXISTS merchants (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT    NOT NULL,                    -- display name
+    normalized  TEXT    NOT NULL UNIQUE,             -- canonical match key
+    created_at  TEXT    NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Every raw spelling seen so far → its canonical merchant
+CREATE TABLE IF NOT EXISTS merchant_aliases (
+    alias       TEXT    PRIMARY KEY,                 -- lower-cased raw name
+    merchant_id INTEGER NOT NULL,
+    FOREIGN KEY (merchant_id) REFERENCES merchants(id)
+);
+
+ALTER TABLE transactions ADD COLUMN merchant_id INTEGER REFERENCES merchants(id);
+
+CREATE INDEX IF NOT EXISTS idx_txn_user_merchant ON transactions(user_id, merchant_id);
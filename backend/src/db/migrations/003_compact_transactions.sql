@@ -0,0 +1,51 @@
+-- Compact numeric storage for transactions:
+--   amount / balance REAL  → amount_minor / balance_minor INTEGER (hundredths)
+--   date TEXT              → day INTEGER (days since 1970-01-01) + month INTEGER (YYYYMM)
+--   txn_type TEXT          → type_code INTEGER (0 = debit, 1 = credit)
+
+CREATE TABLE transactions_new (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id         INTEGER NOT NULL,
+    import_id       INTEGER,                        -- NULL if manually added
+    page_number     INTEGER,
+    day             INTEGER NOT NULL,                -- days since 1970-01-01
+    month           INTEGER NOT NULL,                -- YYYYMM
+    description     TEXT,
+    merchant        TEXT,
+    merchant_id     INTEGER,
+    category_id     INTEGER,
+    amount_minor    INTEGER NOT NULL,                -- amount × 100
+    type_code       INTEGER NOT NULL DEFAULT 0,      -- 0 = debit | 1 = credit
+    balance_minor   INTEGER,
+    currency        TEXT    DEFAULT 'USD',
+    notes           TEXT,
+    created_at      TEXT    NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id)     REFERENCES users(id),
+    FOREIGN KEY (import_id)   REFERENCES statement_imports(id),
+    FOREIGN KEY (merchant_id) REFERENCES merchants(id),
+    FOREIGN KEY (category_id) REFERENCES categories(id)
+);
+
+INSERT INTO transactions_new
+       (id, user_id, import_id, page_number, day, month, description,
+        merchant, merchant_id, category_id, amount_minor, type_code,
+        balance_minor, currency, notes, created_at)
+SELECT id, user_id, import_id, page_number,
+       CAST(julianday(COALESCE(date(date), date('now'))) - 2440587.5 AS INTEGER),
+       CAST(strftime('%Y%m', COALESCE(date(date), date('now'))) AS INTEGER),
+       description, merchant, merchant_id, category_id,
+       CAST(ROUND(amount * 100) AS INTEGER),
+       CASE txn_type WHEN 'credit' THEN 1 ELSE 0 END,
+       CAST(ROUND(balance * 100) AS INTEGER),
+       currency, notes, created_at
+FROM transactions;
+
+DROP TABLE transactions;
+ALTER TABLE transactions_new RENAME TO transactions;
+
+CREATE INDEX idx_txn_user_day      ON transactions(user_id, day);
+CREATE INDEX idx_txn_user_month    ON transactions(user_id, month);
+CREATE INDEX idx_txn_merchant      ON transactions(merchant);
+CREATE INDEX idx_txn_user_merchant ON transactions(user_id, merchant_id);
+CREATE INDEX idx_txn_category      ON transactions(category_id);
+CREATE INDEX idx_txn_import        ON transactions(import_id);
@@ -0,0 +1,22 @@
+-- Catalog job queue: one row per pending / running import job, so the
+-- worker finds work without scanning per-user databases.
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id     INTEGER NOT NULL,
+    job_id      INTEGER NOT NULL,                    -- import_jobs.id in the user's database
+    status      TEXT    NOT NULL DEFAULT 'queued',   -- queued | running
+    claimed_at  TEXT,
+    created_at  TEXT    NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_status ON job_queue(status, id);
+
+-- Carry over jobs queued before the queue existed
+INSERT INTO job_queue (user_id, job_id)
+SELECT si.user_id, ij.id
+FROM import_jobs ij
+JOIN statement_imports si ON si.id = ij.import_id
+WHERE ij.status = 'queued'
+ORDER BY ij.id;
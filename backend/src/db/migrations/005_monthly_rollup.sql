@@ -0,0 +1,66 @@
+-- Monthly rollup: per (user, month, category, type, currency) sums and
+-- counts, kept exact by triggers on every insert / update / delete of
+-- transactions (including bulk statements).
+
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    user_id     INTEGER NOT NULL,
+    month       INTEGER NOT NULL,                    -- YYYYMM
+    category_id INTEGER NOT NULL DEFAULT 0,          -- 0 = uncategorised
+    type_code   INTEGER NOT NULL,                    -- 0 = debit | 1 = credit
+    currency    TEXT    NOT NULL DEFAULT '',
+    total_minor INTEGER NOT NULL DEFAULT 0,
+    txn_count   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, month, category_id, type_code, currency)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency, total_minor, txn_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, 1)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor = total_minor + excluded.total_minor,
+            txn_count   = txn_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor = total_minor - OLD.amount_minor,
+           txn_count   = txn_count - 1
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+AFTER UPDATE OF user_id, month, category_id, type_code, currency, amount_minor ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor = total_minor - OLD.amount_minor,
+           txn_count   = txn_count - 1
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency, total_minor, txn_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, 1)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor = total_minor + excluded.total_minor,
+            txn_count   = txn_count + 1;
+END;
+
+-- Seed from existing rows
+INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency, total_minor, txn_count)
+SELECT user_id, month, COALESCE(category_id, 0), type_code, COALESCE(currency, ''),
+       SUM(amount_minor), COUNT(*)
+FROM transactions
+GROUP BY user_id, month, COALESCE(category_id, 0), type_code, COALESCE(currency, '');
@@ -0,0 +1,8 @@
+-- Per-user data version: bumped by every write that changes a user's
+-- transactions, so derived results (e.g. cached analytics) can be keyed on it.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    user_id  INTEGER PRIMARY KEY,
+    version  INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
@@ -0,0 +1,41 @@
+-- Budgets move to the compact encoding (month YYYYMM, amount in minor
+-- units) so budget-vs-actual is a key lookup into monthly_rollup, and
+-- budget_events records each threshold a budget crosses.
+
+CREATE TABLE budgets_new (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id      INTEGER NOT NULL,
+    category_id  INTEGER NOT NULL,
+    month        INTEGER NOT NULL,                   -- YYYYMM
+    amount_minor INTEGER NOT NULL,                   -- amount × 100
+    created_at   TEXT    NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id)     REFERENCES users(id),
+    FOREIGN KEY (category_id) REFERENCES categories(id),
+    UNIQUE(user_id, month, category_id)
+);
+
+INSERT INTO budgets_new (id, user_id, category_id, month, amount_minor, created_at)
+SELECT id, user_id, category_id,
+       CAST(substr(month, 1, 4) AS INTEGER) * 100 + CAST(substr(month, 6, 2) AS INTEGER),
+       CAST(ROUND(amount * 100) AS INTEGER),
+       created_at
+FROM budgets;
+
+DROP TABLE budgets;
+ALTER TABLE budgets_new RENAME TO budgets;
+
+CREATE TABLE IF NOT EXISTS budget_events (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    budget_id    INTEGER NOT NULL,
+    user_id      INTEGER NOT NULL,
+    month        INTEGER NOT NULL,                   -- YYYYMM
+    threshold    INTEGER NOT NULL,                   -- percent of the budget
+    spent_minor  INTEGER NOT NULL,                   -- spend when it was crossed
+    amount_minor INTEGER NOT NULL,                   -- budget at that time
+    created_at   TEXT    NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (budget_id) REFERENCES budgets(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id)   REFERENCES users(id),
+    UNIQUE(budget_id, threshold)
+);
+
+CREATE INDEX IF NOT EXISTS idx_budget_events_user ON budget_events(user_id, month);
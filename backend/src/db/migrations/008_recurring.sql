@@ -0,0 +1,24 @@
+-- Detected recurring payments: one row per (merchant, amount band) whose
+-- debits repeat on a regular cadence.  Rebuilt per merchant by
+-- src.recurring.detector after each import.
+
+CREATE TABLE IF NOT EXISTS recurring_payments (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id         INTEGER NOT NULL,
+    merchant_id     INTEGER NOT NULL,
+    amount_band     INTEGER NOT NULL,                -- geometric amount bucket
+    cadence         TEXT    NOT NULL,                -- weekly | biweekly | monthly | quarterly | yearly
+    period_days     INTEGER NOT NULL,                -- median gap between payments
+    amount_minor    INTEGER NOT NULL,                -- median amount × 100
+    txn_count       INTEGER NOT NULL,
+    first_day       INTEGER NOT NULL,                -- days since 1970-01-01
+    last_day        INTEGER NOT NULL,
+    next_day        INTEGER NOT NULL,                -- expected next payment
+    confidence      REAL    NOT NULL,                -- share of gaps matching the cadence
+    updated_at      TEXT    NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id)     REFERENCES users(id),
+    FOREIGN KEY (merchant_id) REFERENCES merchants(id),
+    UNIQUE(user_id, merchant_id, amount_band)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recurring_user_next ON recurring_payments(user_id, next_day);
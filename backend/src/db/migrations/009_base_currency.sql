@@ -0,0 +1,78 @@
+-- Multi-currency: dated FX rates (loaded from a file into the catalog), a
+-- base-currency amount stored on every transaction at persist time, and a
+-- base-currency total in the monthly rollup.  Existing rows are converted
+-- by migration 010.
+
+CREATE TABLE IF NOT EXISTS fx_rates (
+    currency    TEXT    NOT NULL,                    -- ISO code, upper case
+    day         INTEGER NOT NULL,                    -- days since 1970-01-01
+    rate        REAL    NOT NULL,                    -- BASE_CURRENCY per 1 unit of currency
+    PRIMARY KEY (currency, day)
+) WITHOUT ROWID;
+
+-- One row per file load; the newest id tells processes to reload rates
+CREATE TABLE IF NOT EXISTS fx_rate_loads (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    source      TEXT,
+    row_count   INTEGER NOT NULL,
+    loaded_at   TEXT    NOT NULL DEFAULT (datetime('now'))
+);
+
+ALTER TABLE transactions ADD COLUMN base_amount_minor INTEGER;     -- NULL = no rate yet
+ALTER TABLE monthly_rollup ADD COLUMN base_total_minor INTEGER NOT NULL DEFAULT 0;
+
+DROP TRIGGER IF EXISTS trg_rollup_insert;
+DROP TRIGGER IF EXISTS trg_rollup_delete;
+DROP TRIGGER IF EXISTS trg_rollup_update;
+
+CREATE TRIGGER trg_rollup_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency,
+                                total_minor, base_total_minor, txn_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, COALESCE(NEW.base_amount_minor, 0), 1)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor      = total_minor + excluded.total_minor,
+            base_total_minor = base_total_minor + excluded.base_total_minor,
+            txn_count        = txn_count + 1;
+END;
+
+CREATE TRIGGER trg_rollup_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor      = total_minor - OLD.amount_minor,
+           base_total_minor = base_total_minor - COALESCE(OLD.base_amount_minor, 0),
+           txn_count        = txn_count - 1
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+END;
+
+CREATE TRIGGER trg_rollup_update
+AFTER UPDATE OF user_id, month, category_id, type_code, currency, amount_minor, base_amount_minor
+ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor      = total_minor - OLD.amount_minor,
+           base_total_minor = base_total_minor - COALESCE(OLD.base_amount_minor, 0),
+           txn_count        = txn_count - 1
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency,
+                                total_minor, base_total_minor, txn_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, COALESCE(NEW.base_amount_minor, 0), 1)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor      = total_minor + excluded.total_minor,
+            base_total_minor = base_total_minor + excluded.base_total_minor,
+            txn_count        = txn_count + 1;
+END;
@@ -0,0 +1,23 @@
+"""Fill base_amount_minor for rows that existed before migration 009.
+
+Rows already in the base currency copy their amount; the rollup triggers
+carry it into ``base_total_minor``.  Other currencies stay NULL until
+rates are loaded (``python -m src.fx.rates load FILE``).  Users whose
+rows gained a base amount get a new data version, so cached analytics
+and ETags from before the migration are not reused.
+"""
+
+from config import Config
+from src.db.versions import bump_data_version
+
+
+def migrate(conn):
+    conn.execute(
+        """UPDATE transactions SET base_amount_minor = amount_minor
+           WHERE UPPER(COALESCE(currency, ?)) = ?""",
+        (Config.BASE_CURRENCY, Config.BASE_CURRENCY),
+    )
+    for (user_id,) in conn.execute(
+        "SELECT DISTINCT user_id FROM transactions WHERE base_amount_minor IS NOT NULL"
+    ).fetchall():
+        bump_data_version(conn, user_id)
@@ -0,0 +1,112 @@
+-- Daily ledger: per (user, category, day) running totals of base-currency
+-- credits and debits through the end of that day, so any date range is
+-- the difference of two rows.  category_id -1 holds the user's totals
+-- across all categories, 0 the uncategorised rows.  Triggers keep it exact;
+-- a write adjusts the rows from its day onwards (one row per active day).
+
+CREATE TABLE IF NOT EXISTS daily_ledger (
+    user_id      INTEGER NOT NULL,
+    category_id  INTEGER NOT NULL,                   -- -1 = all, 0 = uncategorised
+    day          INTEGER NOT NULL,                   -- days since 1970-01-01
+    day_count    INTEGER NOT NULL DEFAULT 0,         -- transactions on this day
+    credit_minor INTEGER NOT NULL DEFAULT 0,         -- cumulative through this day
+    debit_minor  INTEGER NOT NULL DEFAULT 0,
+    credit_count INTEGER NOT NULL DEFAULT 0,
+    debit_count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, category_id, day)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_insert AFTER INSERT ON transactions
+BEGIN
+    -- Open the day's rows with the totals carried from the previous active day
+    INSERT OR IGNORE INTO daily_ledger
+           (user_id, category_id, day, credit_minor, debit_minor, credit_count, debit_count)
+    SELECT NEW.user_id, k.id, NEW.day,
+           COALESCE(p.credit_minor, 0), COALESCE(p.debit_minor, 0),
+           COALESCE(p.credit_count, 0), COALESCE(p.debit_count, 0)
+    FROM (SELECT COALESCE(NEW.category_id, 0) AS id UNION ALL SELECT -1) k
+    LEFT JOIN daily_ledger p
+           ON p.user_id = NEW.user_id AND p.category_id = k.id
+          AND p.day = (SELECT MAX(day) FROM daily_ledger
+                       WHERE user_id = NEW.user_id AND category_id = k.id AND day < NEW.day);
+    UPDATE daily_ledger
+       SET day_count    = day_count + (day = NEW.day),
+           credit_minor = credit_minor + IIF(NEW.type_code = 1, COALESCE(NEW.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  + IIF(NEW.type_code = 0, COALESCE(NEW.base_amount_minor, 0), 0),
+           credit_count = credit_count + (NEW.type_code = 1),
+           debit_count  = debit_count  + (NEW.type_code = 0)
+     WHERE user_id = NEW.user_id AND category_id IN (COALESCE(NEW.category_id, 0), -1)
+       AND day >= NEW.day;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE daily_ledger
+       SET day_count    = day_count - (day = OLD.day),
+           credit_minor = credit_minor - IIF(OLD.type_code = 1, COALESCE(OLD.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  - IIF(OLD.type_code = 0, COALESCE(OLD.base_amount_minor, 0), 0),
+           credit_count = credit_count - (OLD.type_code = 1),
+           debit_count  = debit_count  - (OLD.type_code = 0)
+     WHERE user_id = OLD.user_id AND category_id IN (COALESCE(OLD.category_id, 0), -1)
+       AND day >= OLD.day;
+    DELETE FROM daily_ledger
+     WHERE user_id = OLD.user_id AND category_id IN (COALESCE(OLD.category_id, 0), -1)
+       AND day = OLD.day AND day_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ledger_update
+AFTER UPDATE OF user_id, day, category_id, type_code, base_amount_minor ON transactions
+BEGIN
+    UPDATE daily_ledger
+       SET day_count    = day_count - (day = OLD.day),
+           credit_minor = credit_minor - IIF(OLD.type_code = 1, COALESCE(OLD.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  - IIF(OLD.type_code = 0, COALESCE(OLD.base_amount_minor, 0), 0),
+           credit_count = credit_count - (OLD.type_code = 1),
+           debit_count  = debit_count  - (OLD.type_code = 0)
+     WHERE user_id = OLD.user_id AND category_id IN (COALESCE(OLD.category_id, 0), -1)
+       AND day >= OLD.day;
+    DELETE FROM daily_ledger
+     WHERE user_id = OLD.user_id AND category_id IN (COALESCE(OLD.category_id, 0), -1)
+       AND day = OLD.day AND day_count <= 0;
+    INSERT OR IGNORE INTO daily_ledger
+           (user_id, category_id, day, credit_minor, debit_minor, credit_count, debit_count)
+    SELECT NEW.user_id, k.id, NEW.day,
+           COALESCE(p.credit_minor, 0), COALESCE(p.debit_minor, 0),
+           COALESCE(p.credit_count, 0), COALESCE(p.debit_count, 0)
+    FROM (SELECT COALESCE(NEW.category_id, 0) AS id UNION ALL SELECT -1) k
+    LEFT JOIN daily_ledger p
+           ON p.user_id = NEW.user_id AND p.category_id = k.id
+          AND p.day = (SELECT MAX(day) FROM daily_ledger
+                       WHERE user_id = NEW.user_id AND category_id = k.id AND day < NEW.day);
+    UPDATE daily_ledger
+       SET day_count    = day_count + (day = NEW.day),
+           credit_minor = credit_minor + IIF(NEW.type_code = 1, COALESCE(NEW.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  + IIF(NEW.type_code = 0, COALESCE(NEW.base_amount_minor, 0), 0),
+           credit_count = credit_count + (NEW.type_code = 1),
+           debit_count  = debit_count  + (NEW.type_code = 0)
+     WHERE user_id = NEW.user_id AND category_id IN (COALESCE(NEW.category_id, 0), -1)
+       AND day >= NEW.day;
+END;
+
+-- Seed from existing rows
+WITH daily AS (
+    SELECT user_id, COALESCE(category_id, 0) AS category_id, day, COUNT(*) AS day_count,
+           SUM(IIF(type_code = 1, COALESCE(base_amount_minor, 0), 0)) AS credit,
+           SUM(IIF(type_code = 0, COALESCE(base_amount_minor, 0), 0)) AS debit,
+           SUM(type_code = 1) AS credits, SUM(type_code = 0) AS debits
+    FROM transactions
+    GROUP BY user_id, COALESCE(category_id, 0), day
+    UNION ALL
+    SELECT user_id, -1, day, COUNT(*),
+           SUM(IIF(type_code = 1, COALESCE(base_amount_minor, 0), 0)),
+           SUM(IIF(type_code = 0, COALESCE(base_amount_minor, 0), 0)),
+           SUM(type_code = 1), SUM(type_code = 0)
+    FROM transactions
+    GROUP BY user_id, day
+)
+INSERT INTO daily_ledger
+       (user_id, category_id, day, day_count, credit_minor, debit_minor, credit_count, debit_count)
+SELECT user_id, category_id, day, day_count,
+       SUM(credit) OVER w, SUM(debit) OVER w, SUM(credits) OVER w, SUM(debits) OVER w
+FROM daily
+WINDOW w AS (PARTITION BY user_id, category_id ORDER BY day);
@@ -0,0 +1,4 @@
+-- Token revocation: tokens carry the user's token_version ("ver" claim) and
+-- stop being accepted once it is bumped (logout everywhere).
+
+ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,48 @@
+-- Import pipeline timings (catalog): one row per stage of a job, per page
+-- for the page stages.  Triggers fold each row into Prometheus-style
+-- cumulative histogram buckets and per-outcome totals, so /api/metrics
+-- reads a few small tables from whichever process serves it.
+
+CREATE TABLE IF NOT EXISTS import_timings (
+    id          INTEGER PRIMARY KEY,
+    user_id     INTEGER NOT NULL,
+    job_id      INTEGER NOT NULL,                    -- import_jobs.id in the user's database
+    page_number INTEGER,                             -- NULL for job-level stages
+    stage       TEXT    NOT NULL,                    -- queue_wait | render | encode | llm | parse | persist | job
+    seconds     REAL    NOT NULL,
+    outcome     TEXT,                                -- parse: recovery step; job: completed | failed
+    created_at  TEXT    NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_timings_job ON import_timings(user_id, job_id);
+
+CREATE TABLE IF NOT EXISTS import_stage_buckets (
+    stage TEXT    NOT NULL,
+    le    REAL    NOT NULL,                          -- upper bound in seconds
+    count INTEGER NOT NULL DEFAULT 0,                -- cumulative: observations <= le
+    PRIMARY KEY (stage, le)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS import_stage_totals (
+    stage   TEXT    NOT NULL,
+    outcome TEXT    NOT NULL DEFAULT '',
+    count   INTEGER NOT NULL DEFAULT 0,
+    seconds REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (stage, outcome)
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO import_stage_buckets (stage, le)
+SELECT s.column1, b.column1
+FROM (VALUES ('queue_wait'), ('render'), ('encode'), ('llm'), ('parse'), ('persist'), ('job')) s,
+     (VALUES (0.005), (0.01), (0.025), (0.05), (0.1), (0.25), (0.5), (1.0), (2.5), (5.0),
+             (10.0), (30.0), (60.0), (120.0), (300.0), (600.0), (1800.0)) b;
+
+CREATE TRIGGER IF NOT EXISTS trg_import_timings_insert AFTER INSERT ON import_timings
+BEGIN
+    UPDATE import_stage_buckets SET count = count + 1
+     WHERE stage = NEW.stage AND le >= NEW.seconds;
+    INSERT INTO import_stage_totals (stage, outcome, count, seconds)
+    VALUES (NEW.stage, COALESCE(NEW.outcome, ''), 1, NEW.seconds)
+    ON CONFLICT (stage, outcome) DO UPDATE
+       SET count = count + 1, seconds = seconds + excluded.seconds;
+END;
@@ -0,0 +1,6 @@
+-- Page rows are now written when a PDF is rendered and updated with the
+-- LLM response per page; import deletion and the artifact garbage
+-- collector look pages and jobs up by import.
+
+CREATE INDEX IF NOT EXISTS idx_import_pages_import ON import_pages(import_id, page_number);
+CREATE INDEX IF NOT EXISTS idx_import_jobs_import  ON import_jobs(import_id);
@@ -0,0 +1,77 @@
+"""Scope merchants and their aliases to a user.
+
+Merchants were shared by everyone, so one user's merchant ids (and the
+merchants the others had seen) were visible to all.  Each user now gets
+their own ``merchants`` / ``merchant_aliases`` rows: the first user of an
+existing merchant keeps its id, every other user gets a copy under a new
+id, and their transactions and recurring payments are re-pointed.  Rows
+still without a ``merchant_id`` are then backfilled here; there is no
+migration 002, which would have done it against the shared tables.
+"""
+
+from src.merchants.service import backfill_merchants
+
+_STATEMENTS = [
+    """CREATE TABLE merchants_new (
+           id          INTEGER PRIMARY KEY AUTOINCREMENT,
+           user_id     INTEGER NOT NULL,
+           name        TEXT    NOT NULL,                -- display name
+           normalized  TEXT    NOT NULL,                -- canonical match key
+           created_at  TEXT    NOT NULL DEFAULT (datetime('now')),
+           FOREIGN KEY (user_id) REFERENCES users(id),
+           UNIQUE (user_id, normalized)
+       )""",
+    """CREATE TABLE merchant_aliases_new (
+           user_id     INTEGER NOT NULL,
+           alias       TEXT    NOT NULL,                -- lower-cased raw name
+           merchant_id INTEGER NOT NULL,
+           PRIMARY KEY (user_id, alias),
+           FOREIGN KEY (merchant_id) REFERENCES merchants(id)
+       ) WITHOUT ROWID""",
+    """CREATE TEMP TABLE merchant_users AS
+           SELECT merchant_id, user_id FROM transactions WHERE merchant_id IS NOT NULL
+           UNION
+           SELECT merchant_id, user_id FROM recurring_payments""",
+    # The first user of each merchant keeps its id …
+    """INSERT INTO merchants_new (id, user_id, name, normalized, created_at)
+       SELECT m.id, MIN(u.user_id), m.name, m.normalized, m.created_at
+       FROM merchants m JOIN merchant_users u ON u.merchant_id = m.id
+       GROUP BY m.id""",
+    # … every other user gets a copy
+    """INSERT INTO merchants_new (user_id, name, normalized, created_at)
+       SELECT u.user_id, m.name, m.normalized, m.created_at
+       FROM merchant_users u JOIN merchants m ON m.id = u.merchant_id
+       WHERE NOT EXISTS (SELECT 1 FROM merchants_new n WHERE n.id = m.id AND n.user_id = u.user_id)""",
+    """CREATE TEMP TABLE merchant_map AS
+           SELECT u.merchant_id AS old_id, u.user_id, n.id AS new_id
+           FROM merchant_users u
+           JOIN merchants m ON m.id = u.merchant_id
+           JOIN merchants_new n ON n.user_id = u.user_id AND n.normalized = m.normalized
+           WHERE n.id != u.merchant_id""",
+    """UPDATE transactions
+          SET merchant_id = (SELECT new_id FROM merchant_map
+                             WHERE old_id = transactions.merchant_id AND user_id = transactions.user_id)
+        WHERE (merchant_id, user_id) IN (SELECT old_id, user_id FROM merchant_map)""",
+    """UPDATE recurring_payments
+          SET merchant_id = (SELECT new_id FROM merchant_map
+                             WHERE old_id = recurring_payments.merchant_id AND user_id = recurring_payments.user_id)
+        WHERE (merchant_id, user_id) IN (SELECT old_id, user_id FROM merchant_map)""",
+    # Each user keeps every known spelling of their merchants
+    """INSERT OR IGNORE INTO merchant_aliases_new (user_id, alias, merchant_id)
+       SELECT n.user_id, a.alias, n.id
+       FROM merchant_aliases a
+       JOIN merchants m ON m.id = a.merchant_id
+       JOIN merchants_new n ON n.normalized = m.normalized""",
+    "DROP TABLE merchant_users",
+    "DROP TABLE merchant_map",
+    "DROP TABLE merchant_aliases",
+    "DROP TABLE merchants",
+    "ALTER TABLE merchants_new RENAME TO merchants",
+    "ALTER TABLE merchant_aliases_new RENAME TO merchant_aliases",
+]
+
+
+def migrate(conn):
+    for sql in _STATEMENTS:
+        conn.execute(sql)
+    backfill_merchants(conn)
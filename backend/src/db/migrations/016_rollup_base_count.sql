@@ -0,0 +1,75 @@
+-- Rows with no FX rate yet have a NULL base amount: they add nothing to
+-- base_total_minor, so base-currency averages and counts must leave them
+-- out too.  base_count counts the converted rows behind base_total_minor;
+-- txn_count still counts every row (it decides when a rollup row goes).
+
+ALTER TABLE monthly_rollup ADD COLUMN base_count INTEGER NOT NULL DEFAULT 0;
+
+DROP TRIGGER IF EXISTS trg_rollup_insert;
+DROP TRIGGER IF EXISTS trg_rollup_delete;
+DROP TRIGGER IF EXISTS trg_rollup_update;
+
+CREATE TRIGGER trg_rollup_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency,
+                                total_minor, base_total_minor, txn_count, base_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, COALESCE(NEW.base_amount_minor, 0), 1,
+            NEW.base_amount_minor IS NOT NULL)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor      = total_minor + excluded.total_minor,
+            base_total_minor = base_total_minor + excluded.base_total_minor,
+            txn_count        = txn_count + 1,
+            base_count       = base_count + excluded.base_count;
+END;
+
+CREATE TRIGGER trg_rollup_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor      = total_minor - OLD.amount_minor,
+           base_total_minor = base_total_minor - COALESCE(OLD.base_amount_minor, 0),
+           txn_count        = txn_count - 1,
+           base_count       = base_count - (OLD.base_amount_minor IS NOT NULL)
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+END;
+
+CREATE TRIGGER trg_rollup_update
+AFTER UPDATE OF user_id, month, category_id, type_code, currency, amount_minor, base_amount_minor
+ON transactions
+BEGIN
+    UPDATE monthly_rollup
+       SET total_minor      = total_minor - OLD.amount_minor,
+           base_total_minor = base_total_minor - COALESCE(OLD.base_amount_minor, 0),
+           txn_count        = txn_count - 1,
+           base_count       = base_count - (OLD.base_amount_minor IS NOT NULL)
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '');
+    DELETE FROM monthly_rollup
+     WHERE user_id = OLD.user_id AND month = OLD.month
+       AND category_id = COALESCE(OLD.category_id, 0) AND type_code = OLD.type_code
+       AND currency = COALESCE(OLD.currency, '') AND txn_count <= 0;
+    INSERT INTO monthly_rollup (user_id, month, category_id, type_code, currency,
+                                total_minor, base_total_minor, txn_count, base_count)
+    VALUES (NEW.user_id, NEW.month, COALESCE(NEW.category_id, 0), NEW.type_code,
+            COALESCE(NEW.currency, ''), NEW.amount_minor, COALESCE(NEW.base_amount_minor, 0), 1,
+            NEW.base_amount_minor IS NOT NULL)
+    ON CONFLICT (user_id, month, category_id, type_code, currency) DO UPDATE
+        SET total_minor      = total_minor + excluded.total_minor,
+            base_total_minor = base_total_minor + excluded.base_total_minor,
+            txn_count        = txn_count + 1,
+            base_count       = base_count + excluded.base_count;
+END;
+
+UPDATE monthly_rollup
+   SET base_count = (SELECT COUNT(t.base_amount_minor) FROM transactions t
+                     WHERE t.user_id = monthly_rollup.user_id AND t.month = monthly_rollup.month
+                       AND COALESCE(t.category_id, 0) = monthly_rollup.category_id
+                       AND t.type_code = monthly_rollup.type_code
+                       AND COALESCE(t.currency, '') = monthly_rollup.currency);
@@ -0,0 +1,99 @@
+-- Daily ledger, take two: one row of base-currency totals per (user, day,
+-- category) holding that day's own credits and debits, not running totals.
+-- The cumulative rows of migration 011 made every write rewrite each later
+-- active day (twice, with the all-categories rows), so back-dated imports,
+-- bulk edits and bulk deletes grew with the history after them.  Now a
+-- write touches the one or two rows of its own day and category, and a
+-- date range is read as whole months from monthly_rollup plus the days at
+-- either end from here (src.analytics.ledger).
+--
+-- credit_count / debit_count count converted rows only, like
+-- monthly_rollup.base_count; day_count counts every row and decides when
+-- a day's row goes.
+
+DROP TRIGGER IF EXISTS trg_ledger_insert;
+DROP TRIGGER IF EXISTS trg_ledger_delete;
+DROP TRIGGER IF EXISTS trg_ledger_update;
+DROP TABLE IF EXISTS daily_ledger;
+
+CREATE TABLE daily_ledger (
+    user_id      INTEGER NOT NULL,
+    day          INTEGER NOT NULL,                   -- days since 1970-01-01
+    category_id  INTEGER NOT NULL,                   -- 0 = uncategorised
+    day_count    INTEGER NOT NULL DEFAULT 0,         -- transactions on this day
+    credit_minor INTEGER NOT NULL DEFAULT 0,         -- this day's totals
+    debit_minor  INTEGER NOT NULL DEFAULT 0,
+    credit_count INTEGER NOT NULL DEFAULT 0,
+    debit_count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, category_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER trg_ledger_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO daily_ledger
+           (user_id, day, category_id, day_count, credit_minor, debit_minor, credit_count, debit_count)
+    VALUES (NEW.user_id, NEW.day, COALESCE(NEW.category_id, 0), 1,
+            IIF(NEW.type_code = 1, COALESCE(NEW.base_amount_minor, 0), 0),
+            IIF(NEW.type_code = 0, COALESCE(NEW.base_amount_minor, 0), 0),
+            NEW.type_code = 1 AND NEW.base_amount_minor IS NOT NULL,
+            NEW.type_code = 0 AND NEW.base_amount_minor IS NOT NULL)
+    ON CONFLICT (user_id, day, category_id) DO UPDATE
+        SET day_count    = day_count + 1,
+            credit_minor = credit_minor + excluded.credit_minor,
+            debit_minor  = debit_minor + excluded.debit_minor,
+            credit_count = credit_count + excluded.credit_count,
+            debit_count  = debit_count + excluded.debit_count;
+END;
+
+CREATE TRIGGER trg_ledger_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE daily_ledger
+       SET day_count    = day_count - 1,
+           credit_minor = credit_minor - IIF(OLD.type_code = 1, COALESCE(OLD.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  - IIF(OLD.type_code = 0, COALESCE(OLD.base_amount_minor, 0), 0),
+           credit_count = credit_count - (OLD.type_code = 1 AND OLD.base_amount_minor IS NOT NULL),
+           debit_count  = debit_count  - (OLD.type_code = 0 AND OLD.base_amount_minor IS NOT NULL)
+     WHERE user_id = OLD.user_id AND day = OLD.day AND category_id = COALESCE(OLD.category_id, 0);
+    DELETE FROM daily_ledger
+     WHERE user_id = OLD.user_id AND day = OLD.day AND category_id = COALESCE(OLD.category_id, 0)
+       AND day_count <= 0;
+END;
+
+CREATE TRIGGER trg_ledger_update
+AFTER UPDATE OF user_id, day, category_id, type_code, base_amount_minor ON transactions
+BEGIN
+    UPDATE daily_ledger
+       SET day_count    = day_count - 1,
+           credit_minor = credit_minor - IIF(OLD.type_code = 1, COALESCE(OLD.base_amount_minor, 0), 0),
+           debit_minor  = debit_minor  - IIF(OLD.type_code = 0, COALESCE(OLD.base_amount_minor, 0), 0),
+           credit_count = credit_count - (OLD.type_code = 1 AND OLD.base_amount_minor IS NOT NULL),
+           debit_count  = debit_count  - (OLD.type_code = 0 AND OLD.base_amount_minor IS NOT NULL)
+     WHERE user_id = OLD.user_id AND day = OLD.day AND category_id = COALESCE(OLD.category_id, 0);
+    DELETE FROM daily_ledger
+     WHERE user_id = OLD.user_id AND day = OLD.day AND category_id = COALESCE(OLD.category_id, 0)
+       AND day_count <= 0;
+    INSERT INTO daily_ledger
+           (user_id, day, category_id, day_count, credit_minor, debit_minor, credit_count, debit_count)
+    VALUES (NEW.user_id, NEW.day, COALESCE(NEW.category_id, 0), 1,
+            IIF(NEW.type_code = 1, COALESCE(NEW.base_amount_minor, 0), 0),
+            IIF(NEW.type_code = 0, COALESCE(NEW.base_amount_minor, 0), 0),
+            NEW.type_code = 1 AND NEW.base_amount_minor IS NOT NULL,
+            NEW.type_code = 0 AND NEW.base_amount_minor IS NOT NULL)
+    ON CONFLICT (user_id, day, category_id) DO UPDATE
+        SET day_count    = day_count + 1,
+            credit_minor = credit_minor + excluded.credit_minor,
+            debit_minor  = debit_minor + excluded.debit_minor,
+            credit_count = credit_count + excluded.credit_count,
+            debit_count  = debit_count + excluded.debit_count;
+END;
+
+-- Seed from existing rows
+INSERT INTO daily_ledger
+       (user_id, day, category_id, day_count, credit_minor, debit_minor, credit_count, debit_count)
+SELECT user_id, day, COALESCE(category_id, 0), COUNT(*),
+       SUM(IIF(type_code = 1, COALESCE(base_amount_minor, 0), 0)),
+       SUM(IIF(type_code = 0, COALESCE(base_amount_minor, 0), 0)),
+       SUM(type_code = 1 AND base_amount_minor IS NOT NULL),
+       SUM(type_code = 0 AND base_amount_minor IS NOT NULL)
+FROM transactions
+GROUP BY user_id, day, COALESCE(category_id, 0);
@@ -1,5 +1,5 @@
 -- ================================================================
--- HisabKitab – SQLite Schema
+-- HisabKitab – SQLite Schema (baseline; later changes live in migrations/)
 -- ================================================================
 
 -- Users
@@ -0,0 +1,165 @@
+"""Opt-in SQL tracing (``SQL_TRACE``) for connections opened by ``connect``.
+
+Traced connections hand out ``TracedCursor``s, which time each statement
+from ``execute`` until its rows are fetched (or the cursor is dropped)
+and count the rows.  Every statement is aggregated by its SQL text; one
+that takes ``SLOW_QUERY_MS`` or longer is logged with its query plan.
+During a request the totals are also added to ``g`` (``sql_queries`` /
+``sql_seconds``) for the per-route metrics.  Nothing here runs when
+tracing is off.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+
+from config import Config
+
+# Distinct statements kept; further ones are folded into one bucket
+_MAX_STATEMENTS = 1000
+_OVERFLOW_KEY = "(other statements)"
+
+_stats: dict[str, list] = {}        # sql → [count, seconds, max_seconds, rows]
+_stats_lock = threading.Lock()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's time and row count on completion."""
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._begin(sql, parameters, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._begin(sql, None, time.perf_counter() - started)
+            self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, 0 if row is None else 1, done=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), done=not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), done=True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, done=True)
+            raise
+        self._fetched(started, 1, done=False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+    def _begin(self, sql, parameters, seconds: float):
+        self._sql, self._params, self._seconds, self._rows = sql, parameters, seconds, 0
+
+    def _fetched(self, started: float, rows: int, done: bool):
+        if self._sql is None:
+            return
+        self._seconds += time.perf_counter() - started
+        self._rows += rows
+        if done:
+            self._finish()
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        rows = self._rows or max(self.rowcount, 0)
+        record(self.connection, sql, self._params, self._seconds, rows)
+
+
+def record(conn, sql: str, parameters, seconds: float, rows: int):
+    """Aggregate one statement; log it with its plan if it was slow."""
+    key = " ".join(sql.split())
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= _MAX_STATEMENTS:
+                key = _OVERFLOW_KEY
+            entry = _stats.setdefault(key, [0, 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+        entry[3] += rows
+
+    flask = sys.modules.get("flask")        # not loaded in the standalone worker
+    if flask is not None and flask.has_app_context():
+        flask.g.sql_queries = flask.g.get("sql_queries", 0) + 1
+        flask.g.sql_seconds = flask.g.get("sql_seconds", 0.0) + seconds
+
+    if seconds * 1000 >= Config.SLOW_QUERY_MS:
+        where = f" ({flask.request.endpoint})" if flask is not None and flask.has_request_context() else ""
+        print(f"[SQL] slow query{where}: {seconds * 1000:.1f} ms, {rows} rows\n    {key}")
+        for line in query_plan(conn, sql, parameters):
+            print(f"    {line}")
+
+
+def query_plan(conn, sql: str, parameters) -> list[str]:
+    """``EXPLAIN QUERY PLAN`` as indented lines (empty if it cannot be explained)."""
+    if parameters is None:          # executemany: no single parameter set to explain
+        return []
+    try:
+        plan = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error:
+        return []
+    depth: dict[int, int] = {0: 0}
+    lines = []
+    for node_id, parent, _, detail in plan:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return lines
+
+
+def statement_stats(limit: int = 50) -> list[dict]:
+    """The *limit* statements with the most total time, slowest first."""
+    with _stats_lock:
+        items = [(sql, list(v)) for sql, v in _stats.items()]
+    items.sort(key=lambda item: item[1][1], reverse=True)
+    return [
+        {
+            "sql": sql,
+            "count": count,
+            "total_ms": round(seconds * 1000, 3),
+            "mean_ms": round(seconds * 1000 / count, 3),
+            "max_ms": round(max_seconds * 1000, 3),
+            "rows": rows,
+        }
+        for sql, (count, seconds, max_seconds, rows) in items[:limit]
+    ]
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
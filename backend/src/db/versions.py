@@ -0,0 +1,38 @@
+"""Per-user data versions (``data_versions`` table, migration 006).
+
+Every write path that changes a user's transactions calls
+``bump_data_version`` inside its write function, so the bump commits
+together with the change.  Readers key derived results on
+``data_version``; a user with no row is at version 0.
+"""
+
+from src.db.connection import get_read_db
+
+
+def bump_data_version(db, user_id: int | None):
+    """Increment *user_id*'s version (everyone's when None).  Does not commit."""
+    if user_id is None:
+        db.execute(
+            """INSERT INTO data_versions (user_id, version)
+               SELECT id, 1 FROM users WHERE true
+               ON CONFLICT (user_id) DO UPDATE SET version = version + 1"""
+        )
+    else:
+        db.execute(
+            """INSERT INTO data_versions (user_id, version) VALUES (?, 1)
+               ON CONFLICT (user_id) DO UPDATE SET version = version + 1""",
+            (user_id,),
+        )
+
+
+def data_version(user_id: int, db=None) -> int:
+    """Current version for *user_id*, read on *db* or a fresh read connection."""
+    conn = db or get_read_db(user_id)
+    try:
+        row = conn.execute(
+            "SELECT version FROM data_versions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row["version"] if row else 0
+    finally:
+        if db is None:
+            conn.close()
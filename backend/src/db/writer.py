@@ -0,0 +1,141 @@
+"""Serialised writer – one thread owns all write connections.
+
+Write paths hand a function ``fn(db)`` to ``run_write``; the writer thread
+runs queued functions back-to-back and commits them together (group
+commit), one transaction per database file.  Each function runs inside its
+own savepoint, so a failing write is rolled back without affecting the
+others in its batch.  Callers get the function's return value (or its
+exception) only after the commit.
+
+Functions must not call ``commit`` / ``rollback`` themselves.
+
+The writer is per process.  Under gunicorn, or next to a standalone import
+worker, writers in different processes still compete for SQLite's write
+lock: a batch waits up to ``WRITER_BUSY_TIMEOUT_MS`` for it and is retried
+``WRITER_LOCK_RETRIES`` times before its writes fail with "database is
+locked".  Nothing has run by then, so a retry is safe.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+from config import Config
+from src.db.connection import Connection, connect, db_path
+
+_MAX_OPEN_CONNECTIONS = 64          # per-user mode: shards kept open by the writer
+
+_queue: "queue.Queue[tuple]" = queue.Queue()
+_writer_thread: threading.Thread | None = None
+_start_lock = threading.Lock()
+
+
+def submit(fn, user_id: int | None = None, catalog: bool = False) -> Future:
+    """Queue ``fn(db)`` against *user_id*'s database (or the catalog) and return a Future."""
+    if threading.current_thread() is _writer_thread:
+        raise RuntimeError("run_write called from inside a write function")
+    future: Future = Future()
+    # Resolve the file now: the writer thread has no request context
+    path = db_path(user_id, catalog=catalog)
+    _ensure_started()
+    _queue.put((path, fn, future))
+    return future
+
+
+def run_write(fn, user_id: int | None = None, catalog: bool = False):
+    """Run ``fn(db)`` on the writer thread and return its result."""
+    return submit(fn, user_id, catalog).result()
+
+
+def _ensure_started():
+    global _writer_thread
+    if _writer_thread and _writer_thread.is_alive():
+        return
+    with _start_lock:
+        if _writer_thread and _writer_thread.is_alive():
+            return
+        _writer_thread = threading.Thread(target=_write_loop, daemon=True, name="db-writer")
+        _writer_thread.start()
+
+
+def _next_batch() -> list[tuple]:
+    """Block for one task, then gather more for up to the group-commit window."""
+    batch = [_queue.get()]
+    deadline = time.monotonic() + Config.WRITER_GROUP_COMMIT_MS / 1000
+    while len(batch) < Config.WRITER_BATCH_MAX:
+        timeout = deadline - time.monotonic()
+        try:
+            batch.append(_queue.get(timeout=timeout) if timeout > 0 else _queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write_loop():
+    conns: dict[str, Connection] = {}
+    while True:
+        batch = _next_batch()
+        by_path: dict[str, list[tuple]] = {}
+        for path, fn, future in batch:
+            by_path.setdefault(path, []).append((fn, future))
+
+        for path, tasks in by_path.items():
+            try:
+                db = conns.pop(path, None)
+                if db is None:
+                    db = connect(path)
+                    db.isolation_level = None      # explicit BEGIN / COMMIT below
+                conns[path] = db                   # most recently used last
+                if len(conns) > _MAX_OPEN_CONNECTIONS:
+                    conns.pop(next(iter(conns))).close()
+                _commit_group(db, tasks)
+            except Exception as e:
+                traceback.print_exc()
+                stale = conns.pop(path, None)
+                if stale is not None:
+                    stale.close()
+                for _, future in tasks:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+def _begin(db: Connection):
+    """Take the write lock, retrying while another process holds it."""
+    db.execute(f"PRAGMA busy_timeout = {Config.WRITER_BUSY_TIMEOUT_MS}")
+    for attempt in range(Config.WRITER_LOCK_RETRIES + 1):
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == Config.WRITER_LOCK_RETRIES:
+                raise
+            print(f"[DB] Write lock on {db.path} busy, retrying ({attempt + 1}/{Config.WRITER_LOCK_RETRIES})")
+
+
+def _commit_group(db: Connection, tasks: list[tuple]):
+    results = []
+    _begin(db)
+    try:
+        for fn, future in tasks:
+            db.execute("SAVEPOINT task")
+            try:
+                results.append((future, fn(db), None))
+                db.execute("RELEASE task")
+            except Exception as e:
+                db.execute("ROLLBACK TO task")
+                db.execute("RELEASE task")
+                results.append((future, None, e))
+        db.execute("COMMIT")
+    except Exception:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        raise
+
+    for future, result, error in results:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -0,0 +1,132 @@
+"""In-memory, fingerprinted and precompressed frontend assets.
+
+At startup every file under ``frontend/`` is read once.  CSS, JS and
+other assets get a content-hash URL (``css/style.3f2a9c1b7e.css``) served
+with a one-year immutable cache lifetime; HTML pages keep their names, are
+rewritten to reference the fingerprinted URLs and are revalidated on each
+visit (``no-cache`` + ETag, so a repeat visit is a 304).  Each file is
+also stored gzip- and, when the ``brotli`` package is installed,
+Brotli-compressed, and the smallest encoding the client accepts is sent.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:         # optional – gzip only
+    brotli = None
+
+_COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg", ".txt", ".map"}
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_REVALIDATE = "no-cache"
+_REFERENCE = re.compile(r'(\b(?:href|src)=")([^":?#]+)(")')
+
+
+class Asset:
+    __slots__ = ("mimetype", "etag", "cache_control", "bodies")
+
+    def __init__(self, mimetype: str, etag: str, cache_control: str, bodies: dict[str, bytes]):
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        self.bodies = bodies            # content-encoding ("" = identity) → bytes
+
+    def body_for(self, accept_encoding: str) -> tuple[str, bytes]:
+        """The smallest stored encoding the client accepts."""
+        accepted = {e.split(";")[0].strip() for e in accept_encoding.lower().split(",")}
+        options = [(len(b), enc, b) for enc, b in self.bodies.items() if not enc or enc in accepted]
+        _, encoding, body = min(options)
+        return encoding, body
+
+
+def _compressed(data: bytes) -> dict[str, bytes]:
+    bodies = {"": data}
+    candidates = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(data, quality=11)
+    for encoding, body in candidates.items():
+        if len(body) < len(data):
+            bodies[encoding] = body
+    return bodies
+
+
+def _fingerprinted(path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest[:10]}{ext}"
+
+
+class AssetStore:
+    """Every frontend file, keyed by URL path (both plain and fingerprinted)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._assets: dict[str, Asset] = {}
+        self._mtimes: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _scan(self) -> dict[str, float]:
+        found = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                found[os.path.relpath(full, self.root).replace(os.sep, "/")] = os.path.getmtime(full)
+        return found
+
+    def load(self):
+        mtimes = self._scan()
+        raw = {}
+        for path in mtimes:
+            with open(os.path.join(self.root, path), "rb") as f:
+                raw[path] = f.read()
+
+        assets, urls = {}, {}
+        for path, data in raw.items():
+            if path.endswith(".html"):
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            urls[path] = _fingerprinted(path, digest)
+            asset = self._asset(path, data, digest, _IMMUTABLE)
+            assets[urls[path]] = asset
+            # The plain name stays reachable, but must be revalidated
+            assets[path] = self._asset(path, data, digest, _REVALIDATE)
+        for path, data in raw.items():
+            if not path.endswith(".html"):
+                continue
+            html = _REFERENCE.sub(
+                lambda m: m.group(1) + urls.get(m.group(2), m.group(2)) + m.group(3),
+                data.decode("utf-8"),
+            ).encode("utf-8")
+            assets[path] = self._asset(path, html, hashlib.sha256(html).hexdigest(), _REVALIDATE)
+
+        with self._lock:
+            self._assets, self._mtimes = assets, mtimes
+
+    @staticmethod
+    def _asset(path: str, data: bytes, digest: str, cache_control: str) -> Asset:
+        ext = os.path.splitext(path)[1].lower()
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        bodies = _compressed(data) if ext in _COMPRESSIBLE else {"": data}
+        return Asset(mimetype, digest[:32], cache_control, bodies)
+
+    def reload_if_changed(self):
+        """Re-read everything if a file was added, removed or modified (debug mode)."""
+        if self._scan() != self._mtimes:
+            self.load()
+
+    def get(self, path: str) -> Asset | None:
+        with self._lock:
+            return self._assets.get(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "assets": len(self._assets),
+                "bytes": sum(len(b) for a in self._assets.values() for b in a.bodies.values()),
+                "brotli": brotli is not None,
+            }
@@ -0,0 +1,43 @@
+"""Frontend blueprint – serves the HTML/CSS/JS in ``frontend/`` from memory."""
+
+import os
+
+from flask import Blueprint, Response, current_app, request
+
+from src.frontend.assets import AssetStore
+
+FRONTEND_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "frontend")
+)
+
+frontend_bp = Blueprint("frontend", __name__)
+
+assets = AssetStore(FRONTEND_DIR)
+
+
+def _send(path: str) -> Response:
+    asset = assets.get(path) or assets.get("index.html")    # SPA-style fallback
+    encoding, body = asset.body_for(request.headers.get("Accept-Encoding", ""))
+    etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+    headers = {"Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(body, mimetype=asset.mimetype, headers=headers)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    return response
+
+
+@frontend_bp.route("/")
+def serve_index():
+    return serve_frontend("index.html")
+
+
+@frontend_bp.route("/<path:filename>")
+def serve_frontend(filename):
+    """Serve any file from the frontend/ folder (html, css, js, etc.)."""
+    if current_app.debug:
+        assets.reload_if_changed()
+    return _send(filename)
@@ -0,0 +1,193 @@
+"""FX rates and base-currency conversion.
+
+Dated rates (``BASE_CURRENCY`` per unit of a currency) live in the
+catalog's ``fx_rates`` table, loaded from a CSV file.  Each transaction's
+``base_amount_minor`` is computed once when it is saved, using the
+nearest rate on or before its day (or the earliest rate for older days),
+so analytics aggregate a stored column instead of converting per query.
+Rows with no usable rate keep NULL and drop out of base totals until
+rates arrive.  After loading new rates, stored amounts are re-converted
+in bulk:
+
+    python -m src.fx.rates load rates.csv        # date,currency,rate – then re-convert
+    python -m src.fx.rates reconvert [--user ID] [--currency EUR]
+"""
+
+import argparse
+import bisect
+import csv
+import math
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+
+from config import Config
+from src.db.connection import get_catalog_db, get_read_db, init_db, user_ids_with_data
+from src.db.versions import bump_data_version
+from src.db.writer import run_write
+from src.transactions.codec import to_day
+
+_RECONVERT_BATCH = 5000
+
+
+class RateTable:
+    """Per-currency rates sorted by day, searched by bisection."""
+
+    def __init__(self, rows):
+        self._days: dict[str, list[int]] = {}
+        self._rates: dict[str, list[Decimal]] = {}
+        for currency, day, rate in rows:                 # ordered by currency, day
+            self._days.setdefault(currency, []).append(day)
+            self._rates.setdefault(currency, []).append(Decimal(str(rate)))
+
+    def currencies(self) -> list[str]:
+        return sorted(self._days)
+
+    def convert(self, amount_minor: int | None, currency: str | None, day: int) -> int | None:
+        """*amount_minor* in the base currency, or None without a rate."""
+        if amount_minor is None:
+            return None
+        currency = (currency or Config.BASE_CURRENCY).upper()
+        if currency == Config.BASE_CURRENCY:
+            return amount_minor
+        days = self._days.get(currency)
+        if not days:
+            return None
+        i = max(bisect.bisect_right(days, day) - 1, 0)
+        return int((amount_minor * self._rates[currency][i]).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+_table: RateTable | None = None
+_table_load: int | None = None
+_table_lock = threading.Lock()
+
+
+def current_rates() -> RateTable:
+    """The loaded rates, re-read from the catalog only after a new load."""
+    global _table, _table_load
+    catalog = get_catalog_db()
+    try:
+        load_id = catalog.execute("SELECT MAX(id) FROM fx_rate_loads").fetchone()[0]
+        with _table_lock:
+            if _table is not None and _table_load == load_id:
+                return _table
+        rows = catalog.execute(
+            "SELECT currency, day, rate FROM fx_rates ORDER BY currency, day"
+        ).fetchall()
+    finally:
+        catalog.close()
+    table = RateTable(rows)
+    with _table_lock:
+        _table, _table_load = table, load_id
+    return table
+
+
+def load_rates_file(path: str) -> int:
+    """
+    Upsert ``date,currency,rate`` rows from the CSV at *path* into the
+    catalog.  Raises ValueError on a malformed row.  Returns rows loaded.
+    """
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, rec in enumerate(csv.DictReader(f), start=2):
+            try:
+                currency = rec["currency"].strip().upper()
+                rate = float(rec["rate"])
+                day = to_day(rec["date"].strip())
+            except (KeyError, AttributeError, TypeError, ValueError) as exc:
+                raise ValueError(f"{path}:{line}: expected date,currency,rate ({exc})") from None
+            if len(currency) != 3 or not math.isfinite(rate) or rate <= 0:
+                raise ValueError(f"{path}:{line}: bad currency or rate")
+            rows.append((currency, day, rate))
+
+    def _write(db) -> int:
+        db.executemany(
+            """INSERT INTO fx_rates (currency, day, rate) VALUES (?, ?, ?)
+               ON CONFLICT (currency, day) DO UPDATE SET rate = excluded.rate""",
+            rows,
+        )
+        db.execute("INSERT INTO fx_rate_loads (source, row_count) VALUES (?, ?)", (path, len(rows)))
+        return len(rows)
+
+    return run_write(_write, catalog=True)
+
+
+def _reconvert_shard(rates: RateTable, shard: int | None, user_id: int | None,
+                     currencies: list[str] | None) -> int:
+    where, params = "1 = 1", []
+    if user_id is not None:
+        where += " AND user_id = ?"
+        params.append(user_id)
+    if currencies:
+        where += f" AND UPPER(COALESCE(currency, ?)) IN ({','.join('?' * len(currencies))})"
+        params += [Config.BASE_CURRENCY] + [c.upper() for c in currencies]
+
+    def _apply(batch: list[tuple], users: set[int]):
+        def _write(db):
+            db.executemany("UPDATE transactions SET base_amount_minor = ? WHERE id = ?", batch)
+            for uid in users:
+                bump_data_version(db, uid)
+        run_write(_write, shard)
+
+    db = get_read_db(shard)
+    try:
+        cur = db.execute(
+            f"""SELECT id, user_id, amount_minor, currency, day, base_amount_minor
+                FROM transactions WHERE {where}""",
+            params,
+        )
+        changed = 0
+        while rows := cur.fetchmany(_RECONVERT_BATCH):
+            batch, users = [], set()
+            for r in rows:
+                base = rates.convert(r["amount_minor"], r["currency"], r["day"])
+                if base != r["base_amount_minor"]:
+                    batch.append((base, r["id"]))
+                    users.add(r["user_id"])
+            if batch:
+                _apply(batch, users)
+                changed += len(batch)
+        return changed
+    finally:
+        db.close()
+
+
+def reconvert(user_id: int | None = None, currencies: list[str] | None = None) -> int:
+    """
+    Recompute ``base_amount_minor`` with the current rates for *user_id*
+    (or everyone), optionally only rows in *currencies*.  Only rows whose
+    value changes are written, in batches; the rollup triggers keep
+    ``base_total_minor`` in step.  Returns rows updated.
+    """
+    rates = current_rates()
+    shards = user_ids_with_data()
+    if user_id is not None and shards != [None]:
+        shards = [s for s in shards if s == user_id]
+    return sum(_reconvert_shard(rates, shard, user_id, currencies) for shard in shards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load FX rates and re-convert stored base amounts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="load a date,currency,rate CSV, then re-convert")
+    load.add_argument("file")
+    load.add_argument("--no-reconvert", action="store_true", help="only load the rates")
+    again = sub.add_parser("reconvert", help="re-convert with the rates already loaded")
+    again.add_argument("--user", type=int, help="only this user (default: everyone)")
+    again.add_argument("--currency", action="append", help="only this currency (repeatable)")
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == "load":
+        try:
+            count = load_rates_file(args.file)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"[FX] {exc}")
+        print(f"[FX] Loaded {count} rates from {args.file}")
+        if args.no_reconvert:
+            return
+        args.user, args.currency = None, None
+    print(f"[FX] Re-converted {reconvert(args.user, args.currency)} transactions to {Config.BASE_CURRENCY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Content-addressed storage for uploaded PDFs and rendered page images.
+
+Files are stored under their SHA-256 – ``<folder>/<ab>/<abcdef…>.<ext>`` –
+so uploading the same statement twice (or rendering the same page again)
+keeps one copy on disk, spread over at most 256 sub-directories.  The rows
+that point at them (``statement_imports.stored_path``,
+``import_pages.image_path``) are the only references; nothing is counted.
+
+``collect_garbage`` reconciles both folders against those rows in every
+database and deletes the files no retained row points at:
+
+* page images once their job has completed (``PAGE_IMAGE_RETENTION=failed``,
+  the default), once it has finished either way (``none``) or never (``all``);
+* uploaded PDFs ``UPLOAD_RETENTION_DAYS`` after their import completed
+  (0 keeps them as long as the import exists);
+* everything of a deleted import, stray temp files and files from the old
+  per-import layout.
+
+Files younger than ``ARTIFACT_GC_GRACE`` seconds are never deleted.  Storing
+an artifact refreshes its mtime, which covers the moment between writing a
+file and committing the row that refers to it.  The import worker runs a
+pass every ``ARTIFACT_GC_INTERVAL`` seconds; to run one by hand:
+
+    python -m src.imports.artifacts [--dry-run]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import traceback
+
+from config import Config
+from src.db.connection import connect, db_path, init_db, per_user_storage, user_db_path, user_ids_with_data
+
+_CHUNK = 1024 * 1024
+_TMP_PREFIX = ".tmp-"
+_FANOUT = re.compile(r"^[0-9a-f]{2}$")
+
+# Job statuses whose page images are no longer needed, per retention policy
+_RELEASED_IMAGES = {"all": [], "failed": ["completed"], "none": ["completed", "failed"]}
+
+_gc_thread: threading.Thread | None = None
+_gc_stop = threading.Event()
+
+
+# ── Storing ─────────────────────────────────────────
+
+def store_stream(folder: str, stream, ext: str) -> str:
+    """Copy *stream* into *folder* under its content hash; returns the stored path."""
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: stream.read(_CHUNK), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        hexdigest = digest.hexdigest()
+        path = os.path.join(folder, hexdigest[:2], hexdigest + ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.utime(path)                  # already stored: restart its grace period
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            os.replace(tmp_path, path)
+        return path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def store_bytes(folder: str, data: bytes, ext: str) -> str:
+    return store_stream(folder, io.BytesIO(data), ext)
+
+
+# ── Garbage collection ──────────────────────────────
+
+def _database_paths() -> list[str]:
+    paths = [db_path(catalog=True)]
+    if per_user_storage():
+        paths += [user_db_path(user_id) for user_id in user_ids_with_data()]
+    return paths
+
+
+def retained_paths() -> set[str]:
+    """Absolute paths of every artifact a row still needs under the retention settings."""
+    released = json.dumps(_RELEASED_IMAGES.get(Config.PAGE_IMAGE_RETENTION, []))
+    days = Config.UPLOAD_RETENTION_DAYS
+    retained = set()
+    for path in _database_paths():
+        db = connect(path, readonly=True)
+        try:
+            rows = db.execute(
+                """SELECT stored_path FROM statement_imports si
+                   WHERE ? <= 0 OR NOT EXISTS (
+                       SELECT 1 FROM import_jobs j
+                       WHERE j.import_id = si.id AND j.status = 'completed'
+                         AND j.completed_at <= datetime('now', printf('-%d days', ?)))""",
+                (days, days),
+            ).fetchall()
+            rows += db.execute(
+                """SELECT image_path FROM import_pages p
+                   WHERE NOT EXISTS (
+                       SELECT 1 FROM import_jobs j
+                       WHERE j.import_id = p.import_id
+                         AND j.status IN (SELECT value FROM json_each(?)))""",
+                (released,),
+            ).fetchall()
+        finally:
+            db.close()
+        retained.update(os.path.abspath(r[0]) for r in rows)
+    return retained
+
+
+def _remove_empty_dirs(folder: str):
+    """Drop emptied per-import directories of the old layout (fan-out directories stay)."""
+    for dirpath, _, _ in os.walk(folder, topdown=False):
+        if os.path.samefile(dirpath, folder) or _FANOUT.match(os.path.basename(dirpath)):
+            continue
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass                            # not empty
+
+
+def collect_garbage(dry_run: bool = False) -> dict:
+    """Delete unreferenced artifacts older than the grace period; returns what was removed and kept."""
+    started = time.perf_counter()
+    cutoff = time.time() - Config.ARTIFACT_GC_GRACE
+    folders = [f for f in (Config.UPLOAD_FOLDER, Config.CONVERTED_IMAGES_FOLDER) if os.path.isdir(f)]
+
+    # List files before reading the rows, so a file stored meanwhile is either
+    # not listed or already referenced
+    files = []
+    for folder in folders:
+        for dirpath, _, filenames in os.walk(folder):
+            for name in filenames:
+                path = os.path.abspath(os.path.join(dirpath, name))
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((path, st.st_size, st.st_mtime))
+    retained = retained_paths()
+
+    result = {"removed": 0, "removed_bytes": 0, "kept": 0, "kept_bytes": 0}
+    for path, size, mtime in files:
+        if path not in retained and mtime <= cutoff:
+            try:
+                if os.stat(path).st_mtime <= cutoff:     # not stored again since listing
+                    if not dry_run:
+                        os.remove(path)
+                    result["removed"] += 1
+                    result["removed_bytes"] += size
+                    continue
+            except FileNotFoundError:
+                continue
+        result["kept"] += 1
+        result["kept_bytes"] += size
+    if not dry_run:
+        for folder in folders:
+            _remove_empty_dirs(folder)
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"[GC] {'would remove' if dry_run else 'removed'} {result['removed']} files "
+          f"({result['removed_bytes'] / 1e6:.1f} MB), keeping {result['kept']} "
+          f"({result['kept_bytes'] / 1e6:.1f} MB) in {result['seconds']} s")
+    return result
+
+
+def start_gc():
+    """Run ``collect_garbage`` every ``ARTIFACT_GC_INTERVAL`` seconds on a daemon thread (idempotent)."""
+    global _gc_thread
+    if Config.ARTIFACT_GC_INTERVAL <= 0 or (_gc_thread is not None and _gc_thread.is_alive()):
+        return
+    _gc_stop.clear()
+    _gc_thread = threading.Thread(target=_gc_loop, daemon=True, name="artifact-gc")
+    _gc_thread.start()
+
+
+def stop_gc():
+    _gc_stop.set()
+    if _gc_thread is not None:
+        _gc_thread.join()
+
+
+def _gc_loop():
+    while not _gc_stop.wait(Config.ARTIFACT_GC_INTERVAL):
+        try:
+            collect_garbage()
+        except Exception:
+            traceback.print_exc()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete uploads and page images no import still needs.")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    args = parser.parse_args()
+
+    init_db()
+    collect_garbage(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
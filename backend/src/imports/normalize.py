@@ -5,6 +5,10 @@ import re
 from datetime import datetime
 
 
+# Recovery steps of parse_with_recovery, in the order they are tried
+RECOVERY_STEPS = ("json", "array", "repaired", "objects")
+
+
 def parse_llm_response(raw: str) -> list[dict]:
     """
     Accept the raw text from the LLM, strip markdown fences if present,
@@ -14,11 +18,20 @@ def parse_llm_response(raw: str) -> list[dict]:
     complete JSON objects from the response even when the array
     was cut off mid-way (finish_reason: length).
     """
+    return parse_with_recovery(raw)[0]
+
+
+def parse_with_recovery(raw: str) -> tuple[list[dict], str]:
+    """
+    ``parse_llm_response`` that also reports which recovery step produced
+    the data: one of ``RECOVERY_STEPS``, or ``"empty"`` when none did.
+    """
     # Strip markdown code fences
     cleaned = re.sub(r"```(?:json)?", "", raw).strip()
     cleaned = cleaned.strip("`").strip()
 
     data = None
+    step = "json"
 
     # 1. Try parsing as valid JSON first
     try:
@@ -28,6 +41,7 @@ def parse_llm_response(raw: str) -> list[dict]:
 
     # 2. Try finding a complete JSON array in the text
     if data is None:
+        step = "array"
         match = re.search(r"\[.*\]", cleaned, re.DOTALL)
         if match:
             try:
@@ -37,6 +51,7 @@ def parse_llm_response(raw: str) -> list[dict]:
 
     # 3. Try repairing truncated JSON by closing the array
     if data is None:
+        step = "repaired"
         match = re.search(r"\[.*", cleaned, re.DOTALL)
         if match:
             fragment = match.group().rstrip().rstrip(",")
@@ -50,6 +65,7 @@ def parse_llm_response(raw: str) -> list[dict]:
 
     # 4. Last resort: extract all individual {...} objects via regex
     if data is None:
+        step = "objects"
         data = []
         for m in re.finditer(r"\{[^{}]*\}", cleaned):
             try:
@@ -59,7 +75,7 @@ def parse_llm_response(raw: str) -> list[dict]:
                 continue
 
     if not data:
-        return []
+        return [], "empty"
 
     if not isinstance(data, list):
         data = [data]
@@ -71,7 +87,7 @@ def parse_llm_response(raw: str) -> list[dict]:
         txn = _clean_transaction(item)
         if txn:
             results.append(txn)
-    return results
+    return results, step
 
 
 def _clean_transaction(raw: dict) -> dict | None:
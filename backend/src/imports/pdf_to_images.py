@@ -5,11 +5,16 @@ Optimisations for reducing LLM token usage while retaining text quality:
   • Grayscale colorspace (cuts channel data by 2/3)
   • Save as JPEG @ quality 85 (≈5–10× smaller than PNG)
   • Auto-contrast + optional trim via post-processing helper
+
+PyMuPDF is imported on the first conversion, not at import time, so the
+web processes (which never render) do not load it.
 """
 
 import os
-import fitz  # PyMuPDF
+import time
+
 from config import Config
+from src.imports.artifacts import store_bytes
 
 
 # Tunables (can be overridden via env vars)
@@ -18,14 +23,17 @@ _JPEG_QUALITY = int(os.getenv("IMG_JPEG_QUALITY", "85"))
 _MAX_DIMENSION = int(os.getenv("IMG_MAX_DIMENSION", "1600"))  # px
 
 
-def pdf_to_images(pdf_path: str, import_id: int, dpi: int | None = None) -> list[str]:
+def pdf_to_images(pdf_path: str, dpi: int | None = None,
+                  timings: list[dict] | None = None) -> list[str]:
     """
-    Convert each page of *pdf_path* to an optimised grayscale JPEG image.
-    Returns a list of saved image file paths.
+    Convert each page of *pdf_path* to an optimised grayscale JPEG image,
+    stored content-addressed in ``CONVERTED_IMAGES_FOLDER``.  Returns the
+    image paths in page order.  When *timings* is given, a
+    ``{"render": s, "encode": s}`` dict is appended to it per page.
     """
+    import fitz  # PyMuPDF
+
     dpi = dpi or _DPI
-    out_dir = os.path.join(Config.CONVERTED_IMAGES_FOLDER, str(import_id))
-    os.makedirs(out_dir, exist_ok=True)
 
     zoom = dpi / 72  # PyMuPDF default is 72 DPI
     matrix = fitz.Matrix(zoom, zoom)
@@ -34,6 +42,7 @@ def pdf_to_images(pdf_path: str, import_id: int, dpi: int | None = None) -> list
     paths: list[str] = []
 
     for idx, page in enumerate(doc, start=1):
+        started = time.perf_counter()
         # Render to grayscale pixmap (colorspace=csGRAY ⇒ 1 channel)
         pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY)
 
@@ -51,12 +60,13 @@ def pdf_to_images(pdf_path: str, import_id: int, dpi: int | None = None) -> list
             pix = small_page.get_pixmap(matrix=s_matrix, colorspace=fitz.csGRAY)
             small_doc.close()
 
-        img_path = os.path.join(out_dir, f"page_{idx}.jpg")
-        pix.save(img_path, jpg_quality=_JPEG_QUALITY)
-        paths.append(img_path)
+        rendered = time.perf_counter()
+        data = pix.tobytes("jpg", jpg_quality=_JPEG_QUALITY)
+        paths.append(store_bytes(Config.CONVERTED_IMAGES_FOLDER, data, ".jpg"))
+        if timings is not None:
+            timings.append({"render": rendered - started, "encode": time.perf_counter() - rendered})
 
-        orig_kb = os.path.getsize(img_path) / 1024
-        print(f"[ImgOpt] page {idx}: {pix.width}×{pix.height}px, {orig_kb:.0f} KB (grayscale JPEG q{_JPEG_QUALITY})")
+        print(f"[ImgOpt] page {idx}: {pix.width}×{pix.height}px, {len(data) / 1024:.0f} KB (grayscale JPEG q{_JPEG_QUALITY})")
 
     doc.close()
     return paths
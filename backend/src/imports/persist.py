@@ -1,6 +1,11 @@
 """Persist parsed transactions into the database."""
 
-from src.db.connection import get_db
+from src.budgets.service import check_thresholds
+from src.db.versions import bump_data_version
+from src.db.writer import run_write
+from src.fx.rates import current_rates
+from src.merchants.service import resolve_merchant_id, clear_alias_cache
+from src.transactions.codec import DEBIT, to_day, to_minor, to_month, type_code
 
 
 # Cache: lowercase category name → category id
@@ -32,56 +37,83 @@ def save_transactions(user_id: int, import_id: int, page_number: int,
                       transactions: list[dict]) -> int:
     """
     Insert a batch of normalised transaction dicts into the transactions table.
-    Resolves the LLM-provided category name to a category_id.
+    Resolves the LLM-provided category name to a category_id and the
+    merchant name to a canonical merchant_id, then records any budget
+    thresholds the new spend crosses.  Amounts are also stored converted
+    to the base currency.
     Returns the number of rows inserted.
     """
     if not transactions:
         return 0
 
-    db = get_db()
-    try:
-        count = 0
-        for txn in transactions:
-            category_id = _resolve_category_id(db, txn.get("category"))
-            db.execute(
-                """INSERT INTO transactions
-                       (user_id, import_id, page_number, date, description,
-                        merchant, category_id, amount, txn_type, balance, currency)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    user_id,
-                    import_id,
-                    page_number,
-                    txn["date"],
-                    txn.get("description"),
-                    txn.get("merchant"),
-                    category_id,
-                    txn["amount"],
-                    txn["txn_type"],
-                    txn.get("balance"),
-                    txn.get("currency", "USD"),
-                ),
+    rates = current_rates()
+
+    def _write(db) -> int:
+        rows = [
+            (
+                user_id,
+                import_id,
+                page_number,
+                to_day(txn["date"]),
+                to_month(txn["date"]),
+                txn.get("description"),
+                txn.get("merchant"),
+                resolve_merchant_id(db, user_id, txn.get("merchant")),
+                _resolve_category_id(db, txn.get("category")),
+                to_minor(txn["amount"]),
+                type_code(txn["txn_type"]),
+                to_minor(txn.get("balance")),
+                txn.get("currency", "USD"),
+                rates.convert(to_minor(txn["amount"]), txn.get("currency", "USD"), to_day(txn["date"])),
             )
-            count += 1
-        db.commit()
-        return count
+            for txn in transactions
+        ]
+        db.executemany(
+            """INSERT INTO transactions
+                   (user_id, import_id, page_number, day, month, description,
+                    merchant, merchant_id, category_id, amount_minor,
+                    type_code, balance_minor, currency, base_amount_minor)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        bump_data_version(db, user_id)
+        # (month, category_id) of new spend – row layout as in the INSERT above
+        touched = {(r[4], r[8]) for r in rows if r[10] == DEBIT and r[8] is not None}
+        alerts = check_thresholds(db, user_id, touched)
+        if alerts:
+            print(f"[Budgets] User {user_id}: {alerts} budget threshold(s) crossed")
+        return len(rows)
+
+    try:
+        return run_write(_write, user_id)
     except Exception:
-        db.rollback()
+        clear_alias_cache()
         raise
-    finally:
-        db.close()
 
 
-def save_page_raw_json(import_id: int, page_number: int,
-                       image_path: str, raw_json: str):
-    """Store the raw LLM JSON for audit / reprocessing."""
-    db = get_db()
-    try:
-        db.execute(
-            """INSERT INTO import_pages (import_id, page_number, image_path, raw_json)
-               VALUES (?, ?, ?, ?)""",
-            (import_id, page_number, image_path, raw_json),
+def save_pages(user_id: int, import_id: int, image_paths: list[str]):
+    """
+    Record an import's rendered page images and page count before any page
+    is sent to the LLM, so the artifact collector sees them as referenced.
+    """
+    def _write(db):
+        db.execute("DELETE FROM import_pages WHERE import_id = ?", (import_id,))
+        db.executemany(
+            "INSERT INTO import_pages (import_id, page_number, image_path) VALUES (?, ?, ?)",
+            [(import_id, n, path) for n, path in enumerate(image_paths, start=1)],
         )
-        db.commit()
-    finally:
-        db.close()
+        db.execute("UPDATE statement_imports SET page_count = ? WHERE id = ?",
+                   (len(image_paths), import_id))
+
+    run_write(_write, user_id)
+
+
+def save_page_raw_json(user_id: int, import_id: int, page_number: int, raw_json: str):
+    """Store the raw LLM JSON for audit / reprocessing."""
+    run_write(
+        lambda db: db.execute(
+            "UPDATE import_pages SET raw_json = ? WHERE import_id = ? AND page_number = ?",
+            (raw_json, import_id, page_number),
+        ),
+        user_id,
+    )
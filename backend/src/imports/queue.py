@@ -0,0 +1,44 @@
+"""Job queue in the catalog database – the worker's index of pending imports.
+
+The job itself (``import_jobs``) lives next to the user's data; the queue
+only records which user / job to pick up next.  Writes go through the
+serialised writer.
+"""
+
+from src.db.writer import run_write
+
+
+def enqueue_job(user_id: int, job_id: int):
+    run_write(
+        lambda db: db.execute(
+            "INSERT INTO job_queue (user_id, job_id) VALUES (?, ?)",
+            (user_id, job_id),
+        ),
+        catalog=True,
+    )
+
+
+def claim_next_job() -> dict | None:
+    """
+    Atomically move the oldest queued entry to 'running' and return it,
+    with ``queue_wait``: seconds it spent queued.
+    """
+    def _claim(db):
+        row = db.execute(
+            """UPDATE job_queue SET status='running', claimed_at=datetime('now')
+               WHERE id = (SELECT id FROM job_queue WHERE status='queued'
+                           ORDER BY id LIMIT 1)
+               RETURNING id AS queue_id, user_id, job_id,
+                         (julianday('now') - julianday(created_at)) * 86400 AS queue_wait"""
+        ).fetchone()
+        return dict(row) if row else None
+
+    return run_write(_claim, catalog=True)
+
+
+def finish_job(queue_id: int):
+    """Drop a claimed entry once its job has completed or failed."""
+    run_write(
+        lambda db: db.execute("DELETE FROM job_queue WHERE id = ?", (queue_id,)),
+        catalog=True,
+    )
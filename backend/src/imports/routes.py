@@ -1,13 +1,17 @@
-"""Import blueprint – upload PDF, poll job status."""
-
-import os
-import uuid
+"""Import blueprint – upload PDF, poll job status, delete an import."""
 
 from flask import Blueprint, request, jsonify, g
 
 from config import Config
+from src.api.streaming import stream_query
 from src.auth.routes import login_required
-from src.db.connection import get_db
+from src.db.connection import get_read_db
+from src.db.versions import bump_data_version
+from src.db.writer import run_write
+from src.imports.artifacts import store_stream
+from src.imports.queue import enqueue_job
+from src.imports.timings import job_timings
+from src.recurring.detector import merchants_in, refresh_after_write
 
 imports_bp = Blueprint("imports", __name__, url_prefix="/api/imports")
 
@@ -23,67 +27,93 @@ def upload():
     if file.filename == "" or not file.filename.lower().endswith(".pdf"):
         return jsonify({"error": "A PDF file is required"}), 400
 
-    # Save file
-    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-    safe_name = f"{uuid.uuid4().hex}_{file.filename}"
-    stored_path = os.path.join(Config.UPLOAD_FOLDER, safe_name)
-    file.save(stored_path)
+    # Save file (content-addressed: re-uploads share one copy)
+    stored_path = store_stream(Config.UPLOAD_FOLDER, file.stream, ".pdf")
 
-    db = get_db()
-    try:
-        cur = db.execute(
+    user_id = g.user_id
+
+    def _create(db) -> tuple[int, int]:
+        import_id = db.execute(
             """INSERT INTO statement_imports (user_id, original_filename, stored_path)
                VALUES (?, ?, ?)""",
-            (g.user_id, file.filename, stored_path),
-        )
-        import_id = cur.lastrowid
-
-        cur2 = db.execute(
+            (user_id, file.filename, stored_path),
+        ).lastrowid
+        job_id = db.execute(
             "INSERT INTO import_jobs (import_id) VALUES (?)",
             (import_id,),
-        )
-        job_id = cur2.lastrowid
-        db.commit()
-
-        return jsonify({
-            "import_id": import_id,
-            "job_id": job_id,
-            "status": "queued",
-            "filename": file.filename,
-        }), 201
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+        ).lastrowid
+        return import_id, job_id
+
+    import_id, job_id = run_write(_create, user_id)
+    enqueue_job(user_id, job_id)
+
+    return jsonify({
+        "import_id": import_id,
+        "job_id": job_id,
+        "status": "queued",
+        "filename": file.filename,
+    }), 201
+
+
+@imports_bp.route("/<int:import_id>", methods=["DELETE"])
+@login_required
+def delete_import(import_id: int):
+    """
+    Delete an import with its jobs, pages and transactions.  Its files are
+    removed by the next garbage collection pass that finds them unused.
+    """
+    user_id = g.user_id     # write functions run on the writer thread, outside the request
+
+    def _delete(db) -> tuple[int, list[int]] | str | None:
+        if db.execute("SELECT 1 FROM statement_imports WHERE id = ? AND user_id = ?",
+                      (import_id, user_id)).fetchone() is None:
+            return None
+        if db.execute("SELECT 1 FROM import_jobs WHERE import_id = ? AND status IN ('queued', 'running')",
+                      (import_id,)).fetchone():
+            return "busy"
+        merchant_ids = merchants_in(db, "import_id = ? AND user_id = ?", (import_id, user_id))
+        deleted = db.execute("DELETE FROM transactions WHERE import_id = ? AND user_id = ?",
+                             (import_id, user_id)).rowcount
+        if deleted:
+            bump_data_version(db, user_id)
+        db.execute("DELETE FROM import_pages WHERE import_id = ?", (import_id,))
+        db.execute("DELETE FROM import_jobs WHERE import_id = ?", (import_id,))
+        db.execute("DELETE FROM statement_imports WHERE id = ?", (import_id,))
+        return deleted, merchant_ids
+
+    result = run_write(_delete, user_id)
+    if result is None:
+        return jsonify({"error": "Import not found"}), 404
+    if result == "busy":
+        return jsonify({"error": "Import is still being processed"}), 409
+    deleted, merchant_ids = result
+    if deleted:
+        refresh_after_write(user_id, merchant_ids)
+    return jsonify({"deleted": True, "transactions_deleted": deleted}), 200
 
 
 @imports_bp.route("/jobs", methods=["GET"])
 @login_required
 def list_jobs():
     """List all import jobs for the current user."""
-    db = get_db()
-    try:
-        rows = db.execute(
-            """SELECT ij.id AS job_id, ij.import_id, ij.status,
-                      ij.error_message, ij.started_at, ij.completed_at,
-                      si.original_filename, si.page_count, si.created_at
-               FROM import_jobs ij
-               JOIN statement_imports si ON si.id = ij.import_id
-               WHERE si.user_id = ?
-               ORDER BY ij.created_at DESC""",
-            (g.user_id,),
-        ).fetchall()
-        return jsonify([dict(r) for r in rows]), 200
-    finally:
-        db.close()
+    return stream_query(
+        get_read_db(),
+        """SELECT ij.id AS job_id, ij.import_id, ij.status,
+                  ij.error_message, ij.started_at, ij.completed_at,
+                  si.original_filename, si.page_count, si.created_at
+           FROM import_jobs ij
+           JOIN statement_imports si ON si.id = ij.import_id
+           WHERE si.user_id = ?
+           ORDER BY ij.created_at DESC""",
+        (g.user_id,),
+    )
 
 
 @imports_bp.route("/jobs/<int:job_id>", methods=["GET"])
 @login_required
 def job_status(job_id: int):
     """Get status of a single import job."""
-    db = get_db()
+    db = get_read_db()
     try:
         row = db.execute(
             """SELECT ij.id AS job_id, ij.import_id, ij.status,
@@ -110,3 +140,27 @@ def job_status(job_id: int):
         return jsonify(result), 200
     finally:
         db.close()
+
+
+@imports_bp.route("/jobs/<int:job_id>/timings", methods=["GET"])
+@login_required
+def job_stage_timings(job_id: int):
+    """Per-stage (and per-page) timings recorded while the job ran."""
+    db = get_read_db()
+    try:
+        row = db.execute(
+            """SELECT ij.id FROM import_jobs ij
+               JOIN statement_imports si ON si.id = ij.import_id
+               WHERE ij.id = ? AND si.user_id = ?""",
+            (job_id, g.user_id),
+        ).fetchone()
+    finally:
+        db.close()
+    if row is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    stages = job_timings(g.user_id, job_id)
+    totals: dict[str, float] = {}
+    for s in stages:
+        totals[s["stage"]] = round(totals.get(s["stage"], 0.0) + s["seconds"], 4)
+    return jsonify({"job_id": job_id, "totals": totals, "stages": stages}), 200
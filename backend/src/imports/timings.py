@@ -0,0 +1,61 @@
+"""Per-stage import timings, stored in the catalog (``import_timings``).
+
+The worker collects a job's stage durations in a ``JobTimings`` and
+writes them after each page; the triggers of migration 013 fold every
+row into the histograms served by ``/api/metrics``.
+"""
+
+import time
+from contextlib import contextmanager
+
+from src.db.connection import get_catalog_db
+from src.db.writer import run_write
+
+STAGES = ("queue_wait", "render", "encode", "llm", "parse", "persist", "job")
+
+
+class JobTimings:
+    """Stage durations of one job, buffered until ``flush``."""
+
+    def __init__(self, user_id: int, job_id: int):
+        self.user_id = user_id
+        self.job_id = job_id
+        self._rows: list[tuple] = []
+
+    def add(self, stage: str, seconds: float, page: int | None = None, outcome: str | None = None):
+        self._rows.append((self.user_id, self.job_id, page, stage, seconds, outcome))
+
+    @contextmanager
+    def stage(self, stage: str, page: int | None = None):
+        """Time the block as *stage* (recorded even if it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started, page)
+
+    def flush(self):
+        rows, self._rows = self._rows, []
+        if rows:
+            run_write(
+                lambda db: db.executemany(
+                    """INSERT INTO import_timings (user_id, job_id, page_number, stage, seconds, outcome)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    rows,
+                ),
+                catalog=True,
+            )
+
+
+def job_timings(user_id: int, job_id: int) -> list[dict]:
+    """A job's recorded stages in the order they ran."""
+    db = get_catalog_db()
+    try:
+        rows = db.execute(
+            """SELECT page_number, stage, seconds, outcome FROM import_timings
+               WHERE user_id = ? AND job_id = ? ORDER BY id""",
+            (user_id, job_id),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        db.close()
@@ -1,55 +1,92 @@
-"""Background worker – runs in a daemon thread, polls for queued import jobs."""
+"""Background worker – polls for queued import jobs on one or more threads.
 
+The web process starts it in-process by default (``START_WORKER``); in
+production it runs as its own process, scaled independently of the web
+servers:
+
+    python -m src.imports.worker [--concurrency N]
+
+Jobs are claimed atomically from the catalog queue, so any number of
+worker threads and processes can run side by side.  Each worker process
+also runs the garbage collector for stored uploads and page images
+(``src.imports.artifacts``).
+"""
+
+import argparse
+import signal
 import threading
 import time
 import traceback
 
 from config import Config
-from src.db.connection import get_db
+from src.db.connection import init_db
+from src.db.writer import run_write
 from src.imports.pdf_to_images import pdf_to_images
-from src.imports.normalize import parse_llm_response
-from src.imports.persist import save_transactions, save_page_raw_json
+from src.imports.artifacts import start_gc, stop_gc
+from src.imports.normalize import parse_with_recovery
+from src.imports.persist import save_pages, save_page_raw_json, save_transactions
+from src.imports.queue import claim_next_job, finish_job
+from src.imports.timings import JobTimings
 from src.llm.factory import get_adapter
+from src.recurring.detector import refresh_recurring
 
 
-_worker_thread: threading.Thread | None = None
+_worker_threads: list[threading.Thread] = []
+_stop = threading.Event()
 
 
-def start_worker():
-    """Launch the background worker thread (idempotent)."""
-    global _worker_thread
-    if _worker_thread and _worker_thread.is_alive():
+def start_worker(concurrency: int | None = None):
+    """Launch *concurrency* (default ``WORKER_CONCURRENCY``) worker threads (idempotent)."""
+    global _worker_threads
+    if any(t.is_alive() for t in _worker_threads):
         return
-    _worker_thread = threading.Thread(target=_poll_loop, daemon=True, name="import-worker")
-    _worker_thread.start()
-    print("[Worker] Background import worker started")
+    count = max(1, concurrency or Config.WORKER_CONCURRENCY)
+    _stop.clear()
+    _worker_threads = [
+        threading.Thread(target=_poll_loop, daemon=True, name=f"import-worker-{i}")
+        for i in range(count)
+    ]
+    for t in _worker_threads:
+        t.start()
+    start_gc()
+    print(f"[Worker] Background import worker started ({count} thread{'s' if count > 1 else ''})")
+
+
+def stop_worker():
+    """Let the worker threads finish their current job, then wait for them to exit."""
+    _stop.set()
+    for t in _worker_threads:
+        t.join()
+    stop_gc()
 
 
 def _poll_loop():
-    while True:
+    while not _stop.is_set():
         try:
             job = _claim_next_job()
             if job:
                 _process_job(job)
             else:
-                time.sleep(Config.WORKER_POLL_INTERVAL)
+                _stop.wait(Config.WORKER_POLL_INTERVAL)
         except Exception:
             traceback.print_exc()
-            time.sleep(Config.WORKER_POLL_INTERVAL)
+            _stop.wait(Config.WORKER_POLL_INTERVAL)
 
 
 def _claim_next_job() -> dict | None:
-    """Atomically move the oldest queued job to 'running'."""
-    db = get_db()
-    try:
+    """Claim the oldest queued job and mark it 'running' in the user's database."""
+    entry = claim_next_job()
+    if entry is None:
+        return None
+
+    def _mark_running(db):
         row = db.execute(
             """SELECT ij.id AS job_id, ij.import_id,
                       si.stored_path, si.user_id
                FROM import_jobs ij
                JOIN statement_imports si ON si.id = ij.import_id
-               WHERE ij.status = 'queued'
-               ORDER BY ij.created_at ASC
-               LIMIT 1"""
+               WHERE ij.id = ?""",
+            (entry["job_id"],),
         ).fetchone()
         if row is None:
             return None
@@ -57,10 +94,13 @@ def _claim_next_job() -> dict | None:
             "UPDATE import_jobs SET status='running', started_at=datetime('now') WHERE id=?",
             (row["job_id"],),
         )
-        db.commit()
         return dict(row)
-    finally:
-        db.close()
+
+    job = run_write(_mark_running, entry["user_id"])
+    if job is None:
+        finish_job(entry["queue_id"])
+        return None
+    return dict(job, queue_id=entry["queue_id"], queue_wait=entry["queue_wait"])
 
 
 def _process_job(job: dict):
@@ -68,18 +108,22 @@ def _process_job(job: dict):
     import_id = job["import_id"]
     pdf_path = job["stored_path"]
     user_id = job["user_id"]
+    timings = JobTimings(user_id, job_id)
+    timings.add("queue_wait", job["queue_wait"])
+    started = time.perf_counter()
+    outcome = "failed"
 
     try:
         # 1. PDF → images
         print(f"[Worker] Job {job_id}: converting PDF to images …")
-        image_paths = pdf_to_images(pdf_path, import_id)
+        page_times: list[dict] = []
+        image_paths = pdf_to_images(pdf_path, timings=page_times)
+        for page_num, times in enumerate(page_times, start=1):
+            timings.add("render", times["render"], page_num)
+            timings.add("encode", times["encode"], page_num)
 
-        # Update page count
-        db = get_db()
-        db.execute("UPDATE statement_imports SET page_count=? WHERE id=?",
-                   (len(image_paths), import_id))
-        db.commit()
-        db.close()
+        # Record the pages (and page count)
+        save_pages(user_id, import_id, image_paths)
 
         # 2. Send each image to LLM
         adapter = get_adapter()
@@ -87,33 +131,75 @@ def _process_job(job: dict):
 
         for page_num, img_path in enumerate(image_paths, start=1):
             print(f"[Worker] Job {job_id}: processing page {page_num}/{len(image_paths)} …")
-            raw_response = adapter.extract_transactions(img_path)
-
-            # Save raw response
-            save_page_raw_json(import_id, page_num, img_path, raw_response)
-
-            # 3. Normalise + persist
-            txns = parse_llm_response(raw_response)
-            inserted = save_transactions(user_id, import_id, page_num, txns)
+            with timings.stage("llm", page_num):
+                raw_response = adapter.extract_transactions(img_path)
+
+            # 3. Normalise (tagged with the recovery step that worked) + persist
+            parse_started = time.perf_counter()
+            txns, step = parse_with_recovery(raw_response)
+            timings.add("parse", time.perf_counter() - parse_started, page_num, step)
+
+            with timings.stage("persist", page_num):
+                save_page_raw_json(user_id, import_id, page_num, raw_response)
+                inserted = save_transactions(user_id, import_id, page_num, txns)
+            timings.flush()
             total_txns += inserted
             print(f"[Worker] Job {job_id}: page {page_num} → {inserted} transactions")
 
         # Mark completed
-        db = get_db()
-        db.execute(
-            "UPDATE import_jobs SET status='completed', completed_at=datetime('now') WHERE id=?",
-            (job_id,),
+        run_write(
+            lambda db: db.execute(
+                "UPDATE import_jobs SET status='completed', completed_at=datetime('now') WHERE id=?",
+                (job_id,),
+            ),
+            user_id,
         )
-        db.commit()
-        db.close()
+        outcome = "completed"
         print(f"[Worker] Job {job_id}: completed – {total_txns} total transactions imported")
 
+        # Re-detect recurring payments for the merchants this import touched;
+        # a detector failure must not fail an import that already committed
+        try:
+            found = refresh_recurring(user_id, import_id)
+            print(f"[Worker] Job {job_id}: {found} recurring payments for this import's merchants")
+        except Exception:
+            traceback.print_exc()
+
     except Exception as e:
         traceback.print_exc()
-        db = get_db()
-        db.execute(
-            "UPDATE import_jobs SET status='failed', error_message=?, completed_at=datetime('now') WHERE id=?",
-            (str(e), job_id),
+        run_write(
+            lambda db: db.execute(
+                "UPDATE import_jobs SET status='failed', error_message=?, completed_at=datetime('now') WHERE id=?",
+                (str(e), job_id),
+            ),
+            user_id,
         )
-        db.commit()
-        db.close()
+    finally:
+        timings.add("job", time.perf_counter() - started, outcome=outcome)
+        try:
+            timings.flush()
+        except Exception:
+            traceback.print_exc()
+        finish_job(job["queue_id"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the import worker as a standalone process.")
+    parser.add_argument("--concurrency", type=int, default=Config.WORKER_CONCURRENCY,
+                        help="jobs processed at once (default: WORKER_CONCURRENCY)")
+    args = parser.parse_args()
+
+    init_db()
+    start_worker(args.concurrency)
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
+    try:
+        while not _stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    print("[Worker] Stopping after the current jobs …")
+    stop_worker()
+
+
+if __name__ == "__main__":
+    main()
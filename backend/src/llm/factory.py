@@ -2,12 +2,13 @@
 
 from config import Config
 from src.llm.base import VisionAdapter
-from src.llm.ollama_adapter import OllamaAdapter
-from src.llm.lmstudio_adapter import LMStudioAdapter
 
 
 def get_adapter() -> VisionAdapter:
+    # Adapters pull in ``requests``; import only the configured one, on first use
     backend = Config.LLM_BACKEND.lower()
     if backend == "lmstudio":
+        from src.llm.lmstudio_adapter import LMStudioAdapter
         return LMStudioAdapter()
+    from src.llm.ollama_adapter import OllamaAdapter
     return OllamaAdapter()          # default
@@ -0,0 +1,134 @@
+"""Merchant dimension – map free-text merchant names to canonical merchant ids."""
+
+import re
+
+from src.db.connection import get_db, init_db, user_ids_with_data
+from src.db.versions import bump_data_version
+
+
+# Tokens that distinguish spellings of the same merchant, not merchants
+_NOISE_TOKENS = {
+    "www", "com", "in", "co", "net", "org",
+    "mktpl", "mktplace", "marketplace", "online", "store",
+    "pvt", "private", "ltd", "limited", "llc", "inc", "corp", "plc",
+    "pos", "upi", "ecom",
+}
+
+# Cache: (database file, user id, lower-cased raw merchant name) → merchant id.
+# Keyed by file because per-user shards each have their own merchants table.
+_alias_cache: dict[tuple[str, int, str], int] = {}
+
+
+def normalize_merchant(name: str | None) -> str | None:
+    """
+    Reduce a raw merchant string to its match key, e.g.
+    "AMAZON MKTPL" and "Amazon.in" both become "amazon".
+    Returns None for an empty name.
+    """
+    if not name:
+        return None
+    tokens = re.split(r"[^a-z0-9&]+", name.lower())
+    kept = [t for t in tokens if t and t not in _NOISE_TOKENS and not t.isdigit()]
+    if kept:
+        return " ".join(kept)
+    # Name consisted only of noise – fall back to the plain lower-cased text
+    return " ".join(t for t in tokens if t) or name.strip().lower() or None
+
+
+def resolve_merchant_id(db, user_id: int, merchant: str | None) -> int | None:
+    """
+    Return *user_id*'s canonical merchant id for a raw name, creating the
+    merchant and alias rows on first sight.  Merchants belong to one user.
+    Does not commit.
+    """
+    alias = (merchant or "").strip().lower()
+    if not alias:
+        return None
+    cache_key = (db.path, user_id, alias)
+    if cache_key in _alias_cache:
+        return _alias_cache[cache_key]
+
+    row = db.execute(
+        "SELECT merchant_id FROM merchant_aliases WHERE user_id = ? AND alias = ?", (user_id, alias)
+    ).fetchone()
+    if row:
+        _alias_cache[cache_key] = row[0]
+        return row[0]
+
+    key = normalize_merchant(alias)
+    row = db.execute(
+        "SELECT id FROM merchants WHERE user_id = ? AND normalized = ?", (user_id, key)
+    ).fetchone()
+    if row:
+        merchant_id = row[0]
+    else:
+        merchant_id = db.execute(
+            "INSERT INTO merchants (user_id, name, normalized) VALUES (?, ?, ?)",
+            (user_id, key.title(), key),
+        ).lastrowid
+    db.execute(
+        "INSERT OR IGNORE INTO merchant_aliases (user_id, alias, merchant_id) VALUES (?, ?, ?)",
+        (user_id, alias, merchant_id),
+    )
+    _alias_cache[cache_key] = merchant_id
+    return merchant_id
+
+
+def clear_alias_cache():
+    """Drop cached aliases, e.g. after a rollback discarded newly created ids."""
+    _alias_cache.clear()
+
+
+def backfill_merchants(db=None, batch_size: int = 500, user_id: int | None = None) -> int:
+    """
+    Fill merchant_id for rows that have a merchant name but no id.
+    Walks the distinct (user, name) pairs in order one batch at a time, so
+    a name that resolves to nothing (e.g. only whitespace) is visited once;
+    commits per batch when it owns the connection.  Returns the number of
+    rows updated.
+    """
+    own = db is None
+    if own:
+        db = get_db(user_id)
+    try:
+        updated = 0
+        after = (-1, "")
+        while True:
+            pairs = db.execute(
+                """SELECT DISTINCT user_id, merchant FROM transactions
+                   WHERE merchant_id IS NULL AND merchant > '' AND (user_id, merchant) > (?, ?)
+                   ORDER BY user_id, merchant
+                   LIMIT ?""",
+                (*after, batch_size),
+            ).fetchall()
+            if not pairs:
+                break
+            after = tuple(pairs[-1])
+            resolved = [(resolve_merchant_id(db, uid, name), uid, name) for uid, name in pairs]
+            resolved = [r for r in resolved if r[0] is not None]
+            if resolved:
+                updated += db.executemany(
+                    """UPDATE transactions SET merchant_id = ?
+                       WHERE user_id = ? AND merchant = ? AND merchant_id IS NULL""",
+                    resolved,
+                ).rowcount
+            if own:
+                db.commit()
+        if own and updated:
+            bump_data_version(db, user_id)
+            db.commit()
+        return updated
+    except Exception:
+        if own:
+            db.rollback()
+            clear_alias_cache()
+        raise
+    finally:
+        if own:
+            db.close()
+
+
+if __name__ == "__main__":
+    init_db()
+    total = sum(backfill_merchants(user_id=uid) for uid in user_ids_with_data())
+    print(f"[Merchants] Backfilled {total} transactions")
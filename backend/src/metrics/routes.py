@@ -0,0 +1,99 @@
+"""Metrics blueprint – Prometheus scrape endpoint, request tracking, SQL statistics."""
+
+import hmac
+import time
+
+from flask import Blueprint, Response, g, jsonify, request
+
+from config import Config
+from src.analytics import columnar
+from src.analytics.cache import response_cache
+from src.auth.service import decode_token, token_is_current
+from src.db.trace import reset_stats, statement_stats
+from src.metrics.service import observe_request, render_metrics, request_finished, request_started
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api")
+
+
+@metrics_bp.before_app_request
+def _track_request():
+    request_started()
+    g.metrics_in_flight = True
+    if Config.ROUTE_METRICS:
+        g.metrics_started = time.perf_counter()
+
+
+@metrics_bp.teardown_app_request
+def _untrack_request(_exc):
+    if not g.pop("metrics_in_flight", False):
+        return
+    request_finished()
+    started = g.pop("metrics_started", None)
+    if started is not None:
+        observe_request(
+            request.blueprint or "app",
+            request.url_rule.rule if request.url_rule else "(unmatched)",
+            request.method,
+            time.perf_counter() - started,
+            g.get("sql_queries", 0),
+            g.get("sql_seconds", 0.0),
+        )
+
+
+def _authorized() -> bool:
+    return not Config.METRICS_TOKEN or hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {Config.METRICS_TOKEN}"
+    )
+
+
+def _signed_in() -> bool:
+    header = request.headers.get("Authorization", "")
+    payload = decode_token(header[7:]) if header.startswith("Bearer ") else None
+    return payload is not None and token_is_current(payload)
+
+
+def _operator() -> bool:
+    """``Bearer METRICS_TOKEN``, or any signed-in user when no metrics token is set."""
+    return _authorized() if Config.METRICS_TOKEN else _signed_in()
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text format.  Requires ``Bearer METRICS_TOKEN`` when that is set."""
+    if not _authorized():
+        return jsonify({"error": "Invalid metrics token"}), 401
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+@metrics_bp.route("/metrics/sql", methods=["GET"])
+def sql_statements():
+    """
+    Traced statements of this process (``SQL_TRACE``), most total time first.
+    Query: ``limit`` (default 50), ``reset=1`` to clear after reading.
+    Statement text shows the schema and every query shape, so this is never
+    open: it takes ``Bearer METRICS_TOKEN``, or a user's token when no
+    metrics token is set.
+    """
+    if not _operator():
+        return jsonify({"error": "Metrics token or login required"}), 401
+    if not Config.SQL_TRACE:
+        return jsonify({"error": "SQL tracing is off (set SQL_TRACE=1)"}), 404
+    statements = statement_stats(request.args.get("limit", 50, type=int))
+    if request.args.get("reset") == "1":
+        reset_stats()
+    return jsonify({"statements": statements}), 200
+
+
+@metrics_bp.route("/metrics/cache", methods=["GET"])
+def cache_stats():
+    """
+    Response cache size and hit rate (plus columnar frames) for this
+    process.  Process-wide, not per user, so it is gated like
+    ``/metrics/sql``.
+    """
+    if not _operator():
+        return jsonify({"error": "Metrics token or login required"}), 401
+    stats = response_cache.stats()
+    if columnar.available():
+        stats["columnar"] = columnar.frame_stats()
+    return jsonify(stats), 200
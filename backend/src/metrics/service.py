@@ -0,0 +1,165 @@
+"""Prometheus text exposition of the import pipeline and request load.
+
+Pipeline histograms and counters come from the catalog tables that
+migration 013's triggers maintain, so every web process reports the same
+numbers whichever process ran the jobs.  ``in_flight`` and the per-route
+latency histograms (``ROUTE_METRICS``) are per process.
+"""
+
+import threading
+
+from config import Config
+from src.db.connection import get_catalog_db
+
+_PREFIX = "hisabkitab"
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+# Request latency buckets (seconds)
+_ROUTE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (blueprint, route, method) → [bucket counts..., count, seconds, sql_queries, sql_seconds]
+_routes: dict[tuple[str, str, str], list] = {}
+_routes_lock = threading.Lock()
+
+
+def request_started():
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+
+
+def request_finished():
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def observe_request(blueprint: str, route: str, method: str, seconds: float,
+                    sql_queries: int = 0, sql_seconds: float = 0.0):
+    key = (blueprint, route, method)
+    n = len(_ROUTE_BUCKETS)
+    with _routes_lock:
+        entry = _routes.get(key)
+        if entry is None:
+            entry = _routes[key] = [0] * n + [0, 0.0, 0, 0.0]
+        for i, le in enumerate(_ROUTE_BUCKETS):
+            if seconds <= le:
+                entry[i] += 1
+        entry[n] += 1
+        entry[n + 1] += seconds
+        entry[n + 2] += sql_queries
+        entry[n + 3] += sql_seconds
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+        self.lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+
+    def sample(self, name: str, value: float, **labels):
+        self.lines.append(f"{_PREFIX}_{name}{_labels(**labels)} {value!r}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    out = _Exposition()
+    db = get_catalog_db()
+    try:
+        buckets = db.execute(
+            "SELECT stage, le, count FROM import_stage_buckets ORDER BY stage, le"
+        ).fetchall()
+        totals = db.execute(
+            "SELECT stage, outcome, count, seconds FROM import_stage_totals ORDER BY stage, outcome"
+        ).fetchall()
+        queue = dict(db.execute("SELECT status, COUNT(*) FROM job_queue GROUP BY status").fetchall())
+    finally:
+        db.close()
+
+    per_stage: dict[str, list[float]] = {}
+    for r in totals:
+        count_sum = per_stage.setdefault(r["stage"], [0, 0.0])
+        count_sum[0] += r["count"]
+        count_sum[1] += r["seconds"]
+
+    out.family("import_stage_seconds", "histogram",
+               "Time spent in each import pipeline stage (per page for render/encode/llm/parse/persist).")
+    stage = None
+    for r in buckets:
+        if r["stage"] != stage:
+            if stage is not None:
+                _close_histogram(out, stage, per_stage)
+            stage = r["stage"]
+        out.sample("import_stage_seconds_bucket", r["count"], stage=stage, le=repr(r["le"]))
+    if stage is not None:
+        _close_histogram(out, stage, per_stage)
+
+    out.family("import_parse_pages_total", "counter",
+               "Pages parsed, by the JSON recovery step that produced their transactions.")
+    for r in totals:
+        if r["stage"] == "parse":
+            out.sample("import_parse_pages_total", r["count"], step=r["outcome"])
+
+    out.family("import_jobs_total", "counter", "Import jobs finished, by outcome.")
+    for r in totals:
+        if r["stage"] == "job":
+            out.sample("import_jobs_total", r["count"], outcome=r["outcome"])
+
+    out.family("import_queue_depth", "gauge", "Import jobs in the queue, by status.")
+    for status in ("queued", "running"):
+        out.sample("import_queue_depth", queue.get(status, 0), status=status)
+
+    out.family("http_requests_in_flight", "gauge", "Requests being handled by this process.")
+    out.sample("http_requests_in_flight", _in_flight)
+
+    if _routes:
+        _route_metrics(out)
+    return out.text()
+
+
+def _route_metrics(out: _Exposition):
+    with _routes_lock:
+        routes = sorted((key, list(entry)) for key, entry in _routes.items())
+    n = len(_ROUTE_BUCKETS)
+
+    out.family("http_request_seconds", "histogram", "Request latency in this process, by route.")
+    for (blueprint, route, method), entry in routes:
+        labels = {"blueprint": blueprint, "route": route, "method": method}
+        for i, le in enumerate(_ROUTE_BUCKETS):
+            out.sample("http_request_seconds_bucket", entry[i], **labels, le=repr(le))
+        out.sample("http_request_seconds_bucket", entry[n], **labels, le="+Inf")
+        out.sample("http_request_seconds_sum", entry[n + 1], **labels)
+        out.sample("http_request_seconds_count", entry[n], **labels)
+
+    if Config.SQL_TRACE:
+        out.family("http_request_sql_queries_total", "counter", "SQL statements run by requests, by route.")
+        for (blueprint, route, method), entry in routes:
+            out.sample("http_request_sql_queries_total", entry[n + 2],
+                       blueprint=blueprint, route=route, method=method)
+        out.family("http_request_sql_seconds_total", "counter", "Time spent in SQL by requests, by route.")
+        for (blueprint, route, method), entry in routes:
+            out.sample("http_request_sql_seconds_total", entry[n + 3],
+                       blueprint=blueprint, route=route, method=method)
+
+
+def _close_histogram(out: _Exposition, stage: str, per_stage: dict[str, list[float]]):
+    count, seconds = per_stage.get(stage, (0, 0.0))
+    out.sample("import_stage_seconds_bucket", count, stage=stage, le="+Inf")
+    out.sample("import_stage_seconds_sum", float(seconds), stage=stage)
+    out.sample("import_stage_seconds_count", count, stage=stage)
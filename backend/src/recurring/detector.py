@@ -0,0 +1,168 @@
+"""Recurring-payment detector.
+
+Debits come back from SQLite sorted by (merchant, day); one hash pass
+groups them by (canonical merchant, amount band), and each group's gaps
+between payments are matched against the known cadences.  Amount bands
+are geometric (~10 % wide), so a subscription whose price drifts a little
+stays in one group while different plans at the same merchant stay apart.
+
+After an import, an edit that moves rows to another merchant, or a delete,
+only the merchants it touched are re-examined:
+
+    python -m src.recurring.detector [--user ID]     # full rebuild
+"""
+
+import argparse
+import json
+import math
+import statistics
+import traceback
+
+from src.db.connection import get_catalog_db, get_read_db, init_db
+from src.db.writer import run_write
+from src.transactions.codec import DEBIT
+
+# name, nominal period (days), tolerance (days)
+CADENCES = (
+    ("weekly", 7, 1),
+    ("biweekly", 14, 2),
+    ("monthly", 30, 5),
+    ("quarterly", 91, 10),
+    ("yearly", 365, 15),
+)
+MIN_OCCURRENCES = 3             # payments needed before a pattern counts
+MIN_CONFIDENCE = 0.75           # share of gaps that must match the cadence
+
+_BAND_WIDTH = math.log(1.1)
+
+
+def amount_band(amount_minor: int) -> int:
+    return int(math.log(max(amount_minor, 1)) / _BAND_WIDTH)
+
+
+def cadence_for(period: float) -> tuple[str, int, int] | None:
+    return next((c for c in CADENCES if abs(period - c[1]) <= c[2]), None)
+
+
+def detect(rows) -> list[dict]:
+    """
+    Find recurring patterns in ``(merchant_id, day, amount_minor)`` rows
+    sorted by merchant then day.
+    """
+    groups: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for merchant_id, day, amount in rows:
+        groups.setdefault((merchant_id, amount_band(amount)), []).append((day, amount))
+
+    found = []
+    for (merchant_id, band), payments in groups.items():
+        if len(payments) < MIN_OCCURRENCES:
+            continue
+        days = [d for d, _ in payments]
+        gaps = [b - a for a, b in zip(days, days[1:]) if b > a]     # same-day repeats collapse
+        if len(gaps) < MIN_OCCURRENCES - 1:
+            continue
+        period = statistics.median(gaps)
+        cadence = cadence_for(period)
+        if cadence is None:
+            continue
+        name, nominal, tolerance = cadence
+        confidence = sum(abs(g - nominal) <= tolerance for g in gaps) / len(gaps)
+        if confidence < MIN_CONFIDENCE:
+            continue
+        found.append({
+            "merchant_id": merchant_id,
+            "amount_band": band,
+            "cadence": name,
+            "period_days": round(period),
+            "amount_minor": int(statistics.median(a for _, a in payments)),
+            "txn_count": len(payments),
+            "first_day": days[0],
+            "last_day": days[-1],
+            "next_day": days[-1] + round(period),
+            "confidence": round(confidence, 3),
+        })
+    return found
+
+
+def merchants_in(db, where: str, params) -> list[int]:
+    """Distinct merchant ids of the transactions matching *where*."""
+    return [r[0] for r in db.execute(
+        f"SELECT DISTINCT merchant_id FROM transactions WHERE {where} AND merchant_id IS NOT NULL",
+        params,
+    ).fetchall()]
+
+
+def refresh_recurring(user_id: int, import_id: int | None = None,
+                      merchant_ids: list[int] | None = None) -> int:
+    """
+    Re-detect *user_id*'s recurring payments – only for the merchants in
+    *import_id* or *merchant_ids* when given, otherwise all of them.
+    Returns patterns stored.
+    """
+    db = get_read_db(user_id)
+    try:
+        scope, scope_params = "", []
+        if import_id is not None:
+            merchant_ids = merchants_in(db, "import_id = ?", (import_id,))
+        if merchant_ids is not None:
+            if not merchant_ids:
+                return 0
+            scope = " AND merchant_id IN (SELECT value FROM json_each(?))"
+            scope_params = [json.dumps(merchant_ids)]
+        rows = db.execute(
+            f"""SELECT merchant_id, day, amount_minor FROM transactions
+                WHERE user_id = ? AND type_code = {DEBIT} AND merchant_id IS NOT NULL{scope}
+                ORDER BY merchant_id, day""",
+            [user_id] + scope_params,
+        ).fetchall()
+    finally:
+        db.close()
+
+    found = detect(rows)
+
+    def _write(db) -> int:
+        db.execute(f"DELETE FROM recurring_payments WHERE user_id = ?{scope}", [user_id] + scope_params)
+        db.executemany(
+            """INSERT INTO recurring_payments
+                   (user_id, merchant_id, amount_band, cadence, period_days, amount_minor,
+                    txn_count, first_day, last_day, next_day, confidence)
+               VALUES (:user_id, :merchant_id, :amount_band, :cadence, :period_days, :amount_minor,
+                       :txn_count, :first_day, :last_day, :next_day, :confidence)""",
+            [dict(f, user_id=user_id) for f in found],
+        )
+        return len(found)
+
+    return run_write(_write, user_id)
+
+
+def refresh_after_write(user_id: int, merchant_ids: list[int]) -> None:
+    """
+    Re-detect the merchants an edit or delete touched.  The write itself has
+    already committed, so a failed refresh is logged rather than raised.
+    """
+    if not merchant_ids:
+        return
+    try:
+        refresh_recurring(user_id, merchant_ids=merchant_ids)
+    except Exception:
+        traceback.print_exc()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild detected recurring payments.")
+    parser.add_argument("--user", type=int, help="only this user (default: everyone)")
+    args = parser.parse_args()
+
+    init_db()
+    catalog = get_catalog_db()
+    try:
+        user_ids = [r["id"] for r in catalog.execute("SELECT id FROM users ORDER BY id").fetchall()]
+    finally:
+        catalog.close()
+    for user_id in user_ids:
+        if args.user is None or user_id == args.user:
+            print(f"[Recurring] User {user_id}: {refresh_recurring(user_id)} recurring payments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Recurring blueprint – detected subscriptions and regular bills."""
+
+import datetime
+
+from flask import Blueprint, jsonify, g
+
+from src.auth.routes import login_required
+from src.db.connection import get_read_db
+from src.recurring.detector import CADENCES, refresh_recurring
+from src.transactions.codec import from_day, sql_date, sql_money, to_day
+
+recurring_bp = Blueprint("recurring", __name__, url_prefix="/api/recurring")
+
+_TOLERANCE = {name: tolerance for name, _, tolerance in CADENCES}
+
+
+@recurring_bp.route("", methods=["GET"])
+@login_required
+def list_recurring():
+    """
+    Detected recurring payments, soonest expected first.
+    Returns [{id, merchant_id, merchant, cadence, period_days, amount, txn_count,
+              first_date, last_date, next_date, confidence, status}]
+    status is 'lapsed' once a payment is overdue by more than the cadence's tolerance.
+    """
+    db = get_read_db()
+    try:
+        rows = db.execute(
+            f"""SELECT r.id, r.merchant_id, m.name AS merchant, r.cadence, r.period_days,
+                       {sql_money("r.amount_minor")} AS amount, r.txn_count,
+                       {sql_date("r.first_day")} AS first_date,
+                       {sql_date("r.last_day")} AS last_date,
+                       r.next_day, r.confidence
+                FROM recurring_payments r
+                JOIN merchants m ON m.id = r.merchant_id
+                WHERE r.user_id = ?
+                ORDER BY r.next_day""",
+            (g.user_id,),
+        ).fetchall()
+    finally:
+        db.close()
+
+    today = to_day(datetime.date.today().isoformat())
+    result = []
+    for r in rows:
+        item = dict(r)
+        next_day = item.pop("next_day")
+        item["next_date"] = from_day(next_day)
+        item["status"] = "active" if today <= next_day + _TOLERANCE.get(item["cadence"], 0) else "lapsed"
+        result.append(item)
+    return jsonify(result), 200
+
+
+@recurring_bp.route("/refresh", methods=["POST"])
+@login_required
+def refresh():
+    """Re-run detection over all of the user's transactions."""
+    return jsonify({"detected": refresh_recurring(g.user_id)}), 200
@@ -0,0 +1,81 @@
+"""Compact storage codec for transactions.
+
+Rows store money as integer minor units (hundredths), dates as an integer
+day number (days since 1970-01-01) plus a YYYYMM month key, and the
+transaction type as a small integer code.  The API keeps speaking ISO
+dates, decimal amounts and 'debit' / 'credit'; the helpers here convert
+in Python and render the same conversions as SQL expressions.
+"""
+
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+MINOR_UNITS = 100                      # stored units per currency unit
+TXN_TYPES = ("debit", "credit")        # index == type_code
+TYPE_CODES = {name: code for code, name in enumerate(TXN_TYPES)}
+DEBIT, CREDIT = TYPE_CODES["debit"], TYPE_CODES["credit"]
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+# ── Python side ─────────────────────────────────────
+
+def to_minor(amount) -> int | None:
+    """Decimal amount → integer minor units (half-up, no float drift)."""
+    if amount is None:
+        return None
+    return int((Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_minor(minor: int | None) -> float | None:
+    return None if minor is None else minor / MINOR_UNITS
+
+
+def to_day(iso_date: str) -> int:
+    """'YYYY-MM-DD' → days since 1970-01-01."""
+    return (datetime.date.fromisoformat(iso_date) - _EPOCH).days
+
+
+def from_day(day: int) -> str:
+    return (_EPOCH + datetime.timedelta(days=day)).isoformat()
+
+
+def to_month(iso_date: str) -> int:
+    """'YYYY-MM-DD' (or 'YYYY-MM') → YYYYMM month key."""
+    return int(iso_date[:4]) * 100 + int(iso_date[5:7])
+
+
+def from_month(month: int) -> str:
+    return f"{month // 100:04d}-{month % 100:02d}"
+
+
+def type_code(txn_type: str | None) -> int | None:
+    return TYPE_CODES.get(txn_type)
+
+
+# ── SQL side (present stored columns in API form) ───
+
+def sql_money(expr: str) -> str:
+    return f"({expr}) / {MINOR_UNITS}.0"
+
+
+def sql_date(expr: str) -> str:
+    return f"date(({expr}) * 86400, 'unixepoch')"
+
+
+def sql_month(expr: str) -> str:
+    return f"printf('%04d-%02d', ({expr}) / 100, ({expr}) % 100)"
+
+
+def sql_txn_type(expr: str) -> str:
+    return f"CASE {expr} WHEN {CREDIT} THEN 'credit' ELSE 'debit' END"
+
+
+def api_columns(alias: str = "t") -> str:
+    """SELECT-list fragment yielding date, amount, txn_type and balance."""
+    return (
+        f"{sql_date(f'{alias}.day')} AS date, "
+        f"{sql_money(f'{alias}.amount_minor')} AS amount, "
+        f"{sql_txn_type(f'{alias}.type_code')} AS txn_type, "
+        f"{sql_money(f'{alias}.balance_minor')} AS balance"
+    )
@@ -0,0 +1,107 @@
+"""Shared filter compiler – turns list/bulk/analytics filter params into SQL.
+
+Every endpoint that narrows the user's transactions by the same filter keys
+(list, bulk delete / update, analytics) goes through ``compile_filters`` so
+the WHERE clause is written once.
+"""
+
+import json
+from functools import lru_cache
+from typing import Callable
+
+from src.transactions.codec import to_day, to_minor, type_code
+
+
+def _like(value) -> str:
+    return f"%{value}%"
+
+
+# key → (SQL template, value coercion).  ``{p}`` is the table alias prefix;
+# the coerced value is bound once per ``?`` in the template.  Coercions map
+# API values (ISO dates, decimals, debit/credit) onto the stored encoding.
+_FILTERS: dict[str, tuple[str, Callable]] = {
+    "merchant":    ("{p}merchant LIKE ?", _like),
+    "merchant_id": ("{p}merchant_id = ?", int),
+    "category_id": ("{p}category_id = ?", int),
+    "txn_type":    ("{p}type_code = ?", type_code),
+    "date_from":   ("{p}day >= ?", to_day),
+    "date_to":     ("{p}day <= ?", to_day),
+    "amount_min":  ("{p}amount_minor >= ?", to_minor),
+    "amount_max":  ("{p}amount_minor <= ?", to_minor),
+    "search":      ("({p}description LIKE ? OR {p}merchant LIKE ?)", _like),
+}
+
+FILTER_KEYS = tuple(_FILTERS)
+
+
+class FilterError(ValueError):
+    """A filter value that cannot be coerced (e.g. ``date_from=2025-01``); answered with 400."""
+
+
+def coerce_filter(key: str, raw):
+    """*raw* in the stored encoding of filter *key*; ``FilterError`` if malformed."""
+    try:
+        return _FILTERS[key][1](raw)
+    except (ValueError, TypeError, ArithmeticError):     # decimal.InvalidOperation is an ArithmeticError
+        raise FilterError(f"Invalid {key}: {raw!r}") from None
+
+
+@lru_cache(maxsize=None)
+def _compiled(alias: str) -> dict[str, tuple[str, Callable, int]]:
+    """Filter templates with the table alias baked in (built once per alias)."""
+    prefix = f"{alias}." if alias else ""
+    return {
+        key: (sql.format(p=prefix), coerce, sql.count("?"))
+        for key, (sql, coerce) in _FILTERS.items()
+    }
+
+
+def compile_filters(source, user_id: int, alias: str = "t",
+                    keys: tuple[str, ...] = FILTER_KEYS) -> tuple[str, list]:
+    """
+    Build ``(where, params)`` for the user's transactions from *source*
+    (``request.args`` or a JSON body).  Empty / falsy values are ignored,
+    as is a ``txn_type`` other than debit/credit; malformed dates and
+    amounts raise ``FilterError``.
+    """
+    compiled = _compiled(alias)
+    prefix = f"{alias}." if alias else ""
+    clauses = [f"{prefix}user_id = ?"]
+    params: list = [user_id]
+
+    for key in keys:
+        raw = source.get(key)
+        if not raw:
+            continue
+        sql, _, arity = compiled[key]
+        value = coerce_filter(key, raw)
+        if value is None:
+            continue
+        clauses.append(sql)
+        params.extend([value] * arity)
+
+    return " AND ".join(clauses), params
+
+
+def compile_selection(data: dict, user_id: int, alias: str = "") -> tuple[str, list] | None:
+    """
+    Resolve a bulk-action body into ``(where, params)``.
+
+    ``{"ids": [...]}`` selects explicit rows (bound as a single JSON array so
+    any number of ids is one statement); ``{"all": true, filters...}`` selects
+    every row matching the filters.  Returns None if neither is given.
+    """
+    prefix = f"{alias}." if alias else ""
+    ids = data.get("ids")
+    if isinstance(ids, list) and ids:
+        try:
+            ids = [int(i) for i in ids]
+        except (ValueError, TypeError):
+            raise FilterError("'ids' must be integers") from None
+        return (
+            f"{prefix}user_id = ? AND {prefix}id IN (SELECT value FROM json_each(?))",
+            [user_id, json.dumps(ids)],
+        )
+    if data.get("all"):
+        return compile_filters(data, user_id, alias=alias)
+    return None
@@ -2,18 +2,47 @@
 
 from flask import Blueprint, request, jsonify, g
 
+from src.api.streaming import stream_query
 from src.auth.routes import login_required
-from src.db.connection import get_db
+from src.db.connection import get_read_db
+from src.db.versions import bump_data_version
+from src.db.writer import run_write
+from src.merchants.service import resolve_merchant_id, clear_alias_cache
+from src.recurring.detector import merchants_in, refresh_after_write
+from src.transactions.codec import api_columns
+from src.transactions.filters import FilterError, compile_filters, compile_selection
 
 transactions_bp = Blueprint("transactions", __name__, url_prefix="/api/transactions")
 
 
+@transactions_bp.errorhandler(FilterError)
+def _bad_filter(e: FilterError):
+    return jsonify({"error": str(e)}), 400
+
+
+_LIST_SELECT = f"""SELECT t.id, {api_columns()},
+                          t.description, t.merchant, t.merchant_id, t.currency,
+                          t.category_id, c.name AS category_name,
+                          t.import_id, t.notes, t.created_at
+                   FROM transactions t
+                   LEFT JOIN categories c ON c.id = t.category_id"""
+
+
+def _order_by(args) -> str:
+    """ORDER BY clause for the ``sort_by`` / ``sort_dir`` query params."""
+    allowed_sort = {"date": "t.day", "amount": "t.amount_minor", "merchant": "t.merchant"}
+    sort_by = allowed_sort.get(args.get("sort_by", "date"), "t.day")
+    sort_dir = "ASC" if args.get("sort_dir", "desc").lower() == "asc" else "DESC"
+    return f"{sort_by} {sort_dir}"
+
+
 @transactions_bp.route("", methods=["GET"])
 @login_required
 def list_transactions():
     """
     Query params:
         merchant        – partial match (LIKE)
+        merchant_id     – exact (canonical merchant)
         category_id     – exact
         txn_type        – debit | credit
         date_from       – ISO date lower bound
@@ -27,99 +56,64 @@ def list_transactions():
         per_page        – max 100  (default: 25)
     """
     # ── Filters ──────────────────────────────────────
-    clauses = ["t.user_id = ?"]
-    params: list = [g.user_id]
-
-    merchant = request.args.get("merchant")
-    if merchant:
-        clauses.append("t.merchant LIKE ?")
-        params.append(f"%{merchant}%")
-
-    category_id = request.args.get("category_id")
-    if category_id:
-        clauses.append("t.category_id = ?")
-        params.append(int(category_id))
-
-    txn_type = request.args.get("txn_type")
-    if txn_type in ("debit", "credit"):
-        clauses.append("t.txn_type = ?")
-        params.append(txn_type)
-
-    date_from = request.args.get("date_from")
-    if date_from:
-        clauses.append("t.date >= ?")
-        params.append(date_from)
-
-    date_to = request.args.get("date_to")
-    if date_to:
-        clauses.append("t.date <= ?")
-        params.append(date_to)
-
-    amount_min = request.args.get("amount_min")
-    if amount_min:
-        clauses.append("t.amount >= ?")
-        params.append(float(amount_min))
-
-    amount_max = request.args.get("amount_max")
-    if amount_max:
-        clauses.append("t.amount <= ?")
-        params.append(float(amount_max))
-
-    search = request.args.get("search")
-    if search:
-        clauses.append("(t.description LIKE ? OR t.merchant LIKE ?)")
-        params.extend([f"%{search}%", f"%{search}%"])
-
-    where = " AND ".join(clauses)
-
-    # ── Sorting ──────────────────────────────────────
-    allowed_sort = {"date": "t.date", "amount": "t.amount", "merchant": "t.merchant"}
-    sort_by = allowed_sort.get(request.args.get("sort_by", "date"), "t.date")
-    sort_dir = "ASC" if request.args.get("sort_dir", "desc").lower() == "asc" else "DESC"
+    where, params = compile_filters(request.args, g.user_id)
 
     # ── Pagination ───────────────────────────────────
-    page = max(int(request.args.get("page", 1)), 1)
-    per_page = min(int(request.args.get("per_page", 25)), 100)
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 25, type=int), 1), 100)
     offset = (page - 1) * per_page
 
-    db = get_db()
+    db = get_read_db()
     try:
         # Total count
         total = db.execute(
             f"SELECT COUNT(*) AS cnt FROM transactions t WHERE {where}", params
         ).fetchone()["cnt"]
+    except BaseException:
+        db.close()
+        raise
 
-        rows = db.execute(
-            f"""SELECT t.id, t.date, t.description, t.merchant,
-                       t.amount, t.txn_type, t.balance, t.currency,
-                       t.category_id, c.name AS category_name,
-                       t.import_id, t.notes, t.created_at
-                FROM transactions t
-                LEFT JOIN categories c ON c.id = t.category_id
-                WHERE {where}
-                ORDER BY {sort_by} {sort_dir}
-                LIMIT ? OFFSET ?""",
-            params + [per_page, offset],
-        ).fetchall()
-
-        return jsonify({
-            "transactions": [dict(r) for r in rows],
+    return stream_query(
+        db,
+        f"{_LIST_SELECT} WHERE {where} ORDER BY {_order_by(request.args)} LIMIT ? OFFSET ?",
+        params + [per_page, offset],
+        envelope={
             "page": page,
             "per_page": per_page,
             "total": total,
             "total_pages": max(1, -(-total // per_page)),  # ceil div
-        }), 200
-    finally:
-        db.close()
+        },
+        key="transactions",
+    )
+
+
+@transactions_bp.route("/export", methods=["GET"])
+@login_required
+def export_transactions():
+    """
+    Every transaction matching the list filters, as one JSON array in the
+    list's sort order.  Streamed, so memory does not grow with the result.
+    """
+    where, params = compile_filters(request.args, g.user_id)
+    return stream_query(
+        get_read_db(),
+        f"{_LIST_SELECT} WHERE {where} ORDER BY {_order_by(request.args)}",
+        params,
+        headers={"Content-Disposition": 'attachment; filename="transactions.json"'},
+    )
 
 
 @transactions_bp.route("/<int:txn_id>", methods=["GET"])
 @login_required
 def get_transaction(txn_id: int):
-    db = get_db()
+    db = get_read_db()
     try:
         row = db.execute(
-            """SELECT t.*, c.name AS category_name
+            f"""SELECT t.id, t.user_id, t.import_id, t.page_number,
+                      {api_columns()},
+                      t.description, t.merchant, t.merchant_id, t.category_id,
+                      t.currency, t.notes, t.created_at,
+                      c.name AS category_name
                FROM transactions t
                LEFT JOIN categories c ON c.id = t.category_id
                WHERE t.id = ? AND t.user_id = ?""",
@@ -132,6 +126,61 @@ def get_transaction(txn_id: int):
         db.close()
 
 
+def _execute_write(db, sql: str, params: list, user_id: int) -> int:
+    """Run a write on the writer thread; bump the data version if rows changed."""
+    affected = db.execute(sql, params).rowcount
+    if affected:
+        bump_data_version(db, user_id)
+    return affected
+
+
+def _delete_rows(where: str, params: list) -> int:
+    """DELETE the selected rows through the writer; returns rows deleted."""
+    user_id = g.user_id     # write functions run on the writer thread, outside the request
+
+    def _write(db) -> tuple[int, list[int]]:
+        merchant_ids = merchants_in(db, where, params)
+        return _execute_write(db, f"DELETE FROM transactions WHERE {where}", params, user_id), merchant_ids
+
+    affected, merchant_ids = run_write(_write, user_id)
+    if affected:
+        refresh_after_write(user_id, merchant_ids)
+    return affected
+
+
+def _apply_updates(updates: dict, where: str, params: list) -> int:
+    """UPDATE the selected rows through the writer; returns rows affected."""
+    user_id = g.user_id     # write functions run on the writer thread, outside the request
+
+    def _write(db) -> tuple[int, list[int]]:
+        values = dict(updates)
+        merchant_ids = []
+        if "merchant" in values:
+            # Recurring payments are detected per merchant: the rows leave
+            # their old merchants and join the new one.
+            merchant_ids = merchants_in(db, where, params)
+            values["merchant_id"] = resolve_merchant_id(db, user_id, values["merchant"])
+            if values["merchant_id"] is not None:
+                merchant_ids.append(values["merchant_id"])
+        set_clause = ", ".join(f"{k} = ?" for k in values)
+        affected = _execute_write(
+            db,
+            f"UPDATE transactions SET {set_clause} WHERE {where}",
+            list(values.values()) + params,
+            user_id,
+        )
+        return affected, merchant_ids
+
+    try:
+        affected, merchant_ids = run_write(_write, user_id)
+    except Exception:
+        clear_alias_cache()
+        raise
+    if affected:
+        refresh_after_write(user_id, merchant_ids)
+    return affected
+
+
 @transactions_bp.route("/<int:txn_id>", methods=["PATCH"])
 @login_required
 def update_transaction(txn_id: int):
@@ -142,38 +191,19 @@ def update_transaction(txn_id: int):
     if not updates:
         return jsonify({"error": "Nothing to update"}), 400
 
-    set_clause = ", ".join(f"{k} = ?" for k in updates)
-    values = list(updates.values()) + [txn_id, g.user_id]
-
-    db = get_db()
-    try:
-        affected = db.execute(
-            f"UPDATE transactions SET {set_clause} WHERE id = ? AND user_id = ?",
-            values,
-        ).rowcount
-        db.commit()
-        if affected == 0:
-            return jsonify({"error": "Transaction not found"}), 404
-        return jsonify({"updated": True}), 200
-    finally:
-        db.close()
+    affected = _apply_updates(updates, "id = ? AND user_id = ?", [txn_id, g.user_id])
+    if affected == 0:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify({"updated": True}), 200
 
 
 @transactions_bp.route("/<int:txn_id>", methods=["DELETE"])
 @login_required
 def delete_transaction(txn_id: int):
-    db = get_db()
-    try:
-        affected = db.execute(
-            "DELETE FROM transactions WHERE id = ? AND user_id = ?",
-            (txn_id, g.user_id),
-        ).rowcount
-        db.commit()
-        if affected == 0:
-            return jsonify({"error": "Transaction not found"}), 404
-        return jsonify({"deleted": True}), 200
-    finally:
-        db.close()
+    affected = _delete_rows("id = ? AND user_id = ?", [txn_id, g.user_id])
+    if affected == 0:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify({"deleted": True}), 200
 
 
 @transactions_bp.route("/bulk-delete", methods=["POST"])
@@ -186,77 +216,51 @@ def bulk_delete():
     Body: { "all": true, filters... }  – delete all matching a filter
 
     Supported filter keys (same as list endpoint):
-        merchant, category_id, txn_type, date_from, date_to,
+        merchant, merchant_id, category_id, txn_type, date_from, date_to,
         amount_min, amount_max, search
     """
     data = request.get_json(silent=True) or {}
+    selection = compile_selection(data, g.user_id)
+    if selection is None:
+        return jsonify({"error": "Provide 'ids' array or 'all': true"}), 400
+    where, params = selection
+    return jsonify({"deleted": _delete_rows(where, params)}), 200
 
-    db = get_db()
-    try:
-        if "ids" in data and isinstance(data["ids"], list) and data["ids"]:
-            ids = [int(i) for i in data["ids"]]
-            placeholders = ",".join("?" for _ in ids)
-            affected = db.execute(
-                f"DELETE FROM transactions WHERE user_id = ? AND id IN ({placeholders})",
-                [g.user_id] + ids,
-            ).rowcount
-            db.commit()
-            return jsonify({"deleted": affected}), 200
-
-        if data.get("all"):
-            clauses = ["user_id = ?"]
-            params: list = [g.user_id]
-
-            if data.get("merchant"):
-                clauses.append("merchant LIKE ?")
-                params.append(f"%{data['merchant']}%")
-            if data.get("category_id"):
-                clauses.append("category_id = ?")
-                params.append(int(data["category_id"]))
-            if data.get("txn_type") in ("debit", "credit"):
-                clauses.append("txn_type = ?")
-                params.append(data["txn_type"])
-            if data.get("date_from"):
-                clauses.append("date >= ?")
-                params.append(data["date_from"])
-            if data.get("date_to"):
-                clauses.append("date <= ?")
-                params.append(data["date_to"])
-            if data.get("amount_min"):
-                clauses.append("amount >= ?")
-                params.append(float(data["amount_min"]))
-            if data.get("amount_max"):
-                clauses.append("amount <= ?")
-                params.append(float(data["amount_max"]))
-            if data.get("search"):
-                clauses.append("(description LIKE ? OR merchant LIKE ?)")
-                params.extend([f"%{data['search']}%", f"%{data['search']}%"])
-
-            where = " AND ".join(clauses)
-            affected = db.execute(
-                f"DELETE FROM transactions WHERE {where}", params
-            ).rowcount
-            db.commit()
-            return jsonify({"deleted": affected}), 200
 
+@transactions_bp.route("/bulk-update", methods=["POST"])
+@login_required
+def bulk_update():
+    """
+    Set fields on many transactions in a single UPDATE.
+    Body: { "ids": [1,2,3], "set": {...} }           – update specific transactions
+    Body: { "all": true, filters..., "set": {...} }  – update all matching a filter
+
+    Settable keys: category_id, merchant, notes
+    Filter keys are the same as for bulk-delete.
+    """
+    data = request.get_json(silent=True) or {}
+    fields = data.get("set") or {}
+    if not isinstance(fields, dict):
+        return jsonify({"error": "'set' must be an object"}), 400
+    allowed = {"category_id", "merchant", "notes"}
+    updates = {k: v for k, v in fields.items() if k in allowed}
+    if not updates:
+        return jsonify({"error": "Nothing to update"}), 400
+
+    selection = compile_selection(data, g.user_id)
+    if selection is None:
         return jsonify({"error": "Provide 'ids' array or 'all': true"}), 400
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    where, params = selection
+
+    return jsonify({"updated": _apply_updates(updates, where, params)}), 200
 
 
 @transactions_bp.route("/categories", methods=["GET"])
 @login_required
 def list_categories():
     """List all categories available to the user (system + user-created)."""
-    db = get_db()
-    try:
-        rows = db.execute(
-            "SELECT * FROM categories WHERE user_id IS NULL OR user_id = ? ORDER BY name",
-            (g.user_id,),
-        ).fetchall()
-        return jsonify([dict(r) for r in rows]), 200
-    finally:
-        db.close()
+    return stream_query(
+        get_read_db(),
+        "SELECT * FROM categories WHERE user_id IS NULL OR user_id = ? ORDER BY name",
+        (g.user_id,),
+    )
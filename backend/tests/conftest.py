@@ -0,0 +1,84 @@
+"""Shared fixtures: one app over a throw-away database for the whole run.
+
+``Config`` reads the environment when first imported, so the database and
+folders are pointed at a temporary directory before anything from the app
+is imported.  Tests stay independent by each registering a fresh user.
+"""
+
+import itertools
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="hk-test-")
+os.environ.update({
+    "DATABASE_PATH": os.path.join(_TMP, "test.db"),
+    "USER_DB_DIR": os.path.join(_TMP, "user_dbs"),
+    "UPLOAD_FOLDER": os.path.join(_TMP, "uploads"),
+    "CONVERTED_IMAGES_FOLDER": os.path.join(_TMP, "converted_images"),
+    "SECRET_KEY": "test-secret-key-at-least-32-bytes-long",
+    "START_WORKER": "0",
+    "KDF_WORKERS": "0",
+    "LOGIN_MAX_ATTEMPTS_PER_IP": "100000",
+})
+
+import pytest  # noqa: E402
+
+from app import create_app  # noqa: E402
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app(with_worker=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class User:
+    """A registered user: ``id``, auth ``headers`` and request helpers."""
+
+    def __init__(self, client):
+        self.client = client
+        reg = client.post("/api/auth/register", json={
+            "email": f"user{next(_emails)}@example.com", "password": "testpass"})
+        assert reg.status_code == 201, reg.get_json()
+        self.id = reg.get_json()["user_id"]
+        self.headers = {"Authorization": f"Bearer {reg.get_json()['token']}"}
+
+    def request(self, method: str, path: str, headers: dict | None = None, **kwargs):
+        return self.client.open(path, method=method, headers={**self.headers, **(headers or {})}, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def save(self, *txns: dict) -> list[int]:
+        """Persist *txns* as an import would; returns the new transaction ids."""
+        from src.imports.persist import save_transactions
+
+        before = {t["id"] for t in self.get("/api/transactions/export").get_json()}
+        save_transactions(self.id, None, 1, [
+            {"description": "test", "txn_type": "debit", "currency": "USD", **t} for t in txns])
+        return sorted({t["id"] for t in self.get("/api/transactions/export").get_json()} - before)
+
+
+@pytest.fixture
+def user(client):
+    return User(client)
+
+
+@pytest.fixture
+def other_user(client):
+    return User(client)
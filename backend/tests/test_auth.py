@@ -0,0 +1,138 @@
+"""Token revocation, login throttling and password-hashing backpressure."""
+
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from config import Config
+from src.auth import kdf
+from src.auth.service import profile_cache, revoke_tokens
+from src.auth.throttle import AttemptThrottle, account_failures, ip_attempts
+from src.db.connection import get_catalog_db
+
+
+def _revoke_elsewhere(user_id: int):
+    """Bump the token version as another process would: this one's profile cache is untouched."""
+    db = get_catalog_db()
+    try:
+        db.execute("UPDATE users SET token_version = token_version + 1 WHERE id = ?", (user_id,))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_logout_all_rejects_old_tokens_at_once(user):
+    assert user.get("/api/auth/me").status_code == 200
+    revoke_tokens(user.id)
+    assert user.get("/api/auth/me").status_code == 401
+
+
+def test_other_processes_honour_revocation_after_the_profile_ttl(user):
+    assert user.get("/api/auth/me").status_code == 200          # profile now cached
+    _revoke_elsewhere(user.id)
+    assert user.get("/api/auth/me").status_code == 200          # stale, within AUTH_PROFILE_CACHE_TTL
+
+
+def test_no_profile_cache_revokes_immediately(user, monkeypatch):
+    monkeypatch.setattr(Config, "AUTH_PROFILE_CACHE_TTL", 0)
+    profile_cache.clear()
+    assert user.get("/api/auth/me").status_code == 200
+    _revoke_elsewhere(user.id)
+    assert user.get("/api/auth/me").status_code == 401
+
+
+def test_throttle_window_slides():
+    throttle = AttemptThrottle(limit=2, window=0.2)
+    throttle.hit("k")
+    assert throttle.retry_after("k") == 0
+    throttle.hit("k")
+    assert throttle.retry_after("k") >= 1
+    time.sleep(0.25)
+    assert throttle.retry_after("k") == 0
+
+
+def _login(client, email, password):
+    return client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def test_account_locked_after_failures(client):
+    email = "locked@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "rightpass"})
+    try:
+        for _ in range(Config.LOGIN_MAX_FAILURES_PER_ACCOUNT):
+            assert _login(client, email, "wrongpass").status_code == 401
+        resp = _login(client, email, "rightpass")      # refused before the password is checked
+        assert resp.status_code == 429
+        assert int(resp.headers["Retry-After"]) >= 1
+    finally:
+        account_failures.reset(f"email:{email}")
+
+
+def test_successful_login_clears_failures(client):
+    email = "forgetful@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "rightpass"})
+    for _ in range(Config.LOGIN_MAX_FAILURES_PER_ACCOUNT - 1):
+        _login(client, email, "wrongpass")
+    assert _login(client, email, "rightpass").status_code == 200
+    assert _login(client, email, "wrongpass").status_code == 401
+
+
+def test_ip_limit_covers_register_and_login(client, monkeypatch):
+    monkeypatch.setattr(ip_attempts, "limit", 2)
+    ip_attempts.reset("ip:127.0.0.1")
+    try:
+        assert client.post("/api/auth/register", json={"email": "ip@example.com", "password": "rightpass"}).status_code == 201
+        assert _login(client, "ip@example.com", "rightpass").status_code == 200
+        assert _login(client, "ip@example.com", "rightpass").status_code == 429
+    finally:
+        ip_attempts.reset("ip:127.0.0.1")
+
+
+def test_ip_limit_keys_on_the_forwarded_address(monkeypatch):
+    monkeypatch.setattr(Config, "TRUSTED_PROXIES", 1)
+    monkeypatch.setattr(ip_attempts, "limit", 1)
+    client = create_app(with_worker=False).test_client()
+
+    def attempt(path, ip):
+        return client.post(path, json={"email": "proxied@example.com", "password": "rightpass"},
+                           headers={"X-Forwarded-For": ip}).status_code
+
+    try:
+        assert attempt("/api/auth/register", "203.0.113.7") == 201
+        assert attempt("/api/auth/login", "203.0.113.7") == 429
+        assert attempt("/api/auth/login", "203.0.113.8") == 200
+    finally:
+        ip_attempts.reset("ip:203.0.113.7")
+        ip_attempts.reset("ip:203.0.113.8")
+
+
+@pytest.fixture
+def busy_kdf(monkeypatch):
+    """A one-thread KDF pool with no queue, its only slot held until the test ends."""
+    monkeypatch.setattr(Config, "KDF_WORKERS", 1)
+    monkeypatch.setattr(Config, "KDF_QUEUE_MAX", 0)
+    monkeypatch.setattr(kdf, "_executor", None)
+    release = threading.Event()
+    holder = threading.Thread(target=kdf.run_kdf, args=(release.wait,))
+    holder.start()
+    while kdf.kdf_stats()["pending"] < 1:
+        time.sleep(0.01)
+    yield
+    release.set()
+    holder.join()
+    kdf._executor.shutdown()
+
+
+def test_full_kdf_pool_rejects_at_once(busy_kdf):
+    rejected = kdf.kdf_stats()["rejected"]
+    with pytest.raises(kdf.KDFBusy):
+        kdf.run_kdf(lambda: None)
+    assert kdf.kdf_stats()["rejected"] == rejected + 1
+
+
+def test_register_answers_503_when_hashing_is_saturated(client, busy_kdf):
+    resp = client.post("/api/auth/register", json={"email": "busy@example.com", "password": "rightpass"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
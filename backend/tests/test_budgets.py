@@ -0,0 +1,84 @@
+"""Budget vs actual and threshold events."""
+
+import pytest
+
+from config import Config
+
+SHOPPING = 4
+
+
+def _spend(user, *amounts):
+    user.save(*({"date": "2025-03-10", "merchant": "Shop", "amount": a, "category": "Shopping"} for a in amounts))
+
+
+def _events(user) -> list[tuple[int, float]]:
+    return sorted((e["threshold"], e["spent"]) for e in user.get("/api/budgets/events?month=2025-03").get_json())
+
+
+@pytest.fixture
+def budget(user) -> dict:
+    resp = user.post("/api/budgets", json={"category_id": SHOPPING, "month": "2025-03", "amount": 100})
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def test_events_fire_once_per_threshold(user, budget):
+    _spend(user, 70)
+    assert _events(user) == []
+    _spend(user, 15)
+    assert _events(user) == [(80, 85.0)]
+    _spend(user, 20)
+    _spend(user, 1)
+    assert _events(user) == [(80, 85.0), (100, 105.0)]
+
+    status = user.get("/api/budgets?month=2025-03").get_json()
+    assert [(b["spent"], b["remaining"], b["pct_used"]) for b in status] == [(106.0, -6.0, 106.0)]
+
+
+def test_malformed_thresholds_are_skipped(user, budget, monkeypatch, capsys):
+    monkeypatch.setattr(Config, "BUDGET_ALERT_THRESHOLDS", "50, 90%,abc,0,5000,100")
+    _spend(user, 60)
+    assert _events(user) == [(50, 60.0)]
+    assert "'90%'" in capsys.readouterr().out
+
+
+def test_other_months_and_categories_do_not_count(user, budget):
+    user.save({"date": "2025-04-01", "merchant": "Shop", "amount": 500, "category": "Shopping"},
+              {"date": "2025-03-02", "merchant": "Cafe", "amount": 500, "category": "Dining"},
+              {"date": "2025-03-03", "merchant": "ACME", "amount": 500, "txn_type": "credit", "category": "Shopping"})
+    assert _events(user) == []
+    assert user.get("/api/budgets?month=2025-03").get_json()[0]["spent"] == 0
+
+
+def test_raising_the_budget_clears_uncrossed_events(user, budget):
+    _spend(user, 110)
+    assert [t for t, _ in _events(user)] == [80, 100]
+    resp = user.patch(f"/api/budgets/{budget['id']}", json={"amount": 130})
+    assert resp.get_json()["pct_used"] == 84.6
+    assert [t for t, _ in _events(user)] == [80]
+
+
+def test_budgets_are_private(user, other_user, budget):
+    assert other_user.get("/api/budgets?month=2025-03").get_json() == []
+    assert other_user.patch(f"/api/budgets/{budget['id']}", json={"amount": 5}).status_code == 404
+    assert other_user.delete(f"/api/budgets/{budget['id']}").status_code == 404
+
+
+def test_duplicate_budget_conflicts(user, budget):
+    resp = user.post("/api/budgets", json={"category_id": SHOPPING, "month": "2025-03", "amount": 50})
+    assert resp.status_code == 409
+
+
+@pytest.mark.parametrize("body", [
+    {"category_id": SHOPPING, "month": "2025-13", "amount": 100},
+    {"category_id": SHOPPING, "month": "2025-03", "amount": -5},
+    {"category_id": SHOPPING, "month": "2025-03", "amount": "lots"},
+    {"category_id": "4", "month": "2025-03", "amount": 100},
+])
+def test_bad_budgets_answer_400(user, body):
+    assert user.post("/api/budgets", json=body).status_code == 400
+
+
+def test_bad_event_params(user):
+    assert user.get("/api/budgets/events?month=March").status_code == 400
+    assert user.get("/api/budgets/events?limit=x").status_code == 200
@@ -0,0 +1,70 @@
+"""Analytics response cache: hits, ETags, invalidation by data version."""
+
+from src.analytics.cache import response_cache
+
+TXN = {"date": "2025-03-01", "merchant": "Shop", "amount": 12.5, "category": "Shopping"}
+
+
+def test_miss_then_hit_with_the_same_body(user):
+    user.save(TXN)
+    first = user.get("/api/analytics/categories")
+    assert first.headers["X-Cache"] == "MISS"
+    assert first.is_streamed
+    body = first.get_data()
+    second = user.get("/api/analytics/categories")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_data() == body
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_etag_revalidates_to_304(user):
+    user.save(TXN)
+    etag = user.get("/api/analytics/monthly").headers["ETag"]
+    resp = user.get("/api/analytics/monthly", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+
+
+def test_writes_invalidate(user):
+    user.save(TXN)
+    before = user.get("/api/analytics/cashflow")
+    user.save({**TXN, "amount": 7.5})
+    after = user.get("/api/analytics/cashflow")
+    assert after.headers["X-Cache"] == "MISS"
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.get_json()["total_expense"] == 20.0
+
+    txn_id = user.get("/api/transactions").get_json()["transactions"][0]["id"]
+    assert user.delete(f"/api/transactions/{txn_id}").status_code == 200
+    assert user.get("/api/analytics/cashflow").get_json()["total_expense"] in (12.5, 7.5)
+
+
+def test_users_do_not_share_entries(user, other_user):
+    user.save(TXN)
+    assert user.get("/api/analytics/categories").get_json()
+    resp = other_user.get("/api/analytics/categories")
+    assert resp.headers["X-Cache"] == "MISS"
+    assert resp.get_json() == []
+
+
+def test_streamed_body_too_big_to_cache_is_still_sent(user, monkeypatch):
+    user.save(TXN)
+    monkeypatch.setattr(response_cache, "max_bytes", 10)
+    first = user.get("/api/analytics/categories")
+    assert first.get_json()[0]["total"] == 12.5
+    assert user.get("/api/analytics/categories").headers["X-Cache"] == "MISS"
+
+
+def test_abandoned_stream_is_not_cached(user):
+    user.save(TXN)
+    resp = user.get("/api/analytics/merchants")
+    resp.close()                                   # client went away before the body was read
+    assert user.get("/api/analytics/merchants").headers["X-Cache"] == "MISS"
+
+
+def test_errors_are_not_cached(user):
+    entries = response_cache.stats()["entries"]
+    resp = user.get("/api/analytics/timeseries?bucket=fortnight")
+    assert resp.status_code == 400
+    assert "X-Cache" not in resp.headers
+    assert response_cache.stats()["entries"] == entries
@@ -0,0 +1,92 @@
+"""Filter values that cannot be coerced answer 400, not 500."""
+
+import pytest
+
+from src.transactions.filters import FilterError, compile_filters
+
+BAD_QUERIES = ["date_from=2025-01", "date_to=tomorrow", "amount_min=abc", "amount_max=1e999999",
+               "category_id=food", "merchant_id=1.5"]
+
+
+def test_compile_filters_coerces_to_stored_encoding():
+    where, params = compile_filters({"date_from": "1970-01-11", "amount_min": "1.005", "txn_type": "credit"}, 7)
+    assert where == "t.user_id = ? AND t.type_code = ? AND t.day >= ? AND t.amount_minor >= ?"
+    assert params == [7, 1, 10, 101]
+
+
+@pytest.mark.parametrize("query", BAD_QUERIES)
+def test_compile_filters_rejects_malformed_values(query):
+    key, value = query.split("=")
+    with pytest.raises(FilterError, match=key):
+        compile_filters({key: value}, 1)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/transactions", "/api/transactions/export", "/api/analytics/categories",
+    "/api/analytics/merchants", "/api/analytics/cashflow", "/api/analytics/timeseries",
+])
+@pytest.mark.parametrize("query", BAD_QUERIES)
+def test_list_and_analytics_answer_400(user, path, query):
+    resp = user.get(f"{path}?{query}")
+    assert resp.status_code == 400
+    assert query.split("=")[0] in resp.get_json()["error"]
+
+
+@pytest.mark.parametrize("body", [
+    {"all": True, "date_from": "2025-13-01"},
+    {"all": True, "amount_min": "ten"},
+    {"ids": ["one"]},
+    {"ids": [{"id": 1}]},
+])
+def test_bulk_actions_answer_400(user, body):
+    assert user.post("/api/transactions/bulk-delete", json=body).status_code == 400
+    assert user.post("/api/transactions/bulk-update", json={**body, "set": {"notes": "x"}}).status_code == 400
+
+
+def test_timeseries_rejects_bad_bucket_and_txn_type(user):
+    assert user.get("/api/analytics/timeseries?bucket=fortnight").status_code == 400
+    assert user.get("/api/analytics/timeseries?txn_type=transfer").status_code == 400
+
+
+def test_bad_numeric_params_fall_back_to_defaults(user):
+    assert user.get("/api/analytics/monthly?months=lots").status_code == 200
+    assert user.get("/api/analytics/merchants?limit=x").status_code == 200
+    body = user.get("/api/transactions?page=two&per_page=0").get_json()
+    assert (body["page"], body["per_page"]) == (1, 1)
+
+
+@pytest.mark.parametrize("query", ["amount_min=abc", "date_from=2025-01", "merchant=amazon"])
+def test_columnar_stats_answer_400(user, query):
+    pytest.importorskip("numpy")
+    user.save({"date": "2025-01-01", "merchant": "Shop", "amount": 5})
+    assert user.get(f"/api/analytics/stats/weekday?{query}").status_code == 400
+
+
+def test_percentiles_reject_non_numeric_q(user):
+    pytest.importorskip("numpy")
+    assert user.get("/api/analytics/stats/percentiles?q=median").status_code == 400
+
+
+def test_summary_clamps_negative_sizes(user):
+    user.save(*({"date": f"2025-0{m}-01", "merchant": "Shop", "amount": 5, "category": c}
+                for m, c in ((1, "Dining"), (2, "Shopping"), (3, "Dining"))))
+    body = user.get("/api/analytics/summary?recent=-1&months=-1&top=-1").get_json()
+    assert len(body["recent_transactions"]) == 1
+    assert len(body["monthly"]) == 1
+    assert len(body["top_categories"]) == 1
+
+
+def test_negative_sizes_clamp_to_one(user):
+    user.save(*({"date": f"2025-0{m}-01", "merchant": merchant, "amount": 5}
+                for m in (1, 2, 3) for merchant in ("Shop", "Cafe")))
+    assert len(user.get("/api/analytics/monthly?months=-1").get_json()) == 1
+    assert len(user.get("/api/analytics/merchants?limit=-1").get_json()) == 1
+    series = user.get("/api/analytics/timeseries?group_by=merchant&series=-1").get_json()["series"]
+    assert len(series) == 1
+
+
+def test_balance_rejects_malformed_category_id(user):
+    resp = user.get("/api/analytics/balance?category_id=abc")
+    assert resp.status_code == 400
+    assert "category_id" in resp.get_json()["error"]
+    assert user.get("/api/analytics/balance?category_id=2").status_code == 200
@@ -0,0 +1,48 @@
+"""Rows without an FX rate stay out of base-currency totals and counts."""
+
+import pytest
+
+from src.analytics.rollup import check_rollup
+from src.fx.rates import load_rates_file, reconvert
+
+TXNS = [
+    {"date": "2025-03-02", "merchant": "Bakery", "amount": 10, "category": "Dining"},
+    {"date": "2025-03-05", "merchant": "Bakery", "amount": 20, "currency": "SEK", "category": "Dining"},
+    {"date": "2025-03-06", "merchant": "Ikea", "amount": 50, "currency": "SEK", "category": "Shopping"},
+]
+
+
+def _merchants(user) -> dict[str, tuple[float, int]]:
+    return {m["merchant"]: (m["total"], m["count"]) for m in user.get("/api/analytics/merchants").get_json()}
+
+
+def test_unconverted_rows_are_not_counted(user):
+    user.save(*TXNS)
+    assert _merchants(user) == {"Bakery": (10.0, 1)}
+    cats = user.get("/api/analytics/categories?merchant=bakery").get_json()
+    assert [(c["total"], c["count"]) for c in cats] == [(10.0, 1)]
+    top = user.get("/api/analytics/summary").get_json()["top_categories"]
+    assert [(c["total"], c["count"]) for c in top if c["count"]] == [(10.0, 1)]
+    assert check_rollup(user.id) == []
+
+
+def test_reconvert_invalidates_cached_analytics(user, tmp_path):
+    user.save(*TXNS)
+    etag = user.get("/api/analytics/merchants").headers["ETag"]
+    rates = tmp_path / "rates.csv"
+    rates.write_text("date,currency,rate\n2025-01-01,SEK,0.1\n")
+    load_rates_file(str(rates))
+    assert reconvert(user.id, ["SEK"]) == 2
+
+    resp = user.get("/api/analytics/merchants", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert _merchants(user) == {"Ikea": (5.0, 1), "Bakery": (12.0, 2)}
+    assert check_rollup(user.id) == []
+
+
+@pytest.mark.parametrize("rate", ["inf", "nan", "-1", "0"])
+def test_bad_rates_are_rejected(tmp_path, rate):
+    rates = tmp_path / "rates.csv"
+    rates.write_text(f"date,currency,rate\n2025-01-01,NOK,{rate}\n")
+    with pytest.raises(ValueError, match="rates.csv:2: bad currency or rate"):
+        load_rates_file(str(rates))
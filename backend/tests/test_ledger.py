@@ -0,0 +1,105 @@
+"""Daily ledger and monthly rollup stay exact, and writes stay cheap."""
+
+import datetime
+import random
+
+import pytest
+
+from src.analytics.ledger import check_ledger
+from src.analytics.rollup import check_rollup
+from src.db.writer import run_write
+
+START = datetime.date(2024, 11, 20)
+CATEGORIES = ["Shopping", "Dining", "Income", None]
+
+
+def _history(days: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "date": (START + datetime.timedelta(days=i)).isoformat(),
+            "merchant": rng.choice(["Amazon", "Cafe", "ACME"]),
+            "amount": rng.randint(100, 50000) / 100,
+            "txn_type": rng.choice(["debit", "debit", "credit"]),
+            "currency": rng.choice(["USD", "USD", "USD", "XXX"]),      # XXX has no rate
+            "category": rng.choice(CATEGORIES),
+        }
+        for i in range(days)
+    ]
+
+
+def _consistent(user) -> bool:
+    return check_ledger(user.id) == [] and check_rollup(user.id) == []
+
+
+def test_mixed_writes_keep_ledger_and_rollup_exact(user):
+    ids = user.save(*_history(120))
+    assert _consistent(user)
+    user.patch(f"/api/transactions/{ids[3]}", json={"category_id": 2})
+    user.delete(f"/api/transactions/{ids[4]}")
+    user.post("/api/transactions/bulk-update", json={"ids": ids[10:40], "set": {"category_id": 3}})
+    user.post("/api/transactions/bulk-update", json={"all": True, "merchant": "cafe", "set": {"merchant": "Bistro"}})
+    user.post("/api/transactions/bulk-delete", json={"all": True, "date_from": "2025-01-10", "date_to": "2025-01-31"})
+    user.save(*_history(30, seed=8))            # back-dated onto existing days
+    assert _consistent(user)
+
+
+RANGES = [
+    ("2024-12-01", "2024-12-31"),       # one whole month
+    ("2024-11-25", "2025-02-10"),       # head, whole months, tail
+    ("2025-01-15", "2025-02-14"),       # two partial months, no whole one
+    ("2025-01-03", "2025-01-03"),       # one day
+    ("2025-02-01", None),
+    (None, "2025-01-31"),
+    ("2025-03-05", "2025-01-01"),       # empty
+]
+
+
+@pytest.mark.parametrize("date_from,date_to", RANGES)
+def test_range_totals_match_a_scan(user, date_from, date_to):
+    user.save(*_history(150))
+    dates = "&".join(f"{k}={v}" for k, v in (("date_from", date_from), ("date_to", date_to)) if v)
+    for path in ("/api/analytics/categories?txn_type=debit", "/api/analytics/categories?txn_type=credit",
+                 "/api/analytics/cashflow?"):
+        ledger = user.get(f"{path}&{dates}").get_json()
+        scan = user.get(f"{path}&{dates}&amount_min=0").get_json()     # any other filter scans
+        if isinstance(scan, dict):
+            for k in ("total_income", "total_expense", "net"):
+                assert ledger[k] == (scan[k] or 0)
+        else:
+            assert sorted(ledger, key=lambda c: c["category_id"]) == sorted(scan, key=lambda c: c["category_id"])
+
+
+def test_balance_matches_cashflow(user):
+    user.save(*_history(90))
+    body = user.get("/api/analytics/balance?date_from=2024-12-10&date_to=2025-01-20").get_json()
+    before = user.get("/api/analytics/cashflow?date_to=2024-12-09").get_json()
+    upto = user.get("/api/analytics/cashflow?date_to=2025-01-20").get_json()
+    assert body["opening_balance"] == before["net"]
+    assert body["points"][-1]["balance"] == upto["net"]
+
+
+def _changes(user, fn) -> int:
+    """Rows written (triggers included) by *fn* on the writer."""
+    def _write(db):
+        before = db.total_changes
+        fn(db)
+        return db.total_changes - before
+    return run_write(_write, user.id)
+
+
+def test_back_dated_writes_touch_only_their_own_day(user):
+    # Against a long history, a write dated at its start must not rewrite
+    # the ledger rows of every later day (as cumulative rows did: ~800 here).
+    # Per row: the transaction, its rollup rows and its ledger rows.
+    ids = user.save(*_history(400))
+    first = ids[0]
+    assert _changes(user, lambda db: db.execute(
+        "UPDATE transactions SET category_id = 5 WHERE id = ?", (first,))) <= 10
+    assert _changes(user, lambda db: db.execute(
+        "DELETE FROM transactions WHERE id = ?", (first,))) <= 10
+    ids = ids[1:50]
+    changes = _changes(user, lambda db: db.execute(
+        f"UPDATE transactions SET category_id = 6 WHERE id IN ({','.join('?' * len(ids))})", ids))
+    assert changes <= 10 * len(ids)
+    assert _consistent(user)
@@ -0,0 +1,48 @@
+"""Canonical merchants: alias resolution, per-user scoping and backfill."""
+
+from src.db.connection import get_db
+from src.merchants.service import backfill_merchants
+
+
+def _merchant_ids(user) -> dict[str, int]:
+    return {t["merchant"]: t["merchant_id"] for t in user.get("/api/transactions/export").get_json()}
+
+
+def test_spellings_share_one_merchant(user):
+    user.save({"date": "2025-01-01", "merchant": "AMAZON MKTPL", "amount": 5},
+              {"date": "2025-01-02", "merchant": "Amazon.in", "amount": 7})
+    ids = _merchant_ids(user)
+    assert ids["AMAZON MKTPL"] == ids["Amazon.in"]
+    ranking = user.get("/api/analytics/merchants").get_json()
+    assert [(m["merchant"], m["count"], m["total"]) for m in ranking] == [("Amazon", 2, 12.0)]
+
+
+def test_merchants_are_per_user(user, other_user):
+    user.save({"date": "2025-01-01", "merchant": "Netflix", "amount": 9})
+    other_user.save({"date": "2025-01-01", "merchant": "NETFLIX.COM", "amount": 9})
+    for u, name in ((user, "Netflix"), (other_user, "NETFLIX.COM")):
+        db = get_db(u.id)
+        try:
+            owner = db.execute("SELECT user_id FROM merchants WHERE id = ?", (_merchant_ids(u)[name],)).fetchone()
+        finally:
+            db.close()
+        assert owner[0] == u.id
+
+
+def test_backfill_skips_unresolvable_names(user):
+    db = get_db(user.id)
+    try:
+        db.executemany(
+            """INSERT INTO transactions (user_id, day, month, merchant, amount_minor, type_code)
+               VALUES (?, 20000, 202410, ?, 100, 0)""",
+            [(user.id, "\t"), (user.id, "\n"), (user.id, " Uber  ")],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    assert backfill_merchants(user_id=user.id, batch_size=1) == 1
+    ids = _merchant_ids(user)
+    assert ids[" Uber  "] is not None
+    assert ids["\t"] is None and ids["\n"] is None
+    assert backfill_merchants(user_id=user.id) == 0
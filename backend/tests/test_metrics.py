@@ -0,0 +1,35 @@
+"""Metrics endpoints: the Prometheus scrape may be open, SQL statements never are."""
+
+import pytest
+
+from config import Config
+
+
+def test_scrape_is_open_without_a_token(client):
+    assert client.get("/api/metrics").status_code == 200
+
+
+@pytest.mark.parametrize("trace,status", [(False, 404), (True, 200)])
+def test_sql_needs_a_login_without_a_token(client, user, monkeypatch, trace, status):
+    monkeypatch.setattr(Config, "SQL_TRACE", trace)
+    assert client.get("/api/metrics/sql").status_code == 401
+    assert client.get("/api/metrics/sql", headers={"Authorization": "Bearer nonsense"}).status_code == 401
+    assert user.get("/api/metrics/sql").status_code == status
+
+
+def test_sql_needs_the_token_when_set(client, user, monkeypatch):
+    monkeypatch.setattr(Config, "METRICS_TOKEN", "scrape-secret")
+    monkeypatch.setattr(Config, "SQL_TRACE", True)
+    assert client.get("/api/metrics").status_code == 401
+    assert user.get("/api/metrics/sql").status_code == 401
+    resp = client.get("/api/metrics/sql", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert "statements" in resp.get_json()
+
+
+def test_cache_stats_are_gated_like_sql(client, user, monkeypatch):
+    assert client.get("/api/metrics/cache").status_code == 401
+    assert "hits" in user.get("/api/metrics/cache").get_json()
+    monkeypatch.setattr(Config, "METRICS_TOKEN", "scrape-secret")
+    assert user.get("/api/metrics/cache").status_code == 401
+    assert client.get("/api/metrics/cache", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
@@ -0,0 +1,44 @@
+"""Recurring payments stay in step with edits and deletes."""
+
+import pytest
+
+MONTHS = ["2025-01-03", "2025-02-03", "2025-03-03", "2025-04-03"]
+
+
+def _recurring(user) -> dict[str, int]:
+    return {r["merchant"]: r["txn_count"] for r in user.get("/api/recurring").get_json()}
+
+
+@pytest.fixture
+def netflix(user) -> list[int]:
+    ids = user.save(*({"date": d, "merchant": "Netflix", "amount": 15.99} for d in MONTHS))
+    assert user.post("/api/recurring/refresh").status_code == 200
+    assert _recurring(user) == {"Netflix": 4}
+    return ids
+
+
+def test_single_delete_refreshes(user, netflix):
+    assert user.delete(f"/api/transactions/{netflix[0]}").status_code == 200
+    assert _recurring(user) == {"Netflix": 3}
+
+
+def test_bulk_delete_refreshes(user, netflix):
+    assert user.post("/api/transactions/bulk-delete", json={"ids": netflix[:2]}).get_json() == {"deleted": 2}
+    assert _recurring(user) == {}
+
+
+def test_bulk_merchant_change_moves_the_pattern(user, netflix):
+    resp = user.post("/api/transactions/bulk-update", json={"ids": netflix, "set": {"merchant": "Hulu"}})
+    assert resp.get_json() == {"updated": 4}
+    assert _recurring(user) == {"Hulu": 4}
+
+
+def test_patch_merchant_refreshes(user, netflix):
+    assert user.patch(f"/api/transactions/{netflix[-1]}", json={"merchant": "Hulu"}).status_code == 200
+    assert _recurring(user) == {"Netflix": 3}
+
+
+def test_category_change_keeps_the_pattern(user, netflix):
+    resp = user.post("/api/transactions/bulk-update", json={"ids": netflix, "set": {"category_id": 2}})
+    assert resp.get_json() == {"updated": 4}
+    assert _recurring(user) == {"Netflix": 4}
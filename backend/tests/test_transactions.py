@@ -0,0 +1,60 @@
+"""Transaction list, bulk delete and bulk update."""
+
+import pytest
+
+TXNS = [
+    {"date": "2025-01-05", "merchant": "Amazon", "amount": 10.10, "category": "Shopping"},
+    {"date": "2025-01-20", "merchant": "Amazon", "amount": 20.20, "category": "Shopping"},
+    {"date": "2025-02-01", "merchant": "ACME", "amount": 1000, "txn_type": "credit", "category": "Income"},
+    {"date": "2025-02-03", "merchant": "Cafe", "amount": 3.33, "category": "Dining"},
+]
+
+
+def test_bulk_update_by_filter(user):
+    user.save(*TXNS)
+    resp = user.post("/api/transactions/bulk-update",
+                     json={"all": True, "merchant": "amazon", "set": {"category_id": 2, "notes": "moved"}})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"updated": 2}
+    rows = user.get("/api/transactions?merchant=amazon").get_json()["transactions"]
+    assert {(r["category_id"], r["notes"]) for r in rows} == {(2, "moved")}
+
+
+def test_bulk_update_by_ids_only_touches_own_rows(user, other_user):
+    ids = user.save(*TXNS)
+    other_ids = other_user.save(TXNS[0])
+    resp = user.post("/api/transactions/bulk-update", json={"ids": ids[:1] + other_ids, "set": {"notes": "x"}})
+    assert resp.get_json() == {"updated": 1}
+    assert other_user.get(f"/api/transactions/{other_ids[0]}").get_json()["notes"] is None
+
+
+def test_bulk_delete_by_ids_and_filter(user):
+    ids = user.save(*TXNS)
+    assert user.post("/api/transactions/bulk-delete", json={"ids": ids[:1]}).get_json() == {"deleted": 1}
+    resp = user.post("/api/transactions/bulk-delete", json={"all": True, "txn_type": "credit"})
+    assert resp.get_json() == {"deleted": 1}
+    assert user.get("/api/transactions").get_json()["total"] == 2
+
+
+@pytest.mark.parametrize("body", [
+    {"ids": [1], "set": ["category_id", 2]},
+    {"ids": [1], "set": "notes"},
+    {"ids": [1], "set": {}},
+    {"ids": [1], "set": {"amount": 5}},
+    {"set": {"notes": "x"}},
+])
+def test_bulk_update_rejects_bad_bodies(user, body):
+    assert user.post("/api/transactions/bulk-update", json=body).status_code == 400
+
+
+def test_bulk_delete_needs_a_selection(user):
+    assert user.post("/api/transactions/bulk-delete", json={}).status_code == 400
+
+
+def test_category_breakdown_rejects_unknown_txn_type(user):
+    user.save(*TXNS)
+    resp = user.get("/api/analytics/categories?txn_type=both")
+    assert resp.status_code == 400
+    assert "txn_type" in resp.get_json()["error"]
+    resp = user.get("/api/analytics/categories?txn_type=credit")
+    assert [c["total"] for c in resp.get_json()] == [1000.0]
@@ -0,0 +1,66 @@
+"""Serialised writer: group commit, per-task rollback, lock retries."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from config import Config
+from src.db.connection import db_path
+from src.db.writer import run_write, submit
+
+
+def _counter(user_id):
+    return lambda db: db.execute(
+        "SELECT COUNT(*) FROM transactions WHERE user_id = ? AND description = 'writer-test'", (user_id,)
+    ).fetchone()[0]
+
+
+def _insert(user_id):
+    def _write(db):
+        db.execute(
+            """INSERT INTO transactions (user_id, day, month, description, amount_minor, type_code)
+               VALUES (?, 20000, 202410, 'writer-test', 100, 0)""",
+            (user_id,),
+        )
+        return _counter(user_id)(db)
+    return _write
+
+
+def test_failing_task_does_not_undo_its_batch(user):
+    def _fail(db):
+        _insert(user.id)(db)
+        raise RuntimeError("boom")
+
+    futures = [submit(_insert(user.id), user.id), submit(_fail, user.id), submit(_insert(user.id), user.id)]
+    assert futures[0].result() >= 1
+    with pytest.raises(RuntimeError):
+        futures[1].result()
+    futures[2].result()
+    assert run_write(_counter(user.id), user.id) == 2
+
+
+@pytest.fixture
+def other_process_lock(user, monkeypatch):
+    """Hold the write lock from another connection, as another process would."""
+    monkeypatch.setattr(Config, "WRITER_BUSY_TIMEOUT_MS", 50)
+    holder = sqlite3.connect(db_path(user.id), isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    yield holder
+    if holder.in_transaction:
+        holder.execute("ROLLBACK")
+    holder.close()
+
+
+def test_waits_for_another_process_write_lock(user, other_process_lock, monkeypatch):
+    monkeypatch.setattr(Config, "WRITER_LOCK_RETRIES", 20)
+    threading.Timer(0.2, other_process_lock.execute, ("COMMIT",)).start()
+    assert run_write(_insert(user.id), user.id) == 1
+
+
+def test_gives_up_after_the_retries(user, other_process_lock, monkeypatch):
+    monkeypatch.setattr(Config, "WRITER_LOCK_RETRIES", 1)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        run_write(_insert(user.id), user.id)
+    other_process_lock.execute("ROLLBACK")
+    assert run_write(_insert(user.id), user.id) == 1
@@ -0,0 +1,11 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The import worker is not started in web processes; run it separately
+(``python -m src.imports.worker``) so web and worker scale independently.
+"""
+
+from app import create_app
+
+app = create_app(with_worker=False)